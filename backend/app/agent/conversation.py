@@ -0,0 +1,179 @@
+"""
+Conversation history for the chat prompt.
+
+Every /chat turn (user message and reply) is stored in the messages table.
+The chat prompt gets the last CHAT_HISTORY_WINDOW_MESSAGES messages verbatim
+plus a rolling summary of everything older, so its size stays flat however
+long the conversation gets.
+
+Turns are written after the reply is sent (start_record_turn), and the summary
+is compacted in the background too: once CHAT_COMPACTION_BATCH_MESSAGES
+messages have dropped out of the window, one LLM call folds them into the
+existing summary. All of the state is in the database (summary row plus its
+through_message_id), so a compaction lost to a restart or to throttling is
+simply picked up after a later turn.
+"""
+
+import asyncio
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage
+from sqlalchemy.orm import Session
+
+from app.agent.llm_gateway import BACKGROUND, LLMThrottled, get_llm
+from app.core import metrics
+from app.core.config import (
+    CHAT_COMPACTION_BATCH_MESSAGES,
+    CHAT_HISTORY_WINDOW_MESSAGES,
+    CHAT_SUMMARY_MAX_CHARS,
+)
+from app.db import repository
+from app.db.database import AsyncSessionLocal
+from app.db.models import ConversationSummary, Message
+
+# Long replies (e.g. an email list) are clipped so one message cannot blow the prompt.
+MESSAGE_PROMPT_MAX_CHARS = 1000
+# Messages folded into the summary per compaction call.
+COMPACTION_MAX_MESSAGES = 4 * CHAT_COMPACTION_BATCH_MESSAGES
+
+compaction_llm = get_llm("conversation_summary", BACKGROUND)
+
+COMPACTION_PROMPT = """
+You maintain a running summary of a conversation between a user and their
+Chief-of-Staff assistant. Fold the new messages into the summary.
+
+Keep: open requests and follow-ups, decisions, names, dates, times and
+meeting details the user may refer back to. Drop greetings and small talk.
+Write plain sentences, at most {max_chars} characters.
+
+Current summary:
+{summary}
+
+New messages (oldest first):
+{messages}
+
+Updated summary:
+"""
+
+_compacting: set[str] = set()
+_tasks: set[asyncio.Task] = set()
+
+
+def _clip(text: str) -> str:
+    text = text or ""
+    return text if len(text) <= MESSAGE_PROMPT_MAX_CHARS else text[:MESSAGE_PROMPT_MAX_CHARS] + " …"
+
+
+def _as_history(messages: list[Message]) -> list[dict]:
+    return [{"role": m.role, "content": _clip(m.content)} for m in messages]
+
+
+def history_messages(history: list[dict]) -> list:
+    """Prompt messages for stored turns."""
+    return [
+        HumanMessage(content=turn["content"]) if turn["role"] == "user" else AIMessage(content=turn["content"])
+        for turn in history
+    ]
+
+
+# ---------- reads ----------
+def load_conversation(db: Session, user_id) -> tuple[str | None, list[dict]]:
+    """(rolling summary or None, last CHAT_HISTORY_WINDOW_MESSAGES turns oldest first)."""
+    user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+    summary = db.get(ConversationSummary, user_uuid)
+    recent = (
+        db.query(Message)
+        .filter(Message.user_id == user_uuid)
+        .order_by(Message.id.desc())
+        .limit(CHAT_HISTORY_WINDOW_MESSAGES)
+        .all()
+    )
+    return (summary.summary if summary else None), _as_history(list(reversed(recent)))
+
+
+# ---------- writes ----------
+async def record_turn(user_id, message: str, response: str):
+    """Store one exchange and start a background compaction if enough history has piled up."""
+    async with AsyncSessionLocal() as db:
+        await repository.add_messages(db, user_id, [("user", message), ("assistant", response or "")])
+        summary = await repository.get_conversation_summary(db, user_id)
+        through = summary.through_message_id if summary else 0
+        unsummarized = await repository.count_messages_after(db, user_id, through)
+
+    if unsummarized - CHAT_HISTORY_WINDOW_MESSAGES >= CHAT_COMPACTION_BATCH_MESSAGES:
+        _start_compaction(str(user_id))
+
+
+def _track(coro):
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _record_turn_safely(user_id, message: str, response: str):
+    # History is best effort: a failed write must not cost the user their reply.
+    try:
+        await record_turn(user_id, message, response)
+    except Exception as e:
+        metrics.inc("conversation_turn_writes_failed_total")
+        print(f"⚠️ Could not store chat turn: {type(e).__name__}: {e}")
+
+
+def start_record_turn(user_id, message: str, response: str):
+    """Store the exchange in the background so the reply does not wait on the write."""
+    if response:
+        _track(_record_turn_safely(user_id, message, response))
+
+
+def _start_compaction(user_key: str):
+    if user_key in _compacting:
+        return
+    _compacting.add(user_key)
+    _track(_compact(user_key))
+
+
+async def _compact(user_key: str):
+    try:
+        async with AsyncSessionLocal() as db:
+            summary = await repository.get_conversation_summary(db, user_key)
+            through = summary.through_message_id if summary else 0
+
+            window = await repository.recent_messages(db, user_key, CHAT_HISTORY_WINDOW_MESSAGES)
+            if not window:
+                return
+            pending = [
+                m for m in await repository.messages_after(db, user_key, through, COMPACTION_MAX_MESSAGES)
+                if m.id < window[0].id
+            ]
+            if not pending:
+                return
+
+            prompt = COMPACTION_PROMPT.format(
+                max_chars=CHAT_SUMMARY_MAX_CHARS,
+                summary=summary.summary if summary else "(none yet)",
+                messages="\n".join(f"{m.role}: {_clip(m.content)}" for m in pending),
+            )
+            response = await asyncio.to_thread(
+                compaction_llm.invoke, [HumanMessage(content=prompt)], user_id=user_key
+            )
+            text = (response.text or "").strip()[:CHAT_SUMMARY_MAX_CHARS]
+            if not text:
+                return
+
+            await repository.save_conversation_summary(db, user_key, text, pending[-1].id)
+            metrics.inc("conversation_compactions_total", outcome="ok")
+            metrics.inc("conversation_messages_compacted_total", len(pending))
+    except LLMThrottled:
+        # Background work yields to interactive calls; a later turn retries.
+        metrics.inc("conversation_compactions_total", outcome="deferred")
+    except Exception as e:
+        metrics.inc("conversation_compactions_total", outcome="error")
+        print(f"❌ Conversation compaction failed: {type(e).__name__}: {e}")
+    finally:
+        _compacting.discard(user_key)
+
+
+async def wait_for_compactions():
+    """Wait for in-flight turn writes and the compactions they start (shutdown, benchmarks)."""
+    while _tasks:
+        await asyncio.gather(*list(_tasks), return_exceptions=True)
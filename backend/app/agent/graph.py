@@ -1,195 +1,154 @@
 from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
 from langchain_core.messages import SystemMessage, HumanMessage
+from langgraph.config import get_stream_writer
 
 from app.agent.schemas import AgentState
-from app.agent.memory import load_user_memory, save_user_memory
-from app.tools.calendar_read_tool import fetch_upcoming_events
+from app.agent.conversation import history_messages, load_conversation
+from app.agent.message_parser import ParsedMessage, parse_followup, parse_message
+from app.agent.memory import load_relevant_memory
+from app.agent.memory_worker import enqueue_memory_extraction
+from app.agent.llm_cache import acached_stream, cached_invoke
+from app.agent.llm_gateway import INTERACTIVE, get_llm, is_rate_limited
+from app.core import metrics
+from app.core.tracing import traced_node
+from app.core.config import (
+    BRIEFING_CALENDAR_TIMEOUT_SECONDS,
+    BRIEFING_GMAIL_TIMEOUT_SECONDS,
+    LLM_CACHE_TTL_CHAT,
+    LLM_CACHE_TTL_SUMMARY,
+)
+from app.tools.calendar_read_tool import fetch_events_between
 from app.tools.gmail_read_tool import fetch_gmail_messages_for_date
+from app.core.executors import google_io_executor, run_google_io
+from app.db.database import SessionLocal
 
 
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
+import asyncio
+import contextvars
 import json
+import threading
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0
-)
+chat_llm = get_llm("chat", INTERACTIVE)
+summary_llm = get_llm("gmail_today_summary", INTERACTIVE)
 
-# -------- meeting helpers --------
-def _parse_iso_datetime(value: str) -> datetime | None:
-    try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except Exception:
-        return None
+# -------- streaming helpers --------
+def _progress(phase: str):
+    """Emit a progress event to /chat/stream (no-op when not streaming)."""
+    get_stream_writer()({"phase": phase})
 
 
-def _event_time_range(event: dict) -> tuple[datetime | None, datetime | None]:
+async def _astream_llm(llm, messages: list, *, node: str, ttl: float, user_id=None) -> str:
     """
-    Google events can have dateTime or date (all-day). We handle dateTime reliably.
+    Stream the reply token by token. When the graph runs with
+    stream_mode="messages" the tokens are forwarded to the client as they arrive.
+    Repeated prompts are answered from the LLM cache without streaming.
     """
-    start_raw = (event.get("start") or {}).get("dateTime") or (event.get("start") or {}).get("date")
-    end_raw = (event.get("end") or {}).get("dateTime") or (event.get("end") or {}).get("date")
-    if not start_raw or not end_raw:
-        return None, None
-    return _parse_iso_datetime(start_raw), _parse_iso_datetime(end_raw)
+    return await acached_stream(llm, messages, node=node, ttl=ttl, user_id=user_id)
 
 
-def _overlaps(a_start: datetime, a_end: datetime, b_start: datetime, b_end: datetime) -> bool:
-    # Treat intervals as [start, end)
-    return a_start < b_end and b_start < a_end
+# -------- memory helpers --------
+# Nodes use the request's session (config["configurable"]["db"]), the same one
+# get_current_user loaded the user with, so a request holds one pooled
+# connection. Async nodes hand it to one worker thread at a time; the only work
+# that runs concurrently with it, the briefing's Google branches, gets
+# sessions of its own (_in_own_session).
+def _enqueue_memory(state: AgentState, config, source: str = "chat", text: str = None):
+    """Hand text to the background memory worker; extraction never delays the reply."""
+    db = config.get("configurable", {}).get("db")
+    if db is None:
+        # Warm-up dry runs have no database session.
+        return state
+    enqueue_memory_extraction(db, state.user_id, source, text if text is not None else state.message)
+    return state
 
 
-def extract_meeting_title(text: str) -> str | None:
-    """
-    Extract a meeting title from common patterns:
-    - titled "X"
-    - called "X"
-    - named "X"
-    - title: X
-    - "X" (quoted text before time)
-    - X (text before "from" or time pattern)
-    """
-    import re
-
-    patterns = [
-        r'(?:titled|called|named)\s+"([^"]+)"',
-        r"(?:titled|called|named)\s+'([^']+)'",
-        r"(?:title|subject)\s*:\s*([^\n]+)",
-        r'"([^"]+)"',  # Any quoted text
-        r"'([^']+)'",  # Any single-quoted text
-    ]
-    for pat in patterns:
-        m = re.search(pat, text, flags=re.IGNORECASE)
-        if m:
-            title = m.group(1).strip()
-            # Trim trailing punctuation
-            title = title.strip(" .,!;:")
-            if title and len(title) > 1:  # Must be at least 2 chars
-                return title
-    
-    # If no quoted title, try to extract text before "from" or time pattern
-    # Example: "Team Standup from 9am to 10am"
-    time_pattern = r'\s+from\s+\d'
-    if re.search(time_pattern, text, flags=re.IGNORECASE):
-        # Extract text before "from"
-        parts = re.split(time_pattern, text, flags=re.IGNORECASE, maxsplit=1)
-        if len(parts) > 0:
-            potential_title = parts[0].strip()
-            # Remove common prefixes
-            for prefix in ["schedule", "create", "book", "set up", "add", "a meeting", "meeting"]:
-                if potential_title.lower().startswith(prefix):
-                    potential_title = potential_title[len(prefix):].strip()
-            # Remove trailing words that are likely not part of title
-            potential_title = re.sub(r'\s+(for|on|at|with|to)\s*$', '', potential_title, flags=re.IGNORECASE)
-            if potential_title and len(potential_title) > 1:
-                return potential_title.strip(" .,!;:")
-    
-    return None
+async def _aenqueue_memory(state: AgentState, config, source: str = "chat", text: str = None):
+    return await asyncio.to_thread(_enqueue_memory, state, config, source, text)
+
+
+def _in_own_session(fn, /, *args):
+    """Call fn(*args, db) with a short-lived session: work running concurrently must not share one Session."""
+    db = SessionLocal()
+    try:
+        return fn(*args, db)
+    finally:
+        db.close()
 
 
-# ---------- MEMORY ----------
-def load_memory_node(state: AgentState, config):
+# Memory is loaded only by the nodes that use it (chat, gmail_today_summary,
+# daily_briefing) rather than before routing.
+def _load_memory(state: AgentState, config) -> list[dict]:
     db = config["configurable"]["db"]
-    state.memory = load_user_memory(db, state.user_id)
-    return state
+    if db is None:
+        # Warm-up dry runs have no database session.
+        return []
+    return load_relevant_memory(db, state.user_id, state.message)
 
-# -------- re helper function --------
-import re
-from datetime import datetime, timedelta
 
-def extract_time_range(text: str):
-    """
-    Extracts simple time ranges like:
-    'from 10 to 11'
-    '10am to 11am'
-    '11pm to 12am' (handles midnight correctly)
-    Returns (start_datetime, end_datetime) or (None, None)
-    """
+# -------- message parsing --------
+def _parsed(state: AgentState) -> ParsedMessage:
+    """The parsed message, parsing on demand if the parse stage did not run."""
+    if state.parsed is None:
+        state.parsed = parse_message(state.message)
+    return state.parsed
 
-    match = re.search(r"from (\d{1,2})\s*(am|pm)?\s*to\s*(\d{1,2})\s*(am|pm)?", text, re.IGNORECASE)
-    if not match:
-        return None, None
-
-    start_hour = int(match.group(1))
-    end_hour = int(match.group(3))
-    start_ampm = (match.group(2) or "").lower()
-    end_ampm = (match.group(4) or "").lower()
-
-    # Handle 12am (midnight) and 12pm (noon) correctly
-    if start_hour == 12:
-        start_hour = 0  # 12am = 0, 12pm = 12 (handled below)
-    if end_hour == 12:
-        end_hour = 0  # 12am = 0, 12pm = 12 (handled below)
-
-    # AM/PM handling
-    if start_ampm == "pm" and start_hour < 12:
-        start_hour += 12
-    if end_ampm == "pm" and end_hour < 12:
-        end_hour += 12
-    
-    # Special case: if end is 12am (midnight), it's the next day
-    if end_ampm == "am" and end_hour == 0 and start_hour >= 12:
-        # This is likely "11pm to 12am" meaning 11pm to midnight (next day)
-        pass  # We'll handle this below
 
-    today = datetime.utcnow()
-    is_tomorrow = "tomorrow" in text.lower()
+def parse_message_node(state: AgentState, config):
+    state.parsed = parse_message(state.message)
+    return state
 
-    start_time = today.replace(hour=start_hour, minute=0, second=0, microsecond=0)
-    end_time = today.replace(hour=end_hour, minute=0, second=0, microsecond=0)
 
-    # Handle tomorrow
-    if is_tomorrow:
-        start_time += timedelta(days=1)
-        end_time += timedelta(days=1)
-    
-    # Handle midnight crossing (e.g., 11pm to 12am)
-    if end_hour == 0 and end_ampm == "am" and start_hour >= 12:
-        # End time is midnight of next day
-        if is_tomorrow:
-            end_time += timedelta(days=1)
-        else:
-            end_time += timedelta(days=1)
-    
-    # Validation: end time must be after start time
-    if end_time <= start_time:
-        # If end is before or equal to start, assume it's next day
-        end_time += timedelta(days=1)
+async def aparse_message_node(state: AgentState, config):
+    # Pure CPU and sub-millisecond: run inline rather than on a worker thread.
+    return parse_message_node(state, config)
 
-    return start_time, end_time
 
+def _is_create_request(parsed: ParsedMessage) -> bool:
+    """A request to create a meeting (it may still be missing the title or time)."""
+    # Check for scheduling keywords OR time patterns (for follow-up messages)
+    return parsed.has("meeting", "calendar") and (
+        parsed.has("create", "schedule", "book", "set up", "add")
+        or (parsed.has_time_range and parsed.has("titled", "called", "named", "title"))
+    )
 
 
 def intent_router_node(state: AgentState, config):
-    text = state.message.lower()
+    parsed = _parsed(state)
+
+    # -------- DAILY BRIEFING --------
+    # Only when no single source is named and nothing is being created
+    # ("overview of my emails today" stays a Gmail request, a meeting titled
+    # "Project briefing" stays a calendar request).
+    if (
+        parsed.has("briefing", "overview", "my day")
+        and not parsed.has("meeting", "calendar", "mail", "email")
+        and not parsed.has("create", "schedule", "book", "set up", "add")
+    ):
+        state.intent = "daily_briefing"
+        return state
 
     # -------- CALENDAR INTENTS --------
-    if "meeting" in text or "calendar" in text:
+    if parsed.has("meeting", "calendar"):
 
         # CREATE/SCHEDULE MEETING
-        # Check for scheduling keywords OR time patterns (for follow-up messages)
-        has_schedule_keyword = any(kw in text for kw in ["create", "schedule", "book", "set up", "add"])
-        has_time_pattern = bool(extract_time_range(state.message)[0])  # Check if time can be extracted
-        has_title_keyword = any(kw in text for kw in ["titled", "called", "named", "title"])
-        
-        if has_schedule_keyword or (has_time_pattern and has_title_keyword):
+        if _is_create_request(parsed):
             state.intent = "calendar_create"
 
-            # ⏱ Extract time range if present
-            start, end = extract_time_range(state.message)
-            state.start_time = start
-            state.end_time = end
+            # ⏱ Time range if present
+            state.start_time = parsed.start_time
+            state.end_time = parsed.end_time
 
             return state
 
         # READ MEETINGS
-        if "today" in text:
+        if parsed.has("today"):
             state.intent = "calendar_today"
             return state
 
-        if "tomorrow" in text:
+        if parsed.has("tomorrow"):
             state.intent = "calendar_tomorrow"
             return state
 
@@ -198,17 +157,17 @@ def intent_router_node(state: AgentState, config):
         return state
 
     # -------- GMAIL INTENTS --------
-    if "mail" in text or "email" in text:
+    if parsed.has("mail", "email"):
 
-        if "today" in text and ("important" in text or "summary" in text):
+        if parsed.has("today") and parsed.has("important", "summary"):
             state.intent = "gmail_today_summary"
             return state
 
-        if "today" in text:
+        if parsed.has("today"):
             state.intent = "gmail_today"
             return state
 
-        if "yesterday" in text:
+        if parsed.has("yesterday"):
             state.intent = "gmail_yesterday"
             return state
 
@@ -225,10 +184,13 @@ def intent_router_node(state: AgentState, config):
 def calendar_today_node(state: AgentState, config):
     db = config["configurable"]["db"]
 
+    now = datetime.utcnow()
     try:
-        events = fetch_upcoming_events(
+        events = fetch_events_between(
             user_id=state.user_id,
             db=db,
+            start=now,
+            end=now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1),
             max_results=5
         )
     except TimeoutError as e:
@@ -295,31 +257,64 @@ def calendar_today_node(state: AgentState, config):
 
 
 # ---------- FALLBACK CHAT ----------
-def chat_node(state: AgentState, config):
-    """Chat node with memory context."""
-    # Check if this might be a scheduling follow-up (has time or title keywords)
-    text_lower = state.message.lower()
-    has_time = bool(extract_time_range(state.message)[0])
-    has_title = any(kw in text_lower for kw in ["titled", "called", "named", "title", "meeting"])
-    
-    # If chat node receives scheduling details as follow-up, extract and route
-    # This handles cases where user says "I want to schedule" then provides details in next message
-    if has_time and has_title:
-        # Looks like scheduling details - extract and route to calendar_create
-        start, end = extract_time_range(state.message)
-        if start and end:
-            state.intent = "calendar_create"
-            state.start_time = start
-            state.end_time = end
-            # Return state with intent set - the graph will route it properly on next invocation
-            # For now, just hint to user that they should provide full details
-            state.response = (
-                "I see you're providing meeting details! Please include everything in one message:\n\n"
-                "Example: 'Schedule a meeting titled \"Team Standup\" tomorrow from 9am to 10am'\n\n"
-                "Or: 'Create \"Project Review\" today from 2pm to 3pm'"
-            )
-            return state
-    
+MEETING_SCHEDULED = "✅ Meeting Scheduled Successfully!"
+# Follow-ups ("make it 3pm", then "tomorrow instead") folded into one create request
+MAX_SCHEDULING_FOLLOWUPS = 3
+
+
+def _pending_meeting_request(history: list[dict]) -> ParsedMessage | None:
+    """
+    The meeting request the latest turns are still working out, with the
+    follow-ups already sent applied; None if the last request was scheduled or
+    the conversation has moved on.
+    """
+    followups = []
+    for turn in reversed(history):
+        if turn["role"] != "user":
+            if turn["content"].startswith(MEETING_SCHEDULED):
+                return None
+            continue
+        request = parse_message(turn["content"])
+        if _is_create_request(request):
+            break
+        if len(followups) == MAX_SCHEDULING_FOLLOWUPS:
+            return None
+        followups.append(turn["content"])
+    else:
+        return None
+
+    for text in reversed(followups):
+        request = parse_followup(text, request)
+        if request is None:
+            return None
+    return request
+
+
+def _handle_scheduling_followup(state: AgentState) -> bool:
+    """
+    Scheduling details sent after a meeting request ("make it 3pm", 'call it
+    "Sync"') are applied to that request from the loaded history and handed to
+    calendar_create. Details that stand alone ('titled "Sync" from 2pm to 3pm')
+    are handled the same way. Returns True when routed to calendar_create.
+    """
+    parsed = _parsed(state)
+    base = _pending_meeting_request(state.history)
+    if base is None:
+        if not (parsed.has_time_range and parsed.has("titled", "called", "named", "title", "meeting")):
+            return False
+        base = ParsedMessage(text="")
+
+    request = parse_followup(state.message, base)
+    if request is None:
+        return False
+    state.parsed = request
+    state.intent = "calendar_create"
+    state.start_time = request.start_time
+    state.end_time = request.end_time
+    return True
+
+
+def _chat_messages(state: AgentState) -> list:
     # Format memory for better readability
     memory_text = ""
     if state.memory:
@@ -333,45 +328,89 @@ def chat_node(state: AgentState, config):
         "If you cannot perform an action, explain politely."
         + memory_text
     )
+    if state.conversation_summary:
+        system_prompt += f"\n\nSummary of the earlier conversation:\n{state.conversation_summary}"
+
+    return [
+        SystemMessage(content=system_prompt),
+        *history_messages(state.history),
+        HumanMessage(content=state.message)
+    ]
+
+
+def _chat_error_response(e: Exception) -> str:
+    # Handle rate limit errors gracefully
+    if is_rate_limited(e):
+        return (
+            "⚠️ I've hit the daily rate limit for AI requests (free tier: 20 requests/day).\n\n"
+            "Please wait a few minutes and try again, or continue tomorrow.\n\n"
+            "You can still use calendar and email features that don't require AI!"
+        )
+    if isinstance(e, ChatGoogleGenerativeAIError):
+        return f"Sorry, I encountered an AI service error. Please try again later.\n\nError: {type(e).__name__}"
+    return f"Sorry, I encountered an unexpected error. Please try again.\n\nError: {type(e).__name__}"
+
+
+def _load_history(state: AgentState, config):
+    db = config["configurable"]["db"]
+    if db is not None:
+        state.conversation_summary, state.history = load_conversation(db, state.user_id)
+
+
+def chat_node(state: AgentState, config):
+    """Chat node with memory context."""
+    _load_history(state, config)
+    if _handle_scheduling_followup(state):
+        return state
+    state.memory = _load_memory(state, config)
 
     try:
-        response = llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=state.message)
-        ])
-        state.response = response.content
-    except ChatGoogleGenerativeAIError as e:
-        # Handle rate limit errors gracefully
-        if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e) or "quota" in str(e).lower():
-            state.response = (
-                "⚠️ I've hit the daily rate limit for AI requests (free tier: 20 requests/day).\n\n"
-                "Please wait a few minutes and try again, or continue tomorrow.\n\n"
-                "You can still use calendar and email features that don't require AI!"
-            )
-        else:
-            state.response = f"Sorry, I encountered an AI service error. Please try again later.\n\nError: {type(e).__name__}"
+        state.response = cached_invoke(
+            chat_llm, _chat_messages(state), node="chat", ttl=LLM_CACHE_TTL_CHAT, user_id=state.user_id
+        )
     except Exception as e:
-        state.response = f"Sorry, I encountered an unexpected error. Please try again.\n\nError: {type(e).__name__}"
+        state.response = _chat_error_response(e)
     
     return state
 
 
+async def achat_node(state: AgentState, config):
+    """Async chat node: same prompt, non-blocking LLM call."""
+    await asyncio.to_thread(_load_history, state, config)
+    if _handle_scheduling_followup(state):
+        return state
+    state.memory = await asyncio.to_thread(_load_memory, state, config)
+
+    try:
+        state.response = await _astream_llm(
+            chat_llm, _chat_messages(state), node="chat", ttl=LLM_CACHE_TTL_CHAT, user_id=state.user_id
+        )
+    except Exception as e:
+        state.response = _chat_error_response(e)
+
+    return state
+
+
 # ---------- MEMORY EXTRACTION ----------
 def extract_memory_node(state: AgentState, config):
-    """Extract and store memories from user messages."""
-    db = config["configurable"]["db"]
-    
-    from app.agent.memory_extractor import extract_and_store_memory
-    return extract_and_store_memory(state, db)
+    """Queue the user's message for background memory extraction."""
+    return _enqueue_memory(state, config)
+
+
+async def aextract_memory_node(state: AgentState, config):
+    return await _aenqueue_memory(state, config)
 
 #------------Calendar tomorrow node-------------
 def calendar_tomorrow_node(state: AgentState, config):
     db = config.get("configurable", {}).get("db")
 
+    tomorrow_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
     try:
-        events = fetch_upcoming_events(
+        events = fetch_events_between(
             user_id=state.user_id,
             db=db,
+            start=tomorrow_start,
+            end=tomorrow_start + timedelta(days=1),
             max_results=5
         )
     except Exception as e:
@@ -418,20 +457,8 @@ def calendar_tomorrow_node(state: AgentState, config):
     state.response = "📆 Your Meetings Tomorrow\n\n" + "\n".join(lines)
     return state
 
-# ------------ gmail today ----------
-def gmail_today_node(state: AgentState, config):
-    db = config.get("configurable", {}).get("db")
-
-    emails = fetch_gmail_messages_for_date(
-        user_id=state.user_id,
-        db=db,
-        days_ago=0
-    )
-
-    if not emails:
-        state.response = "You didn’t receive any emails today."
-        return state
-
+# ------------ gmail today / yesterday ----------
+def _format_email_list(emails: list[dict], day: str) -> str:
     # Format emails professionally - each email clearly separated with better spacing
     formatted_emails = []
     for i, e in enumerate(emails, 1):
@@ -444,65 +471,86 @@ def gmail_today_node(state: AgentState, config):
         formatted_emails.append(f"{i}. {subject}\n   From: {sender}")
     
     # Join with triple newlines for maximum visual separation between emails
-    state.response = "📧 Emails Received Today\n\n" + "\n\n\n".join(formatted_emails)
-    
-    # Extract memory from email subjects/content
-    email_text = "\n".join([f"From: {e['from']} | Subject: {e['subject']}" for e in emails])
-    from app.agent.memory_extractor import extract_and_store_memory
-    extract_and_store_memory(state, db, source="email", text=email_text)
-    
-    return state
+    return f"📧 Emails Received {day.capitalize()}\n\n" + "\n\n\n".join(formatted_emails)
 
-#------------- gmail yesterday ---------
-def gmail_yesterday_node(state: AgentState, config):
-    db = config.get("configurable", {}).get("db")
 
+def _email_memory_text(emails: list[dict]) -> str:
+    return "\n".join([f"From: {e['from']} | Subject: {e['subject']}" for e in emails])
+
+
+def _gmail_list_response(state: AgentState, db, days_ago: int, day: str) -> list[dict]:
+    """Fetch the day's emails and set the list response. Returns the emails."""
     emails = fetch_gmail_messages_for_date(
         user_id=state.user_id,
         db=db,
-        days_ago=1
+        days_ago=days_ago
     )
 
     if not emails:
-        state.response = "You didn’t receive any emails yesterday."
-        return state
+        state.response = f"You didn’t receive any emails {day}."
+        return []
 
-    # Format emails professionally - each email clearly separated with better spacing
-    formatted_emails = []
-    for i, e in enumerate(emails, 1):
-        subject = e.get('subject', 'No Subject')
-        sender = e.get('from', 'Unknown Sender')
-        # Clean up sender (remove email if it's in brackets)
-        if '<' in sender:
-            sender = sender.split('<')[0].strip().strip('"').strip("'")
-        # Each email on its own block with clear separation
-        formatted_emails.append(f"{i}. {subject}\n   From: {sender}")
+    state.response = _format_email_list(emails, day)
+    return emails
+
+
+def gmail_today_node(state: AgentState, config):
+    db = config.get("configurable", {}).get("db")
+
+    emails = _gmail_list_response(state, db, days_ago=0, day="today")
     
-    # Join with triple newlines for maximum visual separation between emails
-    state.response = "📧 Emails Received Yesterday\n\n" + "\n\n\n".join(formatted_emails)
+    # Extract memory from email subjects/content
+    if emails:
+        _enqueue_memory(state, config, source="email", text=_email_memory_text(emails))
+    
+    return state
+
+
+def gmail_yesterday_node(state: AgentState, config):
+    db = config.get("configurable", {}).get("db")
+
+    emails = _gmail_list_response(state, db, days_ago=1, day="yesterday")
     
     # Extract memory from email subjects/content
-    email_text = "\n".join([f"From: {e['from']} | Subject: {e['subject']}" for e in emails])
-    from app.agent.memory_extractor import extract_and_store_memory
-    extract_and_store_memory(state, db, source="email", text=email_text)
+    if emails:
+        _enqueue_memory(state, config, source="email", text=_email_memory_text(emails))
     
     return state
 
-# -------------- gmail today summary -----------
-def gmail_today_summary_node(state: AgentState, config):
+
+async def _agmail_list_node(state: AgentState, config, days_ago: int, day: str):
     db = config.get("configurable", {}).get("db")
 
+    _progress(f"fetching {day}'s emails")
+    emails = await run_google_io(_gmail_list_response, state, db, days_ago, day)
+
+    if emails:
+        await _aenqueue_memory(state, config, source="email", text=_email_memory_text(emails))
+
+    return state
+
+
+async def agmail_today_node(state: AgentState, config):
+    return await _agmail_list_node(state, config, days_ago=0, day="today")
+
+
+async def agmail_yesterday_node(state: AgentState, config):
+    return await _agmail_list_node(state, config, days_ago=1, day="yesterday")
+
+# -------------- gmail today summary -----------
+def _fetch_summary_inputs(state: AgentState, config) -> list[dict]:
+    """Today's emails, then the user's memory into state, both on the request's session."""
     emails = fetch_gmail_messages_for_date(
         user_id=state.user_id,
-        db=db,
+        db=config.get("configurable", {}).get("db"),
         days_ago=0,
         max_results=15
     )
+    state.memory = _load_memory(state, config)
+    return emails
 
-    if not emails:
-        state.response = "You didn’t receive any emails today."
-        return state
 
+def _summary_email_text(emails: list[dict]) -> str:
     # Format emails for LLM processing (cleaner format)
     email_list = []
     for e in emails:
@@ -511,8 +559,10 @@ def gmail_today_summary_node(state: AgentState, config):
         if '<' in sender:
             sender = sender.split('<')[0].strip().strip('"').strip("'")
         email_list.append(f"Subject: {subject}\nFrom: {sender}")
-    email_text = "\n\n".join(email_list)
+    return "\n\n".join(email_list)
+
 
+def _summary_messages(state: AgentState, email_text: str) -> list:
     # Format memory for context
     memory_text = ""
     if state.memory:
@@ -528,61 +578,125 @@ def gmail_today_summary_node(state: AgentState, config):
         + f"\n\nEmails:\n{email_text}"
     )
 
-    try:
-        # ChatGoogleGenerativeAI can be finicky with SystemMessage-only inputs in some versions.
-        # Use a HumanMessage prompt for reliability.
-        summary = llm.invoke([HumanMessage(content=prompt)])
-        
-        # Format the summary nicely
-        summary_text = summary.content.strip()
-        
-        # Add header and formatting
-        state.response = (
-            "⭐ Important Emails Summary\n\n"
-            + summary_text
-            + "\n\n"
-            f"📊 Based on {len(emails)} emails received today"
+    # ChatGoogleGenerativeAI can be finicky with SystemMessage-only inputs in some versions.
+    # Use a HumanMessage prompt for reliability.
+    return [HumanMessage(content=prompt)]
+
+
+def _summary_response(summary_text: str, email_count: int) -> str:
+    # Add header and formatting
+    return (
+        "⭐ Important Emails Summary\n\n"
+        + summary_text.strip()
+        + "\n\n"
+        f"📊 Based on {email_count} emails received today"
+    )
+
+
+def _summary_error_response(e: Exception) -> str:
+    # Handle rate limit errors gracefully
+    if is_rate_limited(e):
+        return (
+            "⚠️ I've hit the daily rate limit for AI requests (free tier: 20 requests/day).\n\n"
+            "I can still show you your emails, but I can't summarize them right now.\n"
+            "Please wait a few minutes and try again, or ask: 'What emails did I receive today?'\n"
+            "for a simple list instead."
         )
-    except ChatGoogleGenerativeAIError as e:
-        # Handle rate limit errors gracefully
-        if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e) or "quota" in str(e).lower():
-            state.response = (
-                "⚠️ I've hit the daily rate limit for AI requests (free tier: 20 requests/day).\n\n"
-                "I can still show you your emails, but I can't summarize them right now.\n"
-                "Please wait a few minutes and try again, or ask: 'What emails did I receive today?'\n"
-                "for a simple list instead."
-            )
-        else:
-            state.response = (
-                "I couldn't generate the important-email summary right now (AI service error).\n\n"
-                "You can still ask:\n"
-                "- “What emails did I receive today?”\n\n"
-                f"Details: {type(e).__name__}"
-            )
-        return state
-    except Exception as e:
-        state.response = (
-            "I couldn't generate the important-email summary right now (LLM error).\n\n"
+    if isinstance(e, ChatGoogleGenerativeAIError):
+        return (
+            "I couldn't generate the important-email summary right now (AI service error).\n\n"
             "You can still ask:\n"
             "- “What emails did I receive today?”\n\n"
             f"Details: {type(e).__name__}"
         )
+    return (
+        "I couldn't generate the important-email summary right now (LLM error).\n\n"
+        "You can still ask:\n"
+        "- “What emails did I receive today?”\n\n"
+        f"Details: {type(e).__name__}"
+    )
+
+
+def gmail_today_summary_node(state: AgentState, config):
+    emails = _fetch_summary_inputs(state, config)
+
+    if not emails:
+        state.response = "You didn’t receive any emails today."
+        return state
+
+    email_text = _summary_email_text(emails)
+
+    try:
+        summary_text = cached_invoke(
+            summary_llm,
+            _summary_messages(state, email_text),
+            node="gmail_today_summary",
+            ttl=LLM_CACHE_TTL_SUMMARY,
+            user_id=state.user_id
+        )
+        state.response = _summary_response(summary_text, len(emails))
+    except Exception as e:
+        state.response = _summary_error_response(e)
         return state
     
     # Extract memory from email content
-    from app.agent.memory_extractor import extract_and_store_memory
-    extract_and_store_memory(state, db, source="email", text=email_text)
+    _enqueue_memory(state, config, source="email", text=email_text)
     
     return state
 
+
+async def agmail_today_summary_node(state: AgentState, config):
+    _progress("fetching today's emails")
+    emails = await run_google_io(_fetch_summary_inputs, state, config)
+
+    if not emails:
+        state.response = "You didn’t receive any emails today."
+        return state
+
+    email_text = _summary_email_text(emails)
+
+    try:
+        _progress("summarizing emails")
+        summary_text = await _astream_llm(
+            summary_llm,
+            _summary_messages(state, email_text),
+            node="gmail_today_summary",
+            ttl=LLM_CACHE_TTL_SUMMARY,
+            user_id=state.user_id
+        )
+        state.response = _summary_response(summary_text, len(emails))
+    except Exception as e:
+        state.response = _summary_error_response(e)
+        return state
+
+    await _aenqueue_memory(state, config, source="email", text=email_text)
+
+    return state
+
 from app.tools.calendar_write_tool import create_calendar_event
+from app.tools.calendar_read_tool import fetch_busy_index
 from datetime import datetime, timedelta
 
+FREE_SLOT_SUGGESTIONS = 3
+
+
+def _free_slot_suggestions(busy, start: datetime, end: datetime) -> str:
+    """Nearest free alternatives of the same length on the requested day."""
+    day_start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    window = (max(day_start, datetime.utcnow()), day_start + timedelta(days=1))
+    slots = busy.find_free_slots(end - start, window, near=start, limit=FREE_SLOT_SUGGESTIONS)
+    if not slots:
+        return "There are no free slots of that length left that day. Please choose a different time."
+
+    lines = [f"- {s.strftime('%I:%M %p')} - {e.strftime('%I:%M %p')}" for s, e in sorted(slots)]
+    return "Please choose a different time. Free slots that day:\n" + "\n".join(lines)
+
+
 def calendar_create_node(state: AgentState, config):
     db = config.get("configurable", {}).get("db")
 
-    # Extract details from message
-    title = extract_meeting_title(state.message)
+    # Details parsed from the message
+    title = _parsed(state).title
     start_time = state.start_time
     end_time = state.end_time
     
@@ -620,9 +734,22 @@ def calendar_create_node(state: AgentState, config):
         )
         return state
 
-    # Check for clashes in the next week window (good enough for tomorrow/today scheduling).
+    # Validate time range before checking conflicts or creating
+    if state.end_time <= state.start_time:
+        state.response = (
+            "❌ Invalid time range: The end time must be after the start time.\n\n"
+            f"Start: {state.start_time.strftime('%I:%M %p')}\n"
+            f"End: {state.end_time.strftime('%I:%M %p')}\n\n"
+            "Please provide a valid time range, for example:\n"
+            "- 'from 9am to 10am'\n"
+            "- 'from 11pm to 12am' (midnight)\n"
+            "- 'from 2pm to 3pm'"
+        )
+        return state
+
+    # Check for clashes against the whole calendar via the busy-time index.
     try:
-        upcoming = fetch_upcoming_events(user_id=state.user_id, db=db, max_results=15)
+        busy = fetch_busy_index(user_id=state.user_id, db=db)
     except Exception as e:
         state.response = (
             "I couldn't check your calendar for conflicts (Google Calendar API error/timeout).\n\n"
@@ -632,17 +759,13 @@ def calendar_create_node(state: AgentState, config):
 
     clashes: list[str] = []
     same_exact = False
-    for ev in upcoming or []:
-        ev_start, ev_end = _event_time_range(ev)
-        if not ev_start or not ev_end:
-            continue
-        if _overlaps(state.start_time, state.end_time, ev_start, ev_end):
-            ev_title = ev.get("summary") or "Untitled meeting"
-            ev_start_raw = (ev.get("start") or {}).get("dateTime") or (ev.get("start") or {}).get("date") or "unknown time"
-            clashes.append(f"- {ev_title} at {ev_start_raw}")
-            if ev_title.strip().lower() == title.strip().lower():
-                # If same title and overlapping, treat as likely duplicate.
-                same_exact = True
+    for ev in busy.overlapping(state.start_time, state.end_time):
+        ev_title = ev.get("summary") or "Untitled meeting"
+        ev_start_raw = (ev.get("start") or {}).get("dateTime") or (ev.get("start") or {}).get("date") or "unknown time"
+        clashes.append(f"- {ev_title} at {ev_start_raw}")
+        if ev_title.strip().lower() == title.strip().lower():
+            # If same title and overlapping, treat as likely duplicate.
+            same_exact = True
 
     if same_exact:
         state.response = (
@@ -655,23 +778,11 @@ def calendar_create_node(state: AgentState, config):
         state.response = (
             "That time conflicts with existing events:\n"
             + "\n".join(clashes)
-            + "\n\nPlease choose a different time."
+            + "\n\n"
+            + _free_slot_suggestions(busy, state.start_time, state.end_time)
         )
         return state
 
-    # Validate time range before creating
-    if state.end_time <= state.start_time:
-        state.response = (
-            "❌ Invalid time range: The end time must be after the start time.\n\n"
-            f"Start: {state.start_time.strftime('%I:%M %p')}\n"
-            f"End: {state.end_time.strftime('%I:%M %p')}\n\n"
-            "Please provide a valid time range, for example:\n"
-            "- 'from 9am to 10am'\n"
-            "- 'from 11pm to 12am' (midnight)\n"
-            "- 'from 2pm to 3pm'"
-        )
-        return state
-    
     try:
         event = create_calendar_event(
             user_id=state.user_id,
@@ -704,7 +815,7 @@ def calendar_create_node(state: AgentState, config):
     date_str = state.start_time.strftime("%B %d, %Y")
     
     state.response = (
-        f"✅ Meeting Scheduled Successfully!\n\n"
+        f"{MEETING_SCHEDULED}\n\n"
         f"📅 {title}\n"
         f"🕐 {start_formatted} - {end_formatted}\n"
         f"📆 {date_str}\n\n"
@@ -717,29 +828,312 @@ def calendar_create_node(state: AgentState, config):
 
 
 
+# ---------- ASYNC TOOL NODES ----------
+# These nodes only do blocking Google API work, so the async variants run the
+# sync node on the dedicated Google I/O pool instead of duplicating it.
+async def acalendar_today_node(state: AgentState, config):
+    _progress("fetching calendar")
+    return await run_google_io(calendar_today_node, state, config)
+
+
+async def acalendar_tomorrow_node(state: AgentState, config):
+    _progress("fetching calendar")
+    return await run_google_io(calendar_tomorrow_node, state, config)
+
+
+async def acalendar_create_node(state: AgentState, config):
+    _progress("checking calendar")
+    return await run_google_io(calendar_create_node, state, config)
+
+
+# ---------- DAILY BRIEFING ----------
+# Calendar, Gmail and memory are fetched by three branches that run
+# concurrently and are joined by one LLM call, so the briefing takes as long
+# as its slowest branch rather than the sum of all three. The Google branches
+# each have their own deadline and session and report "unavailable" instead of
+# failing the briefing; a Google call that misses its deadline finishes on the
+# I/O pool in the background. The memory branch is a local lookup on the
+# request's session, which is why it has no deadline: it must be done with
+# the session before the join uses it again. Branches return only the keys
+# they own, since parallel writes to the same state key are rejected.
+BRIEFING_BRANCHES = ("briefing_calendar", "briefing_gmail", "briefing_memory")
+
+briefing_llm = get_llm("daily_briefing", INTERACTIVE)
+
+
+def _fetch_briefing_events(user_id, db) -> list[dict]:
+    now = datetime.utcnow()
+    return fetch_events_between(
+        user_id=user_id,
+        db=db,
+        start=now,
+        end=now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1),
+        max_results=10
+    )
+
+
+def _fetch_briefing_emails(user_id, db) -> list[dict]:
+    return fetch_gmail_messages_for_date(user_id=user_id, db=db, days_ago=0, max_results=15)
+
+
+def _branch_failed(branch: str, e: BaseException):
+    outcome = "timeout" if isinstance(e, (TimeoutError, FutureTimeoutError)) else "error"
+    metrics.inc("briefing_branch_total", branch=branch, outcome=outcome)
+    print(f"⚠️ Briefing {branch} branch {outcome}: {type(e).__name__}: {e}")
+
+
+def _run_branch(branch: str, timeout: float, fn, /, *args):
+    """fn(*args) on the Google I/O pool, or None if it fails or misses its deadline."""
+    future = google_io_executor.submit(contextvars.copy_context().run, fn, *args)
+    try:
+        result = future.result(timeout=timeout)
+    except Exception as e:
+        _branch_failed(branch, e)
+        return None
+    metrics.inc("briefing_branch_total", branch=branch, outcome="ok")
+    return result
+
+
+async def _arun_branch(branch: str, timeout: float, awaitable):
+    try:
+        result = await asyncio.wait_for(awaitable, timeout)
+    except Exception as e:
+        _branch_failed(branch, e)
+        return None
+    metrics.inc("briefing_branch_total", branch=branch, outcome="ok")
+    return result
+
+
+def briefing_calendar_node(state: AgentState, config):
+    events = _run_branch(
+        "calendar", BRIEFING_CALENDAR_TIMEOUT_SECONDS, _in_own_session, _fetch_briefing_events, state.user_id
+    )
+    return {"briefing_events": events}
+
+
+def briefing_gmail_node(state: AgentState, config):
+    emails = _run_branch(
+        "gmail", BRIEFING_GMAIL_TIMEOUT_SECONDS, _in_own_session, _fetch_briefing_emails, state.user_id
+    )
+    return {"briefing_emails": emails}
+
+
+def _load_briefing_memory(state: AgentState, config) -> list[dict]:
+    try:
+        memory = _load_memory(state, config)
+    except Exception as e:
+        config["configurable"]["db"].rollback()
+        _branch_failed("memory", e)
+        return []
+    metrics.inc("briefing_branch_total", branch="memory", outcome="ok")
+    return memory
+
+
+def briefing_memory_node(state: AgentState, config):
+    if config["configurable"]["db"] is None:
+        return {}
+    return {"memory": _load_briefing_memory(state, config)}
+
+
+async def abriefing_calendar_node(state: AgentState, config):
+    _progress("fetching calendar")
+    events = await _arun_branch(
+        "calendar",
+        BRIEFING_CALENDAR_TIMEOUT_SECONDS,
+        run_google_io(_in_own_session, _fetch_briefing_events, state.user_id),
+    )
+    return {"briefing_events": events}
+
+
+async def abriefing_gmail_node(state: AgentState, config):
+    _progress("fetching today's emails")
+    emails = await _arun_branch(
+        "gmail",
+        BRIEFING_GMAIL_TIMEOUT_SECONDS,
+        run_google_io(_in_own_session, _fetch_briefing_emails, state.user_id),
+    )
+    return {"briefing_emails": emails}
+
+
+async def abriefing_memory_node(state: AgentState, config):
+    if config["configurable"]["db"] is None:
+        return {}
+    return {"memory": await asyncio.to_thread(_load_briefing_memory, state, config)}
+
+
+def _event_line(e: dict) -> str:
+    start = e["start"].get("dateTime", e["start"].get("date"))
+    summary = e.get("summary", "Untitled meeting")
+    try:
+        if "T" in start:
+            dt = datetime.fromisoformat(start.replace("Z", "+00:00"))
+            return f"• {summary} at {dt.strftime('%I:%M %p')}"
+    except Exception:
+        pass
+    return f"• {summary} at {start}"
+
+
+def _briefing_sections(state: AgentState) -> tuple[str, str]:
+    """(meetings, emails) as prompt text; a failed branch reads as unavailable."""
+    if state.briefing_events is None:
+        meetings = "(calendar unavailable right now)"
+    else:
+        meetings = "\n".join(_event_line(e) for e in state.briefing_events) or "No more meetings today."
+
+    if state.briefing_emails is None:
+        emails = "(Gmail unavailable right now)"
+    else:
+        emails = _summary_email_text(state.briefing_emails) or "No emails received today."
+    return meetings, emails
+
+
+def _briefing_messages(state: AgentState) -> list:
+    memory_text = ""
+    if state.memory:
+        memory_items = [f"- {m['key']}: {m['value']}" for m in state.memory]
+        memory_text = f"\n\nUser's remembered preferences:\n" + "\n".join(memory_items)
+
+    meetings, emails = _briefing_sections(state)
+    prompt = (
+        "You are a Chief-of-Staff AI.\n"
+        "Write the user's briefing for today: first the meetings still ahead, "
+        "then the emails that need attention (work, deadlines, meetings, actions). "
+        "Be concise. If a source is unavailable, say so in one line.\n"
+        "Use the user's preferences when prioritizing."
+        + memory_text
+        + f"\n\nToday's meetings:\n{meetings}"
+        + f"\n\nToday's emails:\n{emails}"
+    )
+    return [HumanMessage(content=prompt)]
+
+
+def _briefing_unavailable(state: AgentState) -> bool:
+    if state.briefing_events is None and state.briefing_emails is None:
+        state.response = (
+            "I couldn't reach your calendar or Gmail for the briefing (Google API error/timeout).\n\n"
+            "Try:\n"
+            "- Click “Connect Google” again to refresh permissions\n"
+            "- Wait a moment and ask again"
+        )
+        return True
+    return False
+
+
+def _briefing_fallback(state: AgentState, e: Exception) -> str:
+    """Without the LLM, still show what was fetched."""
+    meetings, emails = _briefing_sections(state)
+    reason = "AI rate limit reached" if is_rate_limited(e) else f"AI service error: {type(e).__name__}"
+    return (
+        "🌅 Your Daily Briefing\n\n"
+        f"📅 Meetings\n{meetings}\n\n"
+        f"📧 Emails\n{emails}\n\n"
+        f"(I couldn't write a summary right now: {reason}.)"
+    )
+
+
+def _briefing_email_memory_text(state: AgentState) -> str | None:
+    return _summary_email_text(state.briefing_emails) if state.briefing_emails else None
+
+
+def daily_briefing_node(state: AgentState, config):
+    """Join: one LLM call over whatever the branches brought back."""
+    if _briefing_unavailable(state):
+        return state
+
+    try:
+        text = cached_invoke(
+            briefing_llm, _briefing_messages(state), node="daily_briefing", ttl=LLM_CACHE_TTL_SUMMARY, user_id=state.user_id
+        )
+        state.response = "🌅 Your Daily Briefing\n\n" + text.strip()
+    except Exception as e:
+        state.response = _briefing_fallback(state, e)
+        return state
+
+    email_text = _briefing_email_memory_text(state)
+    if email_text:
+        _enqueue_memory(state, config, source="email", text=email_text)
+    return state
+
+
+async def adaily_briefing_node(state: AgentState, config):
+    if _briefing_unavailable(state):
+        return state
+
+    try:
+        _progress("writing briefing")
+        text = await _astream_llm(
+            briefing_llm, _briefing_messages(state), node="daily_briefing", ttl=LLM_CACHE_TTL_SUMMARY, user_id=state.user_id
+        )
+        state.response = "🌅 Your Daily Briefing\n\n" + text.strip()
+    except Exception as e:
+        state.response = _briefing_fallback(state, e)
+        return state
+
+    email_text = _briefing_email_memory_text(state)
+    if email_text:
+        await _aenqueue_memory(state, config, source="email", text=email_text)
+    return state
+
+
 # ---------- GRAPH ----------
-def build_graph():
+SYNC_NODES = {
+    "parse_message": parse_message_node,
+    "intent_router": intent_router_node,
+    "calendar_today": calendar_today_node,
+    "calendar_tomorrow": calendar_tomorrow_node,
+    "gmail_today": gmail_today_node,
+    "gmail_yesterday": gmail_yesterday_node,
+    "gmail_today_summary": gmail_today_summary_node,
+    "calendar_create": calendar_create_node,
+    "briefing_calendar": briefing_calendar_node,
+    "briefing_gmail": briefing_gmail_node,
+    "briefing_memory": briefing_memory_node,
+    "daily_briefing": daily_briefing_node,
+    "chat": chat_node,
+    "extract_memory": extract_memory_node,
+}
+
+ASYNC_NODES = {
+    **SYNC_NODES,
+    "parse_message": aparse_message_node,
+    "calendar_today": acalendar_today_node,
+    "calendar_tomorrow": acalendar_tomorrow_node,
+    "gmail_today": agmail_today_node,
+    "gmail_yesterday": agmail_yesterday_node,
+    "gmail_today_summary": agmail_today_summary_node,
+    "calendar_create": acalendar_create_node,
+    "briefing_calendar": abriefing_calendar_node,
+    "briefing_gmail": abriefing_gmail_node,
+    "briefing_memory": abriefing_memory_node,
+    "daily_briefing": adaily_briefing_node,
+    "chat": achat_node,
+    "extract_memory": aextract_memory_node,
+}
+
+
+def build_graph(async_nodes: bool = False):
+    """
+    Build and compile the agent graph.
+    With async_nodes=True the graph must be run with ainvoke().
+    """
+    nodes = ASYNC_NODES if async_nodes else SYNC_NODES
     graph = StateGraph(AgentState)
 
-    graph.add_node("load_memory", load_memory_node)
-    graph.add_node("intent_router", intent_router_node)
-    graph.add_node("calendar_today", calendar_today_node)
-    graph.add_node("calendar_tomorrow", calendar_tomorrow_node)
-    graph.add_node("gmail_today", gmail_today_node)
-    graph.add_node("gmail_yesterday", gmail_yesterday_node)
-    graph.add_node("gmail_today_summary", gmail_today_summary_node)
-    graph.add_node("calendar_create", calendar_create_node)
-    graph.add_node("chat", chat_node)
-    graph.add_node("extract_memory", extract_memory_node)
+    # Every node is timed per node and intent (graph_node_seconds).
+    for name, node in nodes.items():
+        graph.add_node(name, traced_node(name, node))
 
-    graph.set_entry_point("load_memory")
+    graph.set_entry_point("parse_message")
 
-    graph.add_edge("load_memory", "intent_router")
+    graph.add_edge("parse_message", "intent_router")
 
+    # Routing needs only the parsed message; memory is loaded by the nodes that use it.
+    # The briefing fans out to its parallel branches.
     graph.add_conditional_edges(
         "intent_router",
-        lambda state: state.intent,
+        lambda state: list(BRIEFING_BRANCHES) if state.intent == "daily_briefing" else state.intent,
         {
+            **{branch: branch for branch in BRIEFING_BRANCHES},
             "calendar_today": "calendar_today",
             "calendar_tomorrow": "calendar_tomorrow",
             "calendar_create": "calendar_create", 
@@ -750,7 +1144,7 @@ def build_graph():
             "unsupported": "chat",
         }
     )
-
+    graph.add_edge(list(BRIEFING_BRANCHES), "daily_briefing")
 
     # Add memory extraction to all nodes that process user data
     graph.add_edge("calendar_today", END)
@@ -759,7 +1153,60 @@ def build_graph():
     graph.add_edge("gmail_today", END)
     graph.add_edge("gmail_yesterday", END)
     graph.add_edge("gmail_today_summary", END)
-    graph.add_edge("chat", "extract_memory")
+    graph.add_edge("daily_briefing", END)
+    # A scheduling follow-up resolved by chat goes on to calendar_create.
+    graph.add_conditional_edges(
+        "chat",
+        lambda state: "calendar_create" if state.intent == "calendar_create" else "extract_memory",
+        {"calendar_create": "calendar_create", "extract_memory": "extract_memory"},
+    )
     graph.add_edge("extract_memory", END)
 
     return graph.compile()
+
+
+# ---------- COMPILED GRAPH REGISTRY ----------
+# Compiling the StateGraph is pure overhead per request, so the compiled graph
+# is built once per process and shared. Compiled graphs hold no per-run state
+# (there is no checkpointer), so concurrent invoke() calls are safe.
+WARMUP_USER_ID = "00000000-0000-0000-0000-000000000000"
+
+_compiled_graphs: dict[bool, object] = {}
+_compiled_graph_lock = threading.Lock()
+
+
+def get_compiled_graph(async_nodes: bool = False):
+    """Return the process-wide compiled graph, building it on first use."""
+    graph = _compiled_graphs.get(async_nodes)
+    if graph is None:
+        with _compiled_graph_lock:
+            graph = _compiled_graphs.get(async_nodes)
+            if graph is None:
+                graph = build_graph(async_nodes=async_nodes)
+                _compiled_graphs[async_nodes] = graph
+    return graph
+
+
+def _warmup_input():
+    # Routes to calendar_create with no title/time, which answers without
+    # touching the database, Google APIs or the LLM.
+    return (
+        AgentState(user_id=WARMUP_USER_ID, message="schedule a meeting"),
+        {"configurable": {"db": None}},
+    )
+
+
+def warm_graph():
+    """Build the shared sync graph and push one dry run through it."""
+    graph = get_compiled_graph()
+    state, config = _warmup_input()
+    graph.invoke(state, config=config)
+    return graph
+
+
+async def awarm_graph():
+    """Build the shared async graph and push one dry run through it."""
+    graph = get_compiled_graph(async_nodes=True)
+    state, config = _warmup_input()
+    await graph.ainvoke(state, config=config)
+    return graph
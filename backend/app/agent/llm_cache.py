@@ -0,0 +1,172 @@
+"""
+Content-addressed cache for LLM replies.
+
+Keyed by a hash of the model, its sampling settings and the exact messages,
+so a repeated prompt (e.g. summarizing an unchanged inbox) is answered
+without a Gemini call. Entries live in a process-local LRU and, with
+LLM_CACHE_PERSIST=true, in the llm_cache table so they survive restarts and
+are shared across workers. TTLs are chosen per call site.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from app.core import metrics
+from app.core.config import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_PERSIST
+
+
+def cache_key(llm, messages: list) -> str:
+    payload = {
+        "model": getattr(llm, "model", type(llm).__name__),
+        "temperature": getattr(llm, "temperature", None),
+        "messages": [[m.type, m.content] for m in messages],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class LLMCache:
+    """Thread-safe LRU of key -> (expires_at monotonic, text)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, text: str, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+llm_cache = LLMCache(LLM_CACHE_MAX_ENTRIES)
+
+
+# ---------- Postgres tier ----------
+def _load_persisted(key: str) -> tuple[str, float] | None:
+    """(text, seconds left) from the llm_cache table, or None if absent/expired."""
+    from app.db.database import SessionLocal
+    from app.db.models import LLMCacheEntry
+
+    db = SessionLocal()
+    try:
+        entry = db.get(LLMCacheEntry, key)
+        if entry is None:
+            return None
+        ttl = (entry.expires_at - datetime.utcnow()).total_seconds()
+        if ttl <= 0:
+            db.delete(entry)
+            db.commit()
+            return None
+        return entry.response, ttl
+    finally:
+        db.close()
+
+
+def _persist(key: str, text: str, ttl: float):
+    from app.db.database import SessionLocal
+    from app.db.models import LLMCacheEntry
+
+    db = SessionLocal()
+    try:
+        db.merge(LLMCacheEntry(
+            key=key,
+            response=text,
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl),
+        ))
+        db.commit()
+    except Exception as e:
+        # The in-process tier still has the entry.
+        db.rollback()
+        print(f"⚠️ LLM cache write failed: {type(e).__name__}: {e}")
+    finally:
+        db.close()
+
+
+def _lookup(key: str, node: str) -> str | None:
+    text = llm_cache.get(key)
+    if text is None and LLM_CACHE_PERSIST:
+        persisted = _load_persisted(key)
+        if persisted is not None:
+            text, ttl = persisted
+            llm_cache.put(key, text, ttl)
+    metrics.inc("llm_cache_requests_total", node=node, result="miss" if text is None else "hit")
+    return text
+
+
+def _store(key: str, text: str, ttl: float):
+    llm_cache.put(key, text, ttl)
+    if LLM_CACHE_PERSIST:
+        _persist(key, text, ttl)
+
+
+# ---------- call-site helpers ----------
+def cached_invoke(llm, messages: list, *, node: str, ttl: float, user_id=None) -> str:
+    """llm.invoke(messages).text, answered from the cache when the same prompt was seen within ttl."""
+    key = cache_key(llm, messages)
+    text = _lookup(key, node)
+    if text is None:
+        text = llm.invoke(messages, user_id=user_id).text
+        if text:
+            _store(key, text, ttl)
+    return text
+
+
+async def acached_stream(llm, messages: list, *, node: str, ttl: float, user_id=None) -> str:
+    """
+    Streaming variant: on a miss the reply is streamed token by token (so
+    /chat/stream forwards it) and cached once complete; a hit returns at once.
+    """
+    key = cache_key(llm, messages)
+    if LLM_CACHE_PERSIST:
+        text = await asyncio.to_thread(_lookup, key, node)
+    else:
+        text = _lookup(key, node)
+    if text is not None:
+        return text
+
+    parts = []
+    async for chunk in llm.astream(messages, user_id=user_id):
+        parts.append(chunk.text)
+    text = "".join(parts)
+
+    if not text:
+        return text
+    if LLM_CACHE_PERSIST:
+        await asyncio.to_thread(_store, key, text, ttl)
+    else:
+        _store(key, text, ttl)
+    return text
+
+
+def cache_hit_rates() -> dict[str, float]:
+    """Hit rate per node since process start."""
+    rates = {}
+    for (name, labels), value in metrics.snapshot()["counters"].items():
+        if name != "llm_cache_requests_total":
+            continue
+        labels = dict(labels)
+        hits, total = rates.get(labels["node"], (0, 0))
+        rates[labels["node"]] = (hits + (value if labels["result"] == "hit" else 0), total + value)
+    return {node: hits / total for node, (hits, total) in rates.items() if total}
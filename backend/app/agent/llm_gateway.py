@@ -0,0 +1,263 @@
+"""
+Single entry point for Gemini calls.
+
+Owns the one ChatGoogleGenerativeAI client and puts every call through:
+- a token bucket per process and one per user (requests per minute)
+- priorities: interactive calls (chat, summaries) wait for a token; background
+  calls (memory extraction) only run while the bucket is above a reserve and
+  are shed otherwise, so they give way before interactive work sees a 429
+- a cooldown after Gemini reports quota exhaustion, during which background
+  work is shed and the bucket is drained
+- retries with full-jitter exponential backoff for quota and transient errors
+- per-call latency, outcome and token metrics
+
+Call sites get a handle with get_llm(caller, priority) that behaves like the
+chat model (invoke / astream), plus optional user_id.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.core import metrics, tracing
+from app.core.config import (
+    LLM_BACKGROUND_RESERVE,
+    LLM_MAX_RETRIES,
+    LLM_MAX_WAIT_SECONDS,
+    LLM_QUOTA_COOLDOWN_SECONDS,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_USER_REQUESTS_PER_MINUTE,
+)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+# Retries are done here, with awareness of the shared quota; the SDK makes one attempt.
+client = ChatGoogleGenerativeAI(
+    model="gemini-2.5-flash",
+    temperature=0,
+    max_retries=1,
+)
+
+
+class LLMThrottled(Exception):
+    """The call was not sent: no quota available within the caller's budget."""
+
+
+def is_rate_limited(e: Exception) -> bool:
+    """Gemini quota errors, or calls the gateway refused to send."""
+    if isinstance(e, LLMThrottled):
+        return True
+    text = str(e)
+    return (
+        "429" in text
+        or "RESOURCE_EXHAUSTED" in text
+        or "quota" in text.lower()
+        or type(e).__name__ in ("ResourceExhausted", "TooManyRequests")
+    )
+
+
+def _is_transient(e: Exception) -> bool:
+    text = str(e)
+    return (
+        any(code in text for code in ("500", "502", "503", "504", "UNAVAILABLE", "DEADLINE_EXCEEDED"))
+        or isinstance(e, (TimeoutError, ConnectionError))
+    )
+
+
+# ---------- token buckets ----------
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, keep: float = 0) -> float:
+        """Take a token leaving at least `keep` behind; otherwise return seconds until possible."""
+        with self.lock:
+            self._refill()
+            if self.tokens - 1 >= keep:
+                self.tokens -= 1
+                return 0.0
+            return (keep + 1 - self.tokens) / self.rate
+
+    def give_back(self):
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def drain(self):
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0)
+
+
+_process_bucket = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+_user_buckets: dict[str, TokenBucket] = {}
+_user_buckets_guard = threading.Lock()
+# A bucket untouched for a minute has refilled to capacity, i.e. it is the same
+# as a new one, so idle buckets are swept at most once per interval.
+USER_BUCKET_IDLE_SECONDS = 60.0
+_next_sweep = 0.0
+_cooldown_until = 0.0
+
+
+def _sweep_idle_buckets(now: float):
+    # Caller holds _user_buckets_guard.
+    for key in [k for k, bucket in _user_buckets.items() if now - bucket.updated >= USER_BUCKET_IDLE_SECONDS]:
+        del _user_buckets[key]
+    metrics.set_gauge("llm_gateway_user_buckets", len(_user_buckets))
+
+
+def _user_bucket(user_id: str) -> TokenBucket:
+    global _next_sweep
+    now = time.monotonic()
+    with _user_buckets_guard:
+        if now >= _next_sweep:
+            _sweep_idle_buckets(now)
+            _next_sweep = now + USER_BUCKET_IDLE_SECONDS
+        bucket = _user_buckets.get(str(user_id))
+        if bucket is None:
+            bucket = _user_buckets[str(user_id)] = TokenBucket(LLM_USER_REQUESTS_PER_MINUTE)
+        return bucket
+
+
+def _try_acquire(user_id, priority: str) -> float:
+    """0 if the call may go now, else seconds to wait before asking again."""
+    cooldown = _cooldown_until - time.monotonic()
+    if cooldown > 0 and priority == BACKGROUND:
+        return cooldown
+
+    keep = _process_bucket.capacity * LLM_BACKGROUND_RESERVE if priority == BACKGROUND else 0
+    user_bucket = _user_bucket(user_id) if user_id is not None else None
+    if user_bucket is not None:
+        wait = user_bucket.take()
+        if wait:
+            return wait
+    wait = _process_bucket.take(keep)
+    if wait and user_bucket is not None:
+        user_bucket.give_back()
+    return wait
+
+
+def _admission(caller: str, user_id, priority: str, waited: float) -> float:
+    """Seconds to sleep before retrying admission; raises once the caller's budget is spent."""
+    wait = _try_acquire(user_id, priority)
+    if not wait:
+        return 0.0
+    if priority == BACKGROUND or waited + wait > LLM_MAX_WAIT_SECONDS:
+        metrics.inc("llm_calls_total", caller=caller, priority=priority, outcome="throttled")
+        raise LLMThrottled(f"LLM quota exhausted for {caller}; retry in {wait:.1f}s")
+    return wait
+
+
+def _on_error(e: Exception, caller: str, attempt: int) -> float:
+    """Backoff before the next attempt, or re-raise if the error is final."""
+    global _cooldown_until
+    if is_rate_limited(e):
+        # Everyone shares the quota: stop background work and empty the bucket.
+        _cooldown_until = max(_cooldown_until, time.monotonic() + LLM_QUOTA_COOLDOWN_SECONDS)
+        _process_bucket.drain()
+    elif not _is_transient(e):
+        raise e
+    if attempt >= LLM_MAX_RETRIES:
+        raise e
+    metrics.inc("llm_retries_total", caller=caller)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _record(caller: str, priority: str, started: float, outcome: str, usage: dict | None):
+    metrics.inc("llm_calls_total", caller=caller, priority=priority, outcome=outcome)
+    tracing.observe_dependency("gemini", caller, time.monotonic() - started)
+    if usage:
+        metrics.inc("llm_tokens_total", usage.get("input_tokens", 0), caller=caller, kind="input")
+        metrics.inc("llm_tokens_total", usage.get("output_tokens", 0), caller=caller, kind="output")
+
+
+def _add_usage(total: dict | None, usage: dict | None) -> dict | None:
+    if not usage:
+        return total
+    total = total or {"input_tokens": 0, "output_tokens": 0}
+    total["input_tokens"] += usage.get("input_tokens", 0)
+    total["output_tokens"] += usage.get("output_tokens", 0)
+    return total
+
+
+# ---------- call-site handle ----------
+class GatewayLLM:
+    """What call sites hold instead of a chat model; every call goes through the gateway."""
+
+    def __init__(self, caller: str, priority: str = INTERACTIVE):
+        self.caller = caller
+        self.priority = priority
+
+    @property
+    def model(self):
+        return getattr(client, "model", type(client).__name__)
+
+    @property
+    def temperature(self):
+        return getattr(client, "temperature", None)
+
+    def invoke(self, messages: list, *, user_id=None):
+        waited, attempt = 0.0, 0
+        while True:
+            wait = _admission(self.caller, user_id, self.priority, waited)
+            if wait:
+                time.sleep(wait)
+                waited += wait
+                continue
+
+            started = time.monotonic()
+            try:
+                response = client.invoke(messages)
+            except Exception as e:
+                _record(self.caller, self.priority, started, "error", None)
+                time.sleep(_on_error(e, self.caller, attempt))
+                attempt += 1
+                continue
+            _record(self.caller, self.priority, started, "ok", getattr(response, "usage_metadata", None))
+            return response
+
+    async def astream(self, messages: list, *, user_id=None):
+        waited, attempt = 0.0, 0
+        while True:
+            wait = _admission(self.caller, user_id, self.priority, waited)
+            if wait:
+                await asyncio.sleep(wait)
+                waited += wait
+                continue
+
+            started = time.monotonic()
+            usage, streamed = None, False
+            try:
+                async for chunk in client.astream(messages):
+                    streamed = True
+                    usage = _add_usage(usage, getattr(chunk, "usage_metadata", None))
+                    yield chunk
+            except Exception as e:
+                _record(self.caller, self.priority, started, "error", usage)
+                if streamed:
+                    # Part of the reply already reached the client; do not repeat it.
+                    raise
+                await asyncio.sleep(_on_error(e, self.caller, attempt))
+                attempt += 1
+                continue
+            _record(self.caller, self.priority, started, "ok", usage)
+            return
+
+
+def get_llm(caller: str, priority: str = INTERACTIVE) -> GatewayLLM:
+    return GatewayLLM(caller, priority)
@@ -1,31 +1,67 @@
+from datetime import datetime
+import re
+import uuid
+
 from sqlalchemy.orm import Session
+
+from app.agent.memory_index import get_memory_index, note_saved
+from app.core.config import MEMORY_TOKEN_BUDGET, MEMORY_TOP_K
+from app.db import repository
 from app.db.models import Memory
-import uuid
+
+
+def normalize_memory_key(key: str) -> str:
+    """'Preferred Meeting-Time ' -> 'preferred_meeting_time', so re-extracted facts collide."""
+    return re.sub(r"[\s\-]+", "_", key.strip().lower())
 
 
 def load_user_memory(db: Session, user_id: str):
-    """Load user memories from database. user_id can be UUID string or UUID object."""
+    """Load user memories from database, most recently updated first. user_id can be UUID string or UUID object."""
     user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
-    memories = db.query(Memory).filter(Memory.user_id == user_uuid).all()
+    memories = (
+        db.query(Memory.key, Memory.value)
+        .filter(Memory.user_id == user_uuid)
+        .order_by(Memory.updated_at.desc())
+        .all()
+    )
     return [{"key": m.key, "value": m.value} for m in memories]
 
 
-def save_user_memory(db: Session, user_id: str, facts: list, source: str = "chat"):
-    """Save user memories to database. user_id can be UUID string or UUID object."""
-    if not facts:
-        return
-    
+def load_relevant_memory(db: Session, user_id: str, query: str):
+    """The user's memories most relevant to `query`, top-K under the prompt token budget."""
+    return get_memory_index(db, user_id).search(query, MEMORY_TOP_K, MEMORY_TOKEN_BUDGET)
+
+
+def _memory_rows(user_id, facts: list, source: str) -> list[dict]:
+    """One row per normalized key; the last value per key wins (ON CONFLICT cannot touch a row twice)."""
     user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
-    
-    for fact in facts:
+    now = datetime.utcnow()
+    rows = {}
+    for fact in facts or []:
         if not fact.get("key") or not fact.get("value"):
             continue
-            
-        memory = Memory(
-            user_id=user_uuid,
-            key=fact["key"],
-            value=fact["value"],
-            source=source
-        )
-        db.add(memory)
+        key = normalize_memory_key(str(fact["key"]))
+        rows[key] = {
+            "user_id": user_uuid,
+            "key": key,
+            "value": str(fact["value"]),
+            "source": source,
+            "created_at": now,
+            "updated_at": now,
+        }
+    return list(rows.values())
+
+
+def save_user_memory(db: Session, user_id: str, facts: list, source: str = "chat"):
+    """
+    Upsert user memories: one row per (user_id, key), the latest value wins.
+    Written as a single INSERT ... ON CONFLICT DO UPDATE. user_id can be UUID string or UUID object.
+    """
+    rows = _memory_rows(user_id, facts, source)
+    if not rows:
+        return
+
+    db.execute(repository.memory_upsert_statement(db.get_bind().dialect.name, rows))
     db.commit()
+    note_saved(rows[0]["user_id"], rows)
+
@@ -1,17 +1,17 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
 from langchain_core.messages import HumanMessage
 import json
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0
-)
+from app.agent.llm_cache import cached_invoke
+from app.agent.llm_gateway import BACKGROUND, get_llm, is_rate_limited
+from app.core.config import LLM_CACHE_TTL_MEMORY
+
+# Background priority: shed first when Gemini quota runs low.
+llm = get_llm("memory_extractor", BACKGROUND)
 
 MEMORY_PROMPT = """
 You are a memory extraction engine.
 
-From the message below, extract long-term personal preferences or facts.
+From the message(s) below, extract long-term personal preferences or facts.
 Only extract things that would be useful later (preferences, dislikes, habits).
 
 Return ONLY valid JSON in this exact format:
@@ -21,54 +21,55 @@ Return ONLY valid JSON in this exact format:
 
 If nothing is worth remembering, return [].
 
-Message:
+Message(s):
 {message}
 """
 
 
-def extract_and_store_memory(state, db, source: str = "chat", text: str = None):
+def _parse_facts(content: str) -> list:
+    """Pull the JSON array of facts out of the model's reply."""
+    content = content.strip()
+
+    # Try to find JSON array in response
+    start = content.find("[")
+    end = content.rfind("]") + 1
+
+    if start == -1 or end == 0:
+        return []
+
+    return json.loads(content[start:end])
+
+
+def _report_extraction_error(e: Exception, source: str):
+    # Non-critical feature: the worker retries the batch later
+    if is_rate_limited(e):
+        print(f"⚠️ Memory extraction deferred ({source}): Rate limit reached")
+        return
+    print(f"⚠️ Memory extraction failed ({source}):", e)
+
+
+def extract_facts(texts: list[str], source: str = "chat", user_id=None) -> list:
     """
-    Extract and store memories from text.
-    
-    Args:
-        state: AgentState with user_id
-        db: Database session
-        source: "chat" or "email"
-        text: Text to extract from (defaults to state.message)
+    Extract facts from one or more texts with a single LLM call.
+    Several texts are sent as numbered messages in the same prompt.
+    Raises on LLM errors so the caller can retry.
     """
+    if len(texts) == 1:
+        message = texts[0]
+    else:
+        message = "\n\n".join(f"[{i}] {text}" for i, text in enumerate(texts, 1))
+
+    content = cached_invoke(
+        llm,
+        [HumanMessage(content=MEMORY_PROMPT.format(message=message))],
+        node="memory_extractor",
+        ttl=LLM_CACHE_TTL_MEMORY,
+        user_id=user_id
+    )
+
     try:
-        text_to_extract = text if text is not None else state.message
-        
-        response = llm.invoke([
-            HumanMessage(
-                content=MEMORY_PROMPT.format(message=text_to_extract)
-            )
-        ])
-
-        content = response.content.strip()
-
-        # Try to find JSON array in response
-        start = content.find("[")
-        end = content.rfind("]") + 1
-        
-        if start == -1 or end == 0:
-            return state
-
-        facts = json.loads(content[start:end])
-        
-        if not facts:
-            return state
-
-        from app.agent.memory import save_user_memory
-        save_user_memory(db, state.user_id, facts, source=source)
-
-    except ChatGoogleGenerativeAIError as e:
-        # Silently skip memory extraction if rate limited (non-critical feature)
-        if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e) or "quota" in str(e).lower():
-            print(f"⚠️ Memory extraction skipped ({source}): Rate limit reached")
-        else:
-            print(f"⚠️ Memory extraction failed ({source}):", e)
-    except Exception as e:
-        print(f"⚠️ Memory extraction failed ({source}):", e)
-
-    return state
+        return _parse_facts(content)
+    except ValueError as e:
+        # A malformed reply will not get better on retry.
+        _report_extraction_error(e, source)
+        return []
@@ -0,0 +1,196 @@
+import re
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import MEMORY_INDEX_MAX_USERS
+from app.db.models import Memory
+
+
+DIM = 512  # hashed feature space; 10k memories ~ 20 MB of float32 vectors
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# ---------- embedding ----------
+@lru_cache(maxsize=65536)
+def _feature(token: str) -> tuple[int, float]:
+    """Stable bucket and sign for a feature (crc32, unlike hash(), is not salted per process)."""
+    h = zlib.crc32(token.encode())
+    return h % DIM, 1.0 if h & 0x80000000 else -1.0
+
+
+def _features(text: str) -> list[str]:
+    features = []
+    for word in _WORD.findall(text.lower()):
+        features.append(word)
+        padded = f"<{word}>"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def embed(text: str) -> np.ndarray:
+    """Word + character-trigram hashing vectorizer, L2-normalized. Works fully offline."""
+    vector = np.zeros(DIM, dtype=np.float32)
+    for token in _features(text):
+        bucket, sign = _feature(token)
+        vector[bucket] += sign
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def memory_text(key: str, value: str) -> str:
+    return f"{key.replace('_', ' ')}: {value}"
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+# ---------- per-user index ----------
+class MemoryIndex:
+    """
+    A user's memories and their vectors, one row per key. Rows are updated in
+    place on upsert; the matrix grows by doubling.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys: list[str] = []
+        self.values: list[str] = []
+        self.rows: dict[str, int] = {}
+        self._vectors = np.zeros((16, DIM), dtype=np.float32)
+        self._stamps = np.zeros(16, dtype=np.int64)  # recency, breaks ties between equal scores
+        self._clock = 0
+        self.synced_at: datetime | None = None  # newest Memory.updated_at folded in
+
+    def __len__(self):
+        return len(self.keys)
+
+    def upsert(self, memories: list[dict]):
+        with self.lock:
+            for memory in memories:
+                key, value = memory["key"], memory["value"]
+                row = self.rows.get(key)
+                if row is None:
+                    row = len(self.keys)
+                    if row == len(self._vectors):
+                        self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+                        self._stamps = np.concatenate([self._stamps, np.zeros_like(self._stamps)])
+                    self.keys.append(key)
+                    self.values.append(value)
+                    self.rows[key] = row
+                elif self.values[row] == value:
+                    self._clock += 1
+                    self._stamps[row] = self._clock
+                    continue
+                self.values[row] = value
+                self._vectors[row] = embed(memory_text(key, value))
+                self._clock += 1
+                self._stamps[row] = self._clock
+
+    def search(self, query: str, k: int, token_budget: int) -> list[dict]:
+        """Up to k memories most similar to `query` whose combined size fits `token_budget`."""
+        with self.lock:
+            n = len(self.keys)
+            if n == 0:
+                return []
+
+            scores = self._vectors[:n] @ embed(query)
+            # Recency only reorders memories the query cannot tell apart.
+            scores += self._stamps[:n] / (self._clock + 1) * 1e-4
+
+            # Over-fetch so memories skipped by the budget can be replaced.
+            candidates = min(n, 2 * k)
+            top = np.argpartition(-scores, candidates - 1)[:candidates]
+            top = top[np.argsort(-scores[top])]
+
+            picked, used = [], 0
+            for row in top:
+                cost = estimate_tokens(memory_text(self.keys[row], self.values[row]))
+                if used + cost > token_budget:
+                    continue
+                picked.append({"key": self.keys[row], "value": self.values[row]})
+                used += cost
+                if len(picked) == k:
+                    break
+            return picked
+
+
+# LRU of per-user indexes, at most MEMORY_INDEX_MAX_USERS; a miss rebuilds from the database.
+_indexes: "OrderedDict[uuid.UUID, MemoryIndex]" = OrderedDict()
+_indexes_guard = threading.Lock()
+
+
+def _store_index(user_uuid: uuid.UUID, index: MemoryIndex):
+    # Caller holds _indexes_guard.
+    _indexes[user_uuid] = index
+    _indexes.move_to_end(user_uuid)
+    while len(_indexes) > MEMORY_INDEX_MAX_USERS:
+        _indexes.popitem(last=False)
+        metrics.inc("memory_index_evictions_total")
+
+
+def _load_rows(db: Session, user_uuid: uuid.UUID, since: datetime | None = None) -> list:
+    query = db.query(Memory.key, Memory.value).filter(Memory.user_id == user_uuid)
+    if since is not None:
+        query = query.filter(Memory.updated_at > since)
+    return query.order_by(Memory.updated_at).all()
+
+
+def _cached_index(user_uuid: uuid.UUID) -> MemoryIndex:
+    with _indexes_guard:
+        index = _indexes.get(user_uuid)
+        if index is None:
+            index = MemoryIndex()
+            _store_index(user_uuid, index)
+        else:
+            _indexes.move_to_end(user_uuid)
+        return index
+
+
+def _rebuild(user_uuid: uuid.UUID, rows: list, latest: datetime | None) -> MemoryIndex:
+    index = MemoryIndex()
+    index.upsert([{"key": r.key, "value": r.value} for r in rows])
+    index.synced_at = latest
+    with _indexes_guard:
+        _store_index(user_uuid, index)
+    return index
+
+
+def get_memory_index(db: Session, user_id) -> MemoryIndex:
+    """
+    The user's index, caught up with the database: only rows updated since the
+    last call are re-embedded; the index is rebuilt if rows were removed.
+    """
+    user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+    latest, count = db.query(func.max(Memory.updated_at), func.count(Memory.id)).filter(
+        Memory.user_id == user_uuid
+    ).one()
+
+    index = _cached_index(user_uuid)
+
+    if index.synced_at != latest:
+        rows = _load_rows(db, user_uuid, index.synced_at if len(index) else None)
+        index.upsert([{"key": r.key, "value": r.value} for r in rows])
+        index.synced_at = latest
+
+    if len(index) != count:
+        index = _rebuild(user_uuid, _load_rows(db, user_uuid), latest)
+
+    return index
+
+
+def note_saved(user_id, memories: list[dict]):
+    """Fold just-written memories into a cached index so the next turn sees them."""
+    user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+    index = _indexes.get(user_uuid)
+    if index is not None:
+        index.upsert(memories)
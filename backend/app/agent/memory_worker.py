@@ -0,0 +1,220 @@
+"""
+Background memory extraction.
+
+Request handlers only insert a row into memory_extraction_jobs (durable across
+restarts). A worker thread per process drains the table: it claims the
+oldest pending jobs of one user and source, coalesces identical texts, runs
+one LLM call for the whole batch and bulk-upserts the facts. Claims use
+FOR UPDATE SKIP LOCKED so several processes can drain the same table.
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import (
+    MEMORY_BATCH_LINGER_SECONDS,
+    MEMORY_BATCH_MAX_CHARS,
+    MEMORY_BATCH_MAX_JOBS,
+    MEMORY_JOB_MAX_ATTEMPTS,
+    MEMORY_WORKER_POLL_SECONDS,
+)
+from app.db.database import SessionLocal
+from app.db.models import MemoryExtractionJob
+
+# A "running" job whose worker died is handed out again after this long.
+CLAIM_TIMEOUT = timedelta(minutes=5)
+# A failed batch goes back to the queue, but is not retried before this.
+RETRY_DELAY = timedelta(seconds=30)
+
+_wake = threading.Event()
+_stop = threading.Event()
+_thread: threading.Thread | None = None
+
+
+# ---------- producer ----------
+def enqueue_memory_extraction(db: Session, user_id, source: str, text: str):
+    """Queue text for memory extraction; returns as soon as the job row is committed."""
+    if not text or not text.strip():
+        return
+    user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+    db.add(MemoryExtractionJob(user_id=user_uuid, source=source, text=text))
+    db.commit()
+    metrics.inc("memory_extraction_jobs_enqueued_total", source=source)
+    _wake.set()
+
+
+# ---------- consumer ----------
+def _claimable():
+    now = datetime.utcnow()
+    return or_(
+        and_(
+            MemoryExtractionJob.status == "pending",
+            or_(
+                MemoryExtractionJob.claimed_at.is_(None),
+                MemoryExtractionJob.claimed_at < now - RETRY_DELAY,
+            ),
+        ),
+        and_(
+            MemoryExtractionJob.status == "running",
+            MemoryExtractionJob.claimed_at < now - CLAIM_TIMEOUT,
+        ),
+    )
+
+
+def _claim_batch(db: Session) -> list[MemoryExtractionJob]:
+    """Claim the oldest job plus other queued jobs of the same user and source."""
+    oldest = (
+        db.query(MemoryExtractionJob)
+        .filter(_claimable())
+        .order_by(MemoryExtractionJob.id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if oldest is None:
+        db.rollback()
+        return []
+
+    jobs = (
+        db.query(MemoryExtractionJob)
+        .filter(
+            _claimable(),
+            MemoryExtractionJob.user_id == oldest.user_id,
+            MemoryExtractionJob.source == oldest.source,
+        )
+        .order_by(MemoryExtractionJob.id)
+        .limit(MEMORY_BATCH_MAX_JOBS)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    now = datetime.utcnow()
+    for job in jobs:
+        job.status = "running"
+        job.claimed_at = now
+    db.commit()
+    return jobs
+
+
+def _batch_texts(jobs: list[MemoryExtractionJob]) -> list[str]:
+    """Distinct texts in queue order, capped at MEMORY_BATCH_MAX_CHARS (the first always fits)."""
+    texts: list[str] = []
+    size = 0
+    for text in dict.fromkeys(job.text for job in jobs):
+        if texts and size + len(text) > MEMORY_BATCH_MAX_CHARS:
+            break
+        texts.append(text)
+        size += len(text)
+    return texts
+
+
+def _record_queue_metrics(db: Session, jobs: list[MemoryExtractionJob]):
+    depth = db.query(func.count(MemoryExtractionJob.id)).filter(
+        MemoryExtractionJob.status == "pending"
+    ).scalar()
+    metrics.set_gauge("memory_extraction_queue_depth", depth)
+    if jobs:
+        lag = (datetime.utcnow() - min(job.created_at for job in jobs)).total_seconds()
+        metrics.set_gauge("memory_extraction_lag_seconds", lag)
+        metrics.set_gauge("memory_extraction_last_batch_size", len(jobs))
+
+
+def run_once(db: Session) -> int:
+    """Claim and process one batch. Returns the number of jobs claimed (0 = queue empty)."""
+    from app.agent.memory import save_user_memory
+    from app.agent.llm_gateway import LLMThrottled
+    from app.agent.memory_extractor import _report_extraction_error, extract_facts
+
+    jobs = _claim_batch(db)
+    _record_queue_metrics(db, jobs)
+    if not jobs:
+        return 0
+
+    texts = _batch_texts(jobs)
+    batch = [job for job in jobs if job.text in texts]
+    for job in jobs:
+        if job not in batch:
+            # Over the size cap: back to the queue for the next batch.
+            job.status = "pending"
+            job.claimed_at = None
+    db.commit()
+    user_id, source = jobs[0].user_id, jobs[0].source
+
+    metrics.inc("memory_extraction_batches_total")
+    metrics.inc("memory_extraction_jobs_coalesced_total", len(batch) - len(texts))
+    try:
+        facts = extract_facts(texts, source=source, user_id=user_id)
+        if facts:
+            save_user_memory(db, user_id, facts, source=source)
+    except Exception as e:
+        db.rollback()
+        _report_extraction_error(e, source)
+        for job in batch:
+            if isinstance(e, LLMThrottled):
+                # Shed by the LLM gateway to leave quota for interactive calls: not a failure.
+                job.status = "pending"
+                metrics.inc("memory_extraction_jobs_total", outcome="deferred")
+                continue
+            job.attempts += 1
+            job.error = f"{type(e).__name__}: {e}"[:500]
+            job.status = "failed" if job.attempts >= MEMORY_JOB_MAX_ATTEMPTS else "pending"
+            metrics.inc("memory_extraction_jobs_total", outcome="failed" if job.status == "failed" else "retried")
+        db.commit()
+        return len(jobs)
+
+    for job in batch:
+        db.delete(job)
+    db.commit()
+    metrics.inc("memory_extraction_jobs_total", len(batch), outcome="done")
+    return len(jobs)
+
+
+def drain(db: Session) -> int:
+    """Process batches until the queue is empty; returns jobs processed."""
+    total = 0
+    while not _stop.is_set():
+        claimed = run_once(db)
+        if not claimed:
+            break
+        total += claimed
+    return total
+
+
+def _worker_loop():
+    while not _stop.is_set():
+        # Poll as well as wait for wake-ups: other processes and restarts leave jobs behind.
+        if _wake.wait(MEMORY_WORKER_POLL_SECONDS):
+            _wake.clear()
+            # Let a burst of turns land in the same batch.
+            _stop.wait(MEMORY_BATCH_LINGER_SECONDS)
+
+        db = SessionLocal()
+        try:
+            drain(db)
+        except Exception as e:
+            print(f"❌ Memory worker error: {type(e).__name__}: {e}")
+            db.rollback()
+            time.sleep(MEMORY_WORKER_POLL_SECONDS)
+        finally:
+            db.close()
+
+
+def start_memory_worker():
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_worker_loop, name="memory-worker", daemon=True)
+    _thread.start()
+
+
+def stop_memory_worker(timeout: float = 10):
+    _stop.set()
+    _wake.set()
+    if _thread is not None:
+        _thread.join(timeout)
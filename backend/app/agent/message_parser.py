@@ -0,0 +1,231 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import FrozenSet, Optional
+
+
+# Every keyword a node looks for, matched as substrings of the lowercased
+# message ("mail" matches "gmail", "add" matches "address").
+KEYWORDS = (
+    "meeting", "calendar",
+    "create", "schedule", "book", "set up", "add",
+    "titled", "called", "named", "title",
+    "mail", "email",
+    "today", "tomorrow", "yesterday",
+    "important", "summary",
+    "briefing", "overview", "my day",
+)
+
+_TIME_RANGE = re.compile(r"from (\d{1,2})\s*(am|pm)?\s*to\s*(\d{1,2})\s*(am|pm)?", re.IGNORECASE)
+
+_TITLE_PATTERNS = [
+    re.compile(r'(?:titled|called|named)\s+"([^"]+)"', re.IGNORECASE),
+    re.compile(r"(?:titled|called|named)\s+'([^']+)'", re.IGNORECASE),
+    re.compile(r"(?:title|subject)\s*:\s*([^\n]+)", re.IGNORECASE),
+    re.compile(r'"([^"]+)"'),  # Any quoted text
+    re.compile(r"'([^']+)'"),  # Any single-quoted text
+]
+_EXPLICIT_TITLE_PATTERNS = _TITLE_PATTERNS + [
+    re.compile(r"(?:call|name|rename)\s+it\s+(.+?)\s*$", re.IGNORECASE),
+]
+_TIME_OF_DAY = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b", re.IGNORECASE)
+_TITLE_BEFORE_TIME = re.compile(r"\s+from\s+\d", re.IGNORECASE)
+_TITLE_TRAILING_WORD = re.compile(r"\s+(for|on|at|with|to)\s*$", re.IGNORECASE)
+_TITLE_PREFIXES = ["schedule", "create", "book", "set up", "add", "a meeting", "meeting"]
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedMessage:
+    """
+    Everything the router and nodes read from the user's message, computed once.
+    A plain dataclass: AgentState keeps the instance as is instead of revalidating it.
+    """
+    text: str
+    keywords: FrozenSet[str] = frozenset()
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    title: Optional[str] = None
+
+    def has(self, *keywords: str) -> bool:
+        """True if any of the keywords occurs in the message (substring match)."""
+        return not self.keywords.isdisjoint(keywords)
+
+    @property
+    def has_time_range(self) -> bool:
+        return self.start_time is not None
+
+
+def _time_range(text: str, is_tomorrow: bool):
+    """
+    Extracts simple time ranges like:
+    'from 10 to 11'
+    '10am to 11am'
+    '11pm to 12am' (handles midnight correctly)
+    Returns (start_datetime, end_datetime) or (None, None)
+    """
+    match = _TIME_RANGE.search(text)
+    if not match:
+        return None, None
+
+    start_hour = int(match.group(1))
+    end_hour = int(match.group(3))
+    start_ampm = (match.group(2) or "").lower()
+    end_ampm = (match.group(4) or "").lower()
+
+    # Handle 12am (midnight) and 12pm (noon) correctly
+    if start_hour == 12:
+        start_hour = 0  # 12am = 0, 12pm = 12 (handled below)
+    if end_hour == 12:
+        end_hour = 0  # 12am = 0, 12pm = 12 (handled below)
+
+    # AM/PM handling
+    if start_ampm == "pm" and start_hour < 12:
+        start_hour += 12
+    if end_ampm == "pm" and end_hour < 12:
+        end_hour += 12
+
+    today = datetime.utcnow()
+
+    start_time = today.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+    end_time = today.replace(hour=end_hour, minute=0, second=0, microsecond=0)
+
+    # Handle tomorrow
+    if is_tomorrow:
+        start_time += timedelta(days=1)
+        end_time += timedelta(days=1)
+
+    # Handle midnight crossing (e.g., 11pm to 12am): end is midnight of the next day
+    if end_hour == 0 and end_ampm == "am" and start_hour >= 12:
+        end_time += timedelta(days=1)
+
+    # Validation: end time must be after start time
+    if end_time <= start_time:
+        # If end is before or equal to start, assume it's next day
+        end_time += timedelta(days=1)
+
+    return start_time, end_time
+
+
+def _title(text: str) -> str | None:
+    """
+    Extract a meeting title from common patterns:
+    - titled "X"
+    - called "X"
+    - named "X"
+    - title: X
+    - "X" (quoted text before time)
+    - X (text before "from" or time pattern)
+    """
+    for pattern in _TITLE_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            # Trim trailing punctuation
+            title = m.group(1).strip().strip(" .,!;:")
+            if title and len(title) > 1:  # Must be at least 2 chars
+                return title
+
+    # If no quoted title, try to extract text before "from" or time pattern
+    # Example: "Team Standup from 9am to 10am"
+    parts = _TITLE_BEFORE_TIME.split(text, maxsplit=1)
+    if len(parts) > 1:
+        potential_title = parts[0].strip()
+        # Remove common prefixes
+        for prefix in _TITLE_PREFIXES:
+            if potential_title.lower().startswith(prefix):
+                potential_title = potential_title[len(prefix):].strip()
+        # Remove trailing words that are likely not part of title
+        potential_title = _TITLE_TRAILING_WORD.sub("", potential_title)
+        if potential_title and len(potential_title) > 1:
+            return potential_title.strip(" .,!;:")
+
+    return None
+
+
+def parse_message(text: str) -> ParsedMessage:
+    lower = text.lower()
+    keywords = frozenset(kw for kw in KEYWORDS if kw in lower)
+
+    start_time, end_time = (
+        _time_range(text, is_tomorrow="tomorrow" in keywords) if "from" in lower else (None, None)
+    )
+
+    # Titles are only read when the message asks to create an event (see intent_router_node).
+    is_create = keywords & {"meeting", "calendar"} and (
+        keywords & {"create", "schedule", "book", "set up", "add"}
+        or (start_time is not None and keywords & {"titled", "called", "named", "title"})
+    )
+    title = _title(text) if is_create else None
+
+    return ParsedMessage(
+        text=text,
+        keywords=keywords,
+        start_time=start_time,
+        end_time=end_time,
+        title=title,
+    )
+
+
+# ---------- follow-ups ----------
+def _explicit_title(text: str) -> str | None:
+    """A title the user spelled out (quoted, 'titled X', 'call it X'), without guessing from context."""
+    for pattern in _EXPLICIT_TITLE_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            title = m.group(1).strip().strip(" .,!;:\"'")
+            if len(title) > 1:
+                return title
+    return None
+
+
+def _time_of_day(text: str) -> tuple[int, int] | None:
+    """(hour, minute) of the first '3pm' / '10:30 am' in the text."""
+    m = _TIME_OF_DAY.search(text)
+    if not m:
+        return None
+    hour, minute, ampm = int(m.group(1)), int(m.group(2) or 0), m.group(3).lower()
+    if not 1 <= hour <= 12 or minute > 59:
+        return None
+    # 12am is midnight, 12pm is noon
+    return hour % 12 + (12 if ampm == "pm" else 0), minute
+
+
+def parse_followup(text: str, base: ParsedMessage) -> ParsedMessage | None:
+    """
+    Apply a scheduling follow-up ("make it 3pm", "tomorrow instead",
+    'call it "Design review"', "from 2 to 3pm") to the create request it
+    answers. A single new time keeps the meeting's length (an hour if none
+    was given yet). Returns None if the text changes none of title, day or time.
+    """
+    parsed = parse_message(text)
+    title = _explicit_title(text)
+    at = _time_of_day(text) if not parsed.has_time_range else None
+    new_day = "today" in parsed.keywords or "tomorrow" in parsed.keywords
+    if title is None and at is None and not parsed.has_time_range and not new_day:
+        return None
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    if new_day:
+        day = today + timedelta(days=1) if "tomorrow" in parsed.keywords else today
+    elif base.start_time is not None:
+        day = base.start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    else:
+        day = today + timedelta(days=1) if "tomorrow" in base.keywords else today
+
+    length = base.end_time - base.start_time if base.start_time and base.end_time else timedelta(hours=1)
+    if parsed.has_time_range:
+        start_time = day + (parsed.start_time - parsed.start_time.replace(hour=0, minute=0))
+        length = parsed.end_time - parsed.start_time
+    elif at is not None:
+        start_time = day + timedelta(hours=at[0], minutes=at[1])
+    elif base.start_time is not None:
+        start_time = day + (base.start_time - base.start_time.replace(hour=0, minute=0, second=0, microsecond=0))
+    else:
+        start_time = None
+
+    return ParsedMessage(
+        text=text,
+        keywords=base.keywords | parsed.keywords,
+        start_time=start_time,
+        end_time=start_time + length if start_time is not None else None,
+        title=title or base.title,
+    )
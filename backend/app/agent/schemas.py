@@ -2,13 +2,22 @@ from typing import List, Dict, Optional, Literal
 from pydantic import BaseModel
 from datetime import datetime
 
+from app.agent.message_parser import ParsedMessage
+
 class AgentState(BaseModel):
     user_id: str
     message: str
 
+    # parsed once before routing, reused by every node
+    parsed: Optional[ParsedMessage] = None
+
     # memory
     memory: List[Dict[str, str]] = []
 
+    # conversation: rolling summary + recent turns ({"role", "content"}), chat node only
+    conversation_summary: Optional[str] = None
+    history: List[Dict[str, str]] = []
+
     # intent
     intent: Optional[
         Literal[
@@ -18,6 +27,7 @@ class AgentState(BaseModel):
             "calendar_today",
             "calendar_tomorrow",
             "calendar_create",
+            "daily_briefing",
             "need_more_info",
             "unsupported",
         ]
@@ -27,5 +37,9 @@ class AgentState(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
 
+    # daily briefing branch results (None = the branch failed or missed its deadline)
+    briefing_events: Optional[List[dict]] = None
+    briefing_emails: Optional[List[Dict[str, str]]] = None
+
     # final response
     response: Optional[str] = None
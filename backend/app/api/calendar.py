@@ -1,20 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.tools.calendar_read_tool import fetch_upcoming_events
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 from app.auth.dependencies import get_current_user
 from app.db.models import User
 @router.get("/events")
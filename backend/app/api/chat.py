@@ -1,9 +1,13 @@
+import json
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.db.database import SessionLocal
-from app.agent.graph import build_graph
+from app.db.database import get_db
+from app.agent.graph import get_compiled_graph
+from app.agent.conversation import start_record_turn
 from app.agent.schemas import AgentState
 from app.auth.dependencies import get_current_user
 from app.db.models import User
@@ -15,30 +19,22 @@ class ChatRequest(BaseModel):
     message: str  # ← ONLY MESSAGE
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post("/")
-def chat(
+async def chat(
     payload: ChatRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     try:
         print(f"✅ Chat request from user: {current_user.email} (ID: {current_user.id})")
-        graph = build_graph()
+        graph = get_compiled_graph(async_nodes=True)
 
         state = AgentState(
             user_id=str(current_user.id),
             message=payload.message,
         )
 
-        result = graph.invoke(
+        result = await graph.ainvoke(
             state,
             config={"configurable": {"db": db}}
         )
@@ -49,6 +45,7 @@ def chat(
         else:
             response_text = result.response
 
+        start_record_turn(current_user.id, payload.message, response_text)
         return {"response": response_text}
     except Exception as e:
         print(f"❌ Chat error: {type(e).__name__}: {e}")
@@ -57,6 +54,67 @@ def chat(
         raise
 
 
+# Nodes whose LLM tokens are forwarded to the client as they are generated
+STREAMED_NODES = {"chat", "gmail_today_summary", "daily_briefing"}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream(
+    payload: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Server-sent events version of /chat/:
+    - progress: {"phase": ...} while tools run (e.g. "fetching calendar")
+    - token: {"text": ...} as Gemini generates the reply
+    - done: {"response": ...} the final formatted response
+    - error: {"error": ...}
+    """
+    print(f"✅ Chat stream request from user: {current_user.email} (ID: {current_user.id})")
+    graph = get_compiled_graph(async_nodes=True)
+
+    state = AgentState(
+        user_id=str(current_user.id),
+        message=payload.message,
+    )
+    config = {"configurable": {"db": db}}
+
+    async def events():
+        response_text = ""
+        try:
+            async for mode, chunk in graph.astream(
+                state,
+                config=config,
+                stream_mode=["messages", "custom", "values"],
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if metadata.get("langgraph_node") in STREAMED_NODES and message.text:
+                        yield _sse("token", {"text": message.text})
+                elif mode == "custom":
+                    yield _sse("progress", chunk)
+                elif mode == "values":
+                    values = chunk if isinstance(chunk, dict) else chunk.model_dump()
+                    response_text = values.get("response") or response_text
+
+            yield _sse("done", {"response": response_text})
+            start_record_turn(current_user.id, payload.message, response_text)
+        except Exception as e:
+            print(f"❌ Chat stream error: {type(e).__name__}: {e}")
+            yield _sse("error", {"error": type(e).__name__})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/test-auth")
 def test_auth(current_user: User = Depends(get_current_user)):
     """Test endpoint to verify authentication is working"""
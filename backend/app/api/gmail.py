@@ -1,20 +1,12 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.tools.gmail_tool import fetch_latest_emails
 
 router = APIRouter(prefix="/gmail", tags=["gmail"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 from app.auth.dependencies import get_current_user
 from app.db.models import User
 
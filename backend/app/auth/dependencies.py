@@ -1,29 +1,43 @@
+import uuid
+
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.db.models import User
 from app.auth.auth_utils import SECRET_KEY, ALGORITHM
+from app.auth.user_cache import REVOKED, cache_token, cache_user, get_cached_token, get_cached_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _load_user(db: Session, user_uuid: uuid.UUID) -> User | None:
+    user = db.query(User).filter(User.id == user_uuid).first()
+    if user is not None:
+        # Detach so later commits in this request do not expire the cached row.
+        db.expunge(user)
+    return user
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ) -> User:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Verified tokens are cached until their exp; only new tokens pay for the signature check.
+        payload = get_cached_token(token)
+        if payload is None:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            cache_token(token, payload)
+        if payload is REVOKED:
+            raise HTTPException(
+                status_code=401,
+                detail="Logged out. Please log in again.",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
         user_id: str | None = payload.get("user_id")
 
         if user_id is None:
@@ -43,10 +57,23 @@ def get_current_user(
         print(f"❌ Token (first 20 chars): {token[:20] if token else 'None'}...")
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    try:
+        user_uuid = uuid.UUID(user_id)
+    except ValueError:
+        print(f"❌ Token user_id is not a UUID: {user_id}")
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = get_cached_user(user_uuid)
+    if user is not None:
+        return user
+
+    # Cache miss: the route's own session, so the request still checks out one
+    # connection; the blocking query runs on the threadpool like a sync dependency.
+    user = await run_in_threadpool(_load_user, db, user_uuid)
 
     if not user:
         print(f"❌ User not found for user_id: {user_id}")
         raise HTTPException(status_code=401, detail="User not found")
 
+    cache_user(user)
     return user
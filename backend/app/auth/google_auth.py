@@ -4,11 +4,14 @@ from google_auth_oauthlib.flow import Flow
 import os
 from sqlalchemy.orm import Session
 from fastapi import Depends
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.db.models import User, GoogleCredential
 from datetime import datetime
 import requests
 from app.auth.auth_utils import create_access_token
+from app.integrations.google_credentials import invalidate_google_credentials
+from app.integrations.google_services import invalidate_google_services
+from app.auth.user_cache import invalidate_cached_user
 
 
 
@@ -52,14 +55,6 @@ def google_login():
     return RedirectResponse(auth_url)
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get("/callback")
 def google_callback(request: Request, db: Session = Depends(get_db)):
     code = request.query_params.get("code")
@@ -125,6 +120,9 @@ def google_callback(request: Request, db: Session = Depends(get_db)):
             google_creds.expires_at = expires_at
 
         db.commit()
+        invalidate_google_credentials(user.id)
+        invalidate_google_services(user.id)
+        invalidate_cached_user(user.id)
         
         app_token = create_access_token({"user_id": str(user.id)})
         
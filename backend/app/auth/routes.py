@@ -1,21 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
+from jose import jwt
 from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.db.models import User
 from app.auth.schemas import UserCreate, Token
 from app.auth.auth_utils import hash_password, verify_password, create_access_token
+from app.auth.dependencies import get_current_user, oauth2_scheme
+from app.auth.user_cache import invalidate_cached_user, invalidate_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post("/register", response_model=Token)
 def register(user: UserCreate, db: Session = Depends(get_db)):
     existing_user = db.query(User).filter(User.email == user.email).first()
@@ -42,3 +37,12 @@ def login(user: UserCreate, db: Session = Depends(get_db)):
 
     token = create_access_token({"user_id": db_user.id})
     return {"access_token": token}
+
+
+@router.post("/logout")
+def logout(token: str = Depends(oauth2_scheme), current_user: User = Depends(get_current_user)):
+    """Reject this token from now on and drop the cached user row."""
+    # get_current_user has already verified the token, so its claims can be trusted.
+    invalidate_token(token, jwt.get_unverified_claims(token).get("exp"))
+    invalidate_cached_user(current_user.id)
+    return {"status": "logged_out"}
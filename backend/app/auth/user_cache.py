@@ -0,0 +1,113 @@
+"""
+In-process caches on the authentication path.
+
+- decoded JWTs, keyed by a hash of the token, until the token's exp
+- user rows, keyed by user_id, for USER_CACHE_TTL_SECONDS
+
+Both are LRU-bounded. A cache hit skips signature verification and the
+users lookup. Call invalidate_cached_user() whenever a user row or its
+Google credentials change, and invalidate_token() on logout: the token is
+then remembered as REVOKED until its exp (in this process).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.core import metrics
+from app.core.config import JWT_CACHE_MAX_ENTRIES, USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS
+
+
+class _ExpiringLRU:
+    """Thread-safe LRU of key -> (expires_at epoch seconds, value)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value, expires_at: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_tokens = _ExpiringLRU(JWT_CACHE_MAX_ENTRIES)
+_users = _ExpiringLRU(USER_CACHE_MAX_ENTRIES)
+
+
+def _token_key(token: str) -> str:
+    # Hashed so that the cache never holds bearer tokens.
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# ---------- decoded tokens ----------
+# Cached in place of the payload of a logged-out token.
+REVOKED = {"revoked": True}
+
+
+def get_cached_token(token: str) -> dict | None:
+    payload = _tokens.get(_token_key(token))
+    metrics.inc("auth_jwt_cache_requests_total", result="miss" if payload is None else "hit")
+    return payload
+
+
+def cache_token(token: str, payload: dict):
+    """Remember a verified payload until its exp (tokens without exp are not cached)."""
+    exp = payload.get("exp")
+    if exp is not None:
+        _tokens.put(_token_key(token), payload, float(exp))
+
+
+def invalidate_token(token: str, exp: float | None = None):
+    """Forget a token; with its exp (logout) it is rejected until then instead."""
+    if exp is None:
+        _tokens.pop(_token_key(token))
+    else:
+        _tokens.put(_token_key(token), REVOKED, float(exp))
+
+
+# ---------- user rows ----------
+def get_cached_user(user_id):
+    user = _users.get(str(user_id))
+    metrics.inc("auth_user_cache_requests_total", result="miss" if user is None else "hit")
+    return user
+
+
+def cache_user(user):
+    """Cache a user row. It must already be detached from its session (db.expunge)."""
+    _users.put(str(user.id), user, time.time() + USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_cached_user(user_id):
+    """Drop a cached user row, e.g. after it or its credentials were updated or deleted."""
+    _users.pop(str(user_id))
+
+
+def clear_auth_caches():
+    _tokens.clear()
+    _users.clear()
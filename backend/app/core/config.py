@@ -9,3 +9,110 @@ APP_NAME = os.getenv("APP_NAME", "App")
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 
+# Max threads for blocking Google API calls made from async code paths
+GOOGLE_IO_MAX_WORKERS = int(os.getenv("GOOGLE_IO_MAX_WORKERS", "32"))
+
+# Google API transport: per-request connect/read timeouts, retries with
+# exponential backoff on 429/5xx, and keep-alive connections per host per thread
+GOOGLE_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+GOOGLE_HTTP_READ_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_HTTP_READ_TIMEOUT_SECONDS", "15"))
+GOOGLE_HTTP_MAX_RETRIES = int(os.getenv("GOOGLE_HTTP_MAX_RETRIES", "3"))
+GOOGLE_HTTP_BACKOFF_SECONDS = float(os.getenv("GOOGLE_HTTP_BACKOFF_SECONDS", "0.5"))
+GOOGLE_HTTP_POOL_MAXSIZE = int(os.getenv("GOOGLE_HTTP_POOL_MAXSIZE", "10"))
+
+# Users whose Google tokens stay in process memory (LRU); an evicted user's row is read again on next use
+GOOGLE_CREDENTIAL_CACHE_MAX_USERS = int(os.getenv("GOOGLE_CREDENTIAL_CACHE_MAX_USERS", "10000"))
+
+# Gmail mirror: answer from the local mirror if it synced within this many
+# seconds, otherwise pull a History API delta first
+MAILBOX_MIRROR_FRESHNESS_SECONDS = int(os.getenv("MAILBOX_MIRROR_FRESHNESS_SECONDS", "60"))
+MAILBOX_BACKFILL_DAYS = int(os.getenv("MAILBOX_BACKFILL_DAYS", "7"))
+
+# Calendar cache: serve from the local event store if it synced within this
+# many seconds, otherwise pull a syncToken delta first. Only events ending
+# after the last CALENDAR_SYNC_PAST_DAYS days are synced and kept
+CALENDAR_CACHE_FRESHNESS_SECONDS = int(os.getenv("CALENDAR_CACHE_FRESHNESS_SECONDS", "60"))
+CALENDAR_SYNC_PAST_DAYS = int(os.getenv("CALENDAR_SYNC_PAST_DAYS", "30"))
+# Users whose busy index stays in process memory (LRU); an evicted index is rebuilt on next use
+CALENDAR_BUSY_INDEX_MAX_USERS = int(os.getenv("CALENDAR_BUSY_INDEX_MAX_USERS", "256"))
+
+# Memory retrieval: at most this many memories, within this many (estimated)
+# prompt tokens, are picked per turn by relevance to the user's message
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", "8"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "400"))
+# Users whose memory index stays in process memory (LRU); an evicted index is rebuilt on next use
+MEMORY_INDEX_MAX_USERS = int(os.getenv("MEMORY_INDEX_MAX_USERS", "256"))
+
+# Background memory extraction: jobs for one user are batched into a single
+# LLM call of up to MEMORY_BATCH_MAX_JOBS texts; the worker waits
+# MEMORY_BATCH_LINGER_SECONDS after a wake-up so a burst lands in one batch
+MEMORY_BATCH_MAX_JOBS = int(os.getenv("MEMORY_BATCH_MAX_JOBS", "8"))
+MEMORY_BATCH_MAX_CHARS = int(os.getenv("MEMORY_BATCH_MAX_CHARS", "20000"))
+MEMORY_BATCH_LINGER_SECONDS = float(os.getenv("MEMORY_BATCH_LINGER_SECONDS", "1"))
+MEMORY_WORKER_POLL_SECONDS = float(os.getenv("MEMORY_WORKER_POLL_SECONDS", "5"))
+MEMORY_JOB_MAX_ATTEMPTS = int(os.getenv("MEMORY_JOB_MAX_ATTEMPTS", "3"))
+
+# LLM reply cache: in-process LRU size, optional Postgres tier, and TTLs per call site
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() == "true"
+LLM_CACHE_TTL_CHAT = int(os.getenv("LLM_CACHE_TTL_CHAT", "300"))
+LLM_CACHE_TTL_SUMMARY = int(os.getenv("LLM_CACHE_TTL_SUMMARY", "3600"))
+LLM_CACHE_TTL_MEMORY = int(os.getenv("LLM_CACHE_TTL_MEMORY", "86400"))
+
+# LLM gateway: Gemini request budget per process and per user (requests per
+# minute), the share of the process bucket kept for interactive calls,
+# how long interactive calls may queue, and retry/cooldown behaviour
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_USER_REQUESTS_PER_MINUTE = float(os.getenv("LLM_USER_REQUESTS_PER_MINUTE", "20"))
+LLM_BACKGROUND_RESERVE = float(os.getenv("LLM_BACKGROUND_RESERVE", "0.5"))
+LLM_MAX_WAIT_SECONDS = float(os.getenv("LLM_MAX_WAIT_SECONDS", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_QUOTA_COOLDOWN_SECONDS = float(os.getenv("LLM_QUOTA_COOLDOWN_SECONDS", "30"))
+
+# Database connection pool (per process): steady connections, burst overflow,
+# how long a request may wait for one, recycle age, and a liveness ping on checkout
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Share of DB_POOL_SIZE / DB_MAX_OVERFLOW given to the async engine (chat-turn
+# writes and history compaction); the sync engine gets the rest, so the total stays the same
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "3"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "2"))
+
+# Authenticated-user caches: user rows for a short TTL, decoded JWTs until they expire
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+
+# Conversation history: the chat prompt carries the last CHAT_HISTORY_WINDOW_MESSAGES
+# turns verbatim plus a rolling summary of everything older; the summary is
+# recompacted in the background once CHAT_COMPACTION_BATCH_MESSAGES turns
+# have left the window, and is capped at CHAT_SUMMARY_MAX_CHARS
+CHAT_HISTORY_WINDOW_MESSAGES = int(os.getenv("CHAT_HISTORY_WINDOW_MESSAGES", "8"))
+CHAT_COMPACTION_BATCH_MESSAGES = int(os.getenv("CHAT_COMPACTION_BATCH_MESSAGES", "8"))
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv("CHAT_SUMMARY_MAX_CHARS", "1500"))
+
+# Daily briefing: deadline for each parallel Google branch (calendar, Gmail);
+# a branch that misses it is reported as unavailable instead of delaying the reply
+BRIEFING_CALENDAR_TIMEOUT_SECONDS = float(os.getenv("BRIEFING_CALENDAR_TIMEOUT_SECONDS", "8"))
+BRIEFING_GMAIL_TIMEOUT_SECONDS = float(os.getenv("BRIEFING_GMAIL_TIMEOUT_SECONDS", "8"))
+
+# Tracing: also emit OpenTelemetry spans for graph nodes and dependency calls
+# (needs the optional opentelemetry packages and a configured tracer provider)
+OTEL_TRACING_ENABLED = os.getenv("OTEL_TRACING_ENABLED", "false").lower() == "true"
+
+# Background Google token refresher: tokens expiring within TOKEN_REFRESH_LEAD_SECONDS
+# are refreshed ahead of the request path. Each scan claims up to
+# TOKEN_REFRESH_BATCH_SIZE rows for TOKEN_REFRESH_CLAIM_SECONDS, runs at most
+# TOKEN_REFRESH_CONCURRENCY refreshes at once and starts them a jittered
+# TOKEN_REFRESH_SPACING_SECONDS apart; failed rows are retried after the backoff
+TOKEN_REFRESH_ENABLED = os.getenv("TOKEN_REFRESH_ENABLED", "true").lower() == "true"
+TOKEN_REFRESH_INTERVAL_SECONDS = float(os.getenv("TOKEN_REFRESH_INTERVAL_SECONDS", "60"))
+TOKEN_REFRESH_LEAD_SECONDS = int(os.getenv("TOKEN_REFRESH_LEAD_SECONDS", "900"))
+TOKEN_REFRESH_BATCH_SIZE = int(os.getenv("TOKEN_REFRESH_BATCH_SIZE", "50"))
+TOKEN_REFRESH_CONCURRENCY = int(os.getenv("TOKEN_REFRESH_CONCURRENCY", "4"))
+TOKEN_REFRESH_SPACING_SECONDS = float(os.getenv("TOKEN_REFRESH_SPACING_SECONDS", "0.2"))
+TOKEN_REFRESH_CLAIM_SECONDS = int(os.getenv("TOKEN_REFRESH_CLAIM_SECONDS", "300"))
+TOKEN_REFRESH_FAILURE_BACKOFF_SECONDS = int(os.getenv("TOKEN_REFRESH_FAILURE_BACKOFF_SECONDS", "3600"))
@@ -0,0 +1,22 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import GOOGLE_IO_MAX_WORKERS
+
+# googleapiclient is blocking; async code paths push those calls onto this
+# dedicated, bounded pool so they never starve the event loop or the
+# default threadpool that serves sync endpoints.
+google_io_executor = ThreadPoolExecutor(
+    max_workers=GOOGLE_IO_MAX_WORKERS,
+    thread_name_prefix="google-io",
+)
+
+
+async def run_google_io(fn, /, *args, **kwargs):
+    """Run a blocking Google API call on the Google I/O pool and await it."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(google_io_executor, call)
@@ -0,0 +1,37 @@
+import threading
+from contextlib import contextmanager
+
+
+class KeyedLocks:
+    """
+    One lock per key (e.g. per user) for single-flight work. An entry only
+    exists while someone holds or waits for its lock, so the table never
+    grows past the work in flight.
+    """
+
+    def __init__(self):
+        # key -> [lock, holders and waiters]
+        self._locks: dict = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def hold(self, key):
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._locks
+
+    def __len__(self) -> int:
+        return len(self._locks)
@@ -0,0 +1,117 @@
+"""
+Process-local metrics registry.
+
+Counters, gauges and histograms are keyed by metric name plus a sorted label
+tuple so callers can record from any thread without holding references to
+objects. render_prometheus() serves them in the Prometheus text format.
+"""
+
+import bisect
+import threading
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple], float] = {}
+_gauges: dict[tuple[str, tuple], float] = {}
+# key -> [per-bucket counts..., sum, count]
+_histograms: dict[tuple[str, tuple], list] = {}
+
+# Latency buckets in seconds: sub-millisecond DB queries up to slow LLM calls.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _key(name: str, labels: dict) -> tuple[str, tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record one sample (seconds) in a histogram."""
+    key = _key(name, labels)
+    bucket = bisect.bisect_left(BUCKETS, value)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+        if bucket < len(BUCKETS):
+            histogram[bucket] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+
+def get_counter(name: str, **labels) -> float:
+    return _counters.get(_key(name, labels), 0)
+
+
+def get_gauge(name: str, **labels) -> float:
+    return _gauges.get(_key(name, labels), 0)
+
+
+def get_histogram(name: str, **labels) -> tuple[float, int]:
+    """(sum, count) of a histogram series."""
+    histogram = _histograms.get(_key(name, labels))
+    return (histogram[-2], histogram[-1]) if histogram else (0.0, 0)
+
+
+def snapshot() -> dict:
+    """Copy of every recorded series, e.g. for debugging or tests."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": {key: list(value) for key, value in _histograms.items()},
+        }
+
+
+# ---------- Prometheus text format ----------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Every series in the Prometheus text exposition format (version 0.0.4)."""
+    data = snapshot()
+    lines: list[str] = []
+
+    for kind, series in (("counter", data["counters"]), ("gauge", data["gauges"])):
+        for name in sorted({name for name, _ in series}):
+            lines.append(f"# TYPE {name} {kind}")
+            for (series_name, labels), value in sorted(series.items()):
+                if series_name == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    histograms = data["histograms"]
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (series_name, labels), histogram in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, (('le', '+Inf'),))} {histogram[-1]}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(histogram[-2])}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram[-1]}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,96 @@
+"""
+Latency instrumentation for graph nodes and external dependencies.
+
+- graph_node_seconds{node, intent}: every node in build_graph (traced_node)
+- dependency_seconds{dependency, operation, intent}: Gemini calls, Google
+  API requests, the OAuth token refresh and DB queries (dependency())
+- dependency_errors_total{dependency, operation}
+
+The intent label is the intent of the graph node the call happened in
+("none" outside the graph, e.g. in auth or after the reply). If the optional
+opentelemetry package is installed and OTEL_TRACING_ENABLED is set, every
+node and dependency call is also a span on the configured tracer provider.
+"""
+
+import contextvars
+import inspect
+import time
+from contextlib import contextmanager, nullcontext
+
+from app.core import metrics
+from app.core.config import OTEL_TRACING_ENABLED
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # optional dependency
+    otel_trace = None
+
+_tracer = otel_trace.get_tracer("chief-of-staff") if otel_trace is not None and OTEL_TRACING_ENABLED else None
+
+_intent: contextvars.ContextVar[str] = contextvars.ContextVar("intent", default="none")
+
+
+def current_intent() -> str:
+    return _intent.get()
+
+
+def _span(name: str, attributes: dict):
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+@contextmanager
+def dependency(name: str, operation: str):
+    """Time one call to an external dependency."""
+    intent = _intent.get()
+    started = time.perf_counter()
+    with _span(f"{name}.{operation}", {"dependency": name, "operation": operation, "intent": intent}):
+        try:
+            yield
+        except BaseException:
+            metrics.inc("dependency_errors_total", dependency=name, operation=operation)
+            raise
+        finally:
+            observe_dependency(name, operation, time.perf_counter() - started, intent)
+
+
+def observe_dependency(name: str, operation: str, seconds: float, intent: str | None = None):
+    """Record a dependency call timed elsewhere (e.g. by SQLAlchemy cursor events)."""
+    metrics.observe(
+        "dependency_seconds", seconds, dependency=name, operation=operation, intent=intent or _intent.get()
+    )
+
+
+def _node_intent(state) -> str:
+    return getattr(state, "intent", None) or "none"
+
+
+def traced_node(name: str, node):
+    """Wrap a graph node so its latency is recorded per node and intent."""
+
+    if inspect.iscoroutinefunction(node):
+        async def traced(state, config):
+            intent = _node_intent(state)
+            token = _intent.set(intent)
+            started = time.perf_counter()
+            try:
+                with _span(f"node.{name}", {"node": name, "intent": intent}):
+                    return await node(state, config)
+            finally:
+                metrics.observe("graph_node_seconds", time.perf_counter() - started, node=name, intent=intent)
+                _intent.reset(token)
+    else:
+        def traced(state, config):
+            intent = _node_intent(state)
+            token = _intent.set(intent)
+            started = time.perf_counter()
+            try:
+                with _span(f"node.{name}", {"node": name, "intent": intent}):
+                    return node(state, config)
+            finally:
+                metrics.observe("graph_node_seconds", time.perf_counter() - started, node=name, intent=intent)
+                _intent.reset(token)
+
+    traced.__name__ = getattr(node, "__name__", name)
+    return traced
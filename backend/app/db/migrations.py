@@ -0,0 +1,107 @@
+"""
+One-off schema upgrades that create_all cannot do on existing tables.
+Each step is idempotent and runs at startup right after create_all.
+
+Run by hand with:
+    python -m app.db.migrations
+"""
+
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.agent.memory import normalize_memory_key
+
+
+# ---------- memory: timestamps, dedupe, unique (user_id, key) ----------
+def _dedupe_memory(conn) -> int:
+    """Keep the newest row per (user_id, normalized key); returns rows deleted."""
+    rows = conn.execute(text("SELECT id, user_id, key FROM memory ORDER BY id DESC")).all()
+
+    keep: dict[tuple, int] = {}
+    renamed: list[dict] = []
+    stale: list[int] = []
+    for row in rows:
+        if row.key is None:
+            stale.append(row.id)
+            continue
+        key = normalize_memory_key(row.key)
+        if (row.user_id, key) in keep:
+            stale.append(row.id)
+            continue
+        keep[(row.user_id, key)] = row.id
+        if key != row.key:
+            renamed.append({"id": row.id, "key": key})
+
+    if stale:
+        conn.execute(text("DELETE FROM memory WHERE id = :id"), [{"id": i} for i in stale])
+    if renamed:
+        conn.execute(text("UPDATE memory SET key = :key WHERE id = :id"), renamed)
+    return len(stale)
+
+
+def upgrade_memory_table(engine: Engine):
+    inspector = inspect(engine)
+    if not inspector.has_table("memory"):
+        return
+
+    columns = {c["name"] for c in inspector.get_columns("memory")}
+    indexes = {i["name"] for i in inspector.get_indexes("memory")}
+    if {"created_at", "updated_at"} <= columns and "uq_memory_user_key" in indexes:
+        return
+
+    with engine.begin() as conn:
+        for column in ("created_at", "updated_at"):
+            if column not in columns:
+                conn.execute(text(f"ALTER TABLE memory ADD COLUMN {column} TIMESTAMP"))
+                conn.execute(text(f"UPDATE memory SET {column} = :now"), {"now": datetime.utcnow()})
+
+        if "uq_memory_user_key" not in indexes:
+            deleted = _dedupe_memory(conn)
+            conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_memory_user_key ON memory (user_id, key)"))
+            print(f"🧹 memory: removed {deleted} duplicate rows, added unique (user_id, key)")
+
+
+# ---------- messages: (user_id, created_at) index ----------
+def upgrade_messages_table(engine: Engine):
+    inspector = inspect(engine)
+    if not inspector.has_table("messages"):
+        return
+    if "ix_messages_user_created_at" in {i["name"] for i in inspector.get_indexes("messages")}:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_messages_user_created_at ON messages (user_id, created_at)"
+        ))
+
+
+# ---------- google_credentials: refresh lease + expires_at index ----------
+def upgrade_google_credentials_table(engine: Engine):
+    inspector = inspect(engine)
+    if not inspector.has_table("google_credentials"):
+        return
+
+    columns = {c["name"] for c in inspector.get_columns("google_credentials")}
+    indexes = {i["name"] for i in inspector.get_indexes("google_credentials")}
+    if "refresh_claimed_until" in columns and "ix_google_credentials_expires_at" in indexes:
+        return
+
+    with engine.begin() as conn:
+        if "refresh_claimed_until" not in columns:
+            conn.execute(text("ALTER TABLE google_credentials ADD COLUMN refresh_claimed_until TIMESTAMP"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_google_credentials_expires_at ON google_credentials (expires_at)"
+        ))
+
+
+def run_migrations(engine: Engine):
+    upgrade_memory_table(engine)
+    upgrade_messages_table(engine)
+    upgrade_google_credentials_table(engine)
+
+
+if __name__ == "__main__":
+    from app.db.database import engine
+
+    run_migrations(engine)
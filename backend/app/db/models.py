@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from datetime import datetime
 from app.db.database import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -24,6 +24,11 @@ class GoogleCredential(Base):
 
     updated_at = Column(DateTime, default=datetime.utcnow)
 
+    # Lease taken by the background token refresher; other replicas skip the row until it passes.
+    refresh_claimed_until = Column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_google_credentials_expires_at", "expires_at"),)
+
 
 class Message(Base):
     __tablename__ = "messages"
@@ -34,12 +39,115 @@ class Message(Base):
     content = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_messages_user_created_at", "user_id", "created_at"),
+    )
+
+
+class ConversationSummary(Base):
+    """Rolling summary of a user's older chat turns (see agent/conversation.py)."""
+    __tablename__ = "conversation_summaries"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    summary = Column(String, nullable=False)
+    through_message_id = Column(Integer, nullable=False)  # last Message.id folded in
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 
 class Memory(Base):
     __tablename__ = "memory"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
-    key = Column(String)
+    key = Column(String)  # normalized, one row per (user_id, key)
     value = Column(String)
     source = Column(String)  # chat | email
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Also serves the per-user lookups in load_user_memory (user_id is the leading column).
+        Index("uq_memory_user_key", "user_id", "key", unique=True),
+    )
+
+
+class MemoryExtractionJob(Base):
+    """Queued memory extractions, drained in per-user batches by the background worker."""
+    __tablename__ = "memory_extraction_jobs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    source = Column(String, nullable=False)  # chat | email
+    text = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending | running | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    claimed_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_memory_extraction_jobs_status_id", "status", "id"),
+    )
+
+
+class LLMCacheEntry(Base):
+    """Persisted LLM replies keyed by a hash of model + prompt (see agent/llm_cache.py)."""
+    __tablename__ = "llm_cache"
+
+    key = Column(String, primary_key=True)  # sha256 hex
+    response = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class MailboxMessage(Base):
+    """Local mirror of Gmail message metadata, kept current via the History API."""
+    __tablename__ = "mailbox_messages"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    id = Column(String, primary_key=True)  # Gmail message id
+    thread_id = Column(String)
+    sender = Column(String)
+    subject = Column(String)
+    date = Column(String)  # raw Date header
+    internal_date = Column(DateTime, nullable=False)
+    label_ids = Column(String)  # space separated
+    snippet = Column(String)
+
+    __table_args__ = (
+        Index("ix_mailbox_messages_user_internal_date", "user_id", "internal_date"),
+    )
+
+
+class MailboxSyncState(Base):
+    __tablename__ = "mailbox_sync_state"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    history_id = Column(String)
+    backfilled_from = Column(DateTime)  # mirror is complete from here onwards
+    last_synced_at = Column(DateTime)
+
+
+class CalendarEvent(Base):
+    """Cached Google Calendar events (primary calendar), kept current via syncToken."""
+    __tablename__ = "calendar_events"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    id = Column(String, primary_key=True)  # Google event id (instance id for recurring events)
+    summary = Column(String)
+    start = Column(String)  # JSON of the API "start" object
+    end = Column(String)  # JSON of the API "end" object
+    start_at = Column(DateTime, nullable=False)  # UTC, for range queries
+    end_at = Column(DateTime, nullable=False)
+    html_link = Column(String)
+
+    __table_args__ = (
+        Index("ix_calendar_events_user_start_at", "user_id", "start_at"),
+    )
+
+
+class CalendarSyncState(Base):
+    __tablename__ = "calendar_sync_state"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    sync_token = Column(String)
+    last_synced_at = Column(DateTime)
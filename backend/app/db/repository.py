@@ -0,0 +1,89 @@
+"""
+Async data access for the background chat-turn writes and history compaction.
+
+Every function takes an AsyncSession (see AsyncSessionLocal in
+app.db.database). Request handling uses the request's sync session and the
+ORM query API directly; statements that both paths need are built here once.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import ConversationSummary, Memory, Message
+
+
+def as_uuid(user_id) -> uuid.UUID:
+    return uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+
+
+# ---------- memory ----------
+def memory_upsert_statement(dialect_name: str, rows: list[dict]):
+    """INSERT ... ON CONFLICT (user_id, key) DO UPDATE for prepared memory rows."""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = dialect.insert(Memory).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[Memory.user_id, Memory.key],
+        set_={
+            "value": stmt.excluded.value,
+            "source": stmt.excluded.source,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+
+
+# ---------- messages ----------
+async def add_messages(db: AsyncSession, user_id, turns: list[tuple[str, str]]) -> list[Message]:
+    """Append (role, content) turns in order, in one commit."""
+    now = datetime.utcnow()
+    messages = [Message(user_id=as_uuid(user_id), role=role, content=content, created_at=now) for role, content in turns]
+    db.add_all(messages)
+    await db.commit()
+    return messages
+
+
+async def recent_messages(db: AsyncSession, user_id, limit: int) -> list[Message]:
+    """The user's last `limit` messages, oldest first."""
+    result = await db.execute(
+        select(Message)
+        .where(Message.user_id == as_uuid(user_id))
+        .order_by(Message.id.desc())
+        .limit(limit)
+    )
+    return list(reversed(result.scalars().all()))
+
+
+async def messages_after(db: AsyncSession, user_id, after_id: int, limit: int) -> list[Message]:
+    """Up to `limit` of the user's messages with id > after_id, oldest first."""
+    result = await db.execute(
+        select(Message)
+        .where(Message.user_id == as_uuid(user_id), Message.id > after_id)
+        .order_by(Message.id)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def count_messages_after(db: AsyncSession, user_id, after_id: int) -> int:
+    result = await db.execute(
+        select(func.count(Message.id)).where(Message.user_id == as_uuid(user_id), Message.id > after_id)
+    )
+    return result.scalar_one()
+
+
+# ---------- conversation summaries ----------
+async def get_conversation_summary(db: AsyncSession, user_id) -> ConversationSummary | None:
+    return await db.get(ConversationSummary, as_uuid(user_id))
+
+
+async def save_conversation_summary(db: AsyncSession, user_id, summary: str, through_message_id: int):
+    row = await get_conversation_summary(db, user_id)
+    if row is None:
+        row = ConversationSummary(user_id=as_uuid(user_id))
+        db.add(row)
+    row.summary = summary
+    row.through_message_id = through_message_id
+    await db.commit()
@@ -0,0 +1,152 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, by_start, by_end, left, right):
+        self.center = center
+        self.by_start = by_start  # intervals containing center, ascending start
+        self.by_end = by_end  # same intervals, descending end
+        self.left = left
+        self.right = right
+
+
+def _build(intervals: list[tuple]) -> _Node | None:
+    """Centered interval tree over (start, end, payload) tuples, pre-sorted by start."""
+    if not intervals:
+        return None
+
+    center = intervals[len(intervals) // 2][0]
+    left, here, right = [], [], []
+    for interval in intervals:
+        if interval[1] <= center:
+            left.append(interval)
+        elif interval[0] > center:
+            right.append(interval)
+        else:
+            here.append(interval)
+
+    return _Node(
+        center,
+        here,
+        sorted(here, key=lambda i: i[1], reverse=True),
+        _build(left),
+        _build(right),
+    )
+
+
+def _merge(intervals: list[tuple]) -> tuple[list[datetime], list[datetime]]:
+    """Collapse intervals (sorted by start) into disjoint busy blocks."""
+    starts: list[datetime] = []
+    ends: list[datetime] = []
+    for start, end, _ in intervals:
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class BusyIndex:
+    """
+    Immutable index over a user's busy time, all intervals half-open [start, end).
+
+    overlapping() walks a centered interval tree in O(log n + k);
+    find_free_slots() bisects the merged busy blocks around a target time.
+    """
+
+    def __init__(self, intervals: list[tuple[datetime, datetime, dict]]):
+        intervals = sorted((i for i in intervals if i[0] < i[1]), key=lambda i: i[0])
+        self.size = len(intervals)
+        self._root = _build(intervals)
+        self._busy_starts, self._busy_ends = _merge(intervals)
+
+    def overlapping(self, start: datetime, end: datetime) -> list[dict]:
+        """Payloads of intervals overlapping [start, end), ordered by start."""
+        found: list[tuple] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if end <= node.center:
+                # Query entirely left of center: only intervals starting before `end` reach it.
+                for interval in node.by_start:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval)
+                stack.append(node.left)
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval[1] <= start:
+                        break
+                    found.append(interval)
+                stack.append(node.right)
+            else:
+                # Center lies inside the query, so every interval here overlaps it.
+                found.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+
+        found.sort(key=lambda i: i[0])
+        return [interval[2] for interval in found]
+
+    def _gap(self, i: int, window: tuple[datetime, datetime]) -> tuple[datetime, datetime]:
+        """Free gap before busy block i (i == len means after the last block), clipped to window."""
+        gap_start = self._busy_ends[i - 1] if i > 0 else window[0]
+        gap_end = self._busy_starts[i] if i < len(self._busy_starts) else window[1]
+        return max(gap_start, window[0]), min(gap_end, window[1])
+
+    def find_free_slots(
+        self,
+        duration: timedelta,
+        window: tuple[datetime, datetime],
+        *,
+        near: datetime | None = None,
+        limit: int = 3
+    ) -> list[tuple[datetime, datetime]]:
+        """
+        Up to `limit` free, non-overlapping slots of `duration` inside `window`,
+        nearest to `near` first (defaults to the window start). Slots are laid
+        out back to back from the point of each free gap closest to `near`.
+        """
+        window_start, window_end = window
+        near = near or window_start
+        if duration <= timedelta(0) or window_end - window_start < duration:
+            return []
+
+        # Gap i is the free time before busy block i; walk gaps outward from `near`.
+        lo = bisect_left(self._busy_starts, window_start)
+        hi = bisect_right(self._busy_starts, window_end)
+        pivot = min(max(bisect_right(self._busy_starts, near), lo), hi)
+
+        candidates: list[tuple[timedelta, datetime]] = []
+        left, right = pivot - 1, pivot
+        while left >= lo or right <= hi:
+            right_distance = self._gap(right, window)[0] - near if right <= hi else None
+            left_distance = near - self._gap(left, window)[1] if left >= lo else None
+            if left_distance is None or (right_distance is not None and right_distance <= left_distance):
+                i, distance = right, right_distance
+                right += 1
+            else:
+                i, distance = left, left_distance
+                left -= 1
+
+            # Every remaining gap is further away than the slots already found.
+            if len(candidates) >= limit and distance > candidates[limit - 1][0]:
+                break
+
+            gap_start, gap_end = self._gap(i, window)
+            if gap_end - gap_start < duration:
+                continue
+            anchor = min(max(near, gap_start), gap_end - duration)
+            for step in range(-limit, limit + 1):
+                slot_start = anchor + step * duration
+                if gap_start <= slot_start and slot_start + duration <= gap_end:
+                    candidates.append((abs(slot_start - near), slot_start))
+            candidates.sort()
+
+        return [(slot_start, slot_start + duration) for _, slot_start in candidates[:limit]]
@@ -0,0 +1,279 @@
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from googleapiclient.errors import HttpError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import (
+    CALENDAR_BUSY_INDEX_MAX_USERS,
+    CALENDAR_CACHE_FRESHNESS_SECONDS,
+    CALENDAR_SYNC_PAST_DAYS,
+)
+from app.core.keyed_locks import KeyedLocks
+from app.db.models import CalendarEvent, CalendarSyncState
+from app.integrations.busy_index import BusyIndex
+from app.integrations.google_services import get_calendar_service
+
+
+PAGE_SIZE = 2500  # events.list maximum
+
+# One sync at a time per user; concurrent requests wait and then read the result.
+_sync_locks = KeyedLocks()
+
+
+# LRU of user_id -> (sync token it was built at, index), at most
+# CALENDAR_BUSY_INDEX_MAX_USERS; rebuilt when the token moves or after eviction.
+_busy_indexes: "OrderedDict[uuid.UUID, tuple[str | None, BusyIndex]]" = OrderedDict()
+_busy_indexes_guard = threading.Lock()
+
+
+def _as_uuid(user_id) -> uuid.UUID:
+    return uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_event_time(value: dict | None) -> datetime | None:
+    """API start/end object -> naive UTC datetime (all-day dates start at midnight UTC)."""
+    if not value:
+        return None
+    raw = value.get("dateTime") or value.get("date")
+    if not raw:
+        return None
+    try:
+        return _naive_utc(datetime.fromisoformat(raw.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _window_start() -> datetime:
+    """Oldest time the cache covers: events that ended before it are neither synced nor kept."""
+    return (datetime.utcnow() - timedelta(days=CALENDAR_SYNC_PAST_DAYS)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _is_fresh(state: CalendarSyncState | None) -> bool:
+    return (
+        state is not None
+        and state.last_synced_at is not None
+        and datetime.utcnow() - state.last_synced_at < timedelta(seconds=CALENDAR_CACHE_FRESHNESS_SECONDS)
+    )
+
+
+def _event_dict(row: CalendarEvent) -> dict:
+    return {
+        "summary": row.summary,
+        "start": json.loads(row.start) if row.start else None,
+        "end": json.loads(row.end) if row.end else None,
+    }
+
+
+# ---------- writes ----------
+def store_events(db: Session, user_id, events: list[dict]):
+    """Upsert API event resources into the cache; cancelled events are removed."""
+    user_uuid = _as_uuid(user_id)
+    if not events:
+        return
+
+    existing = {
+        row.id: row
+        for row in db.query(CalendarEvent).filter(
+            CalendarEvent.user_id == user_uuid,
+            CalendarEvent.id.in_([e["id"] for e in events])
+        )
+    }
+
+    for event in events:
+        row = existing.get(event["id"])
+        start_at = _parse_event_time(event.get("start"))
+        end_at = _parse_event_time(event.get("end"))
+
+        if event.get("status") == "cancelled" or start_at is None or end_at is None:
+            if row is not None:
+                # Added earlier in this same batch: just drop the pending insert.
+                if row in db.new:
+                    db.expunge(row)
+                else:
+                    db.delete(row)
+                del existing[event["id"]]
+            continue
+
+        if row is None:
+            row = CalendarEvent(user_id=user_uuid, id=event["id"])
+            db.add(row)
+            existing[event["id"]] = row
+        row.summary = event.get("summary")
+        row.start = json.dumps(event.get("start"))
+        row.end = json.dumps(event.get("end"))
+        row.start_at = start_at
+        row.end_at = end_at
+        row.html_link = event.get("htmlLink")
+
+
+def _list_all(service, **params) -> tuple[list[dict], str | None]:
+    items: list[dict] = []
+    page_token = None
+    while True:
+        if page_token:
+            params["pageToken"] = page_token
+        results = service.events().list(
+            calendarId="primary",
+            singleEvents=True,
+            maxResults=PAGE_SIZE,
+            **params
+        ).execute()
+        items.extend(results.get("items", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return items, results.get("nextSyncToken")
+
+
+def sync_calendar(*, user_id, db: Session) -> CalendarSyncState:
+    """
+    Bring the user's event cache up to date. The first sync lists events from
+    the last CALENDAR_SYNC_PAST_DAYS days onwards (timeMin), so an old account
+    does not pull years of past recurring instances; later syncs only fetch
+    what changed since the stored syncToken. Events that have since ended
+    before the window are pruned on every sync.
+    """
+    user_uuid = _as_uuid(user_id)
+
+    with _sync_locks.hold(str(user_uuid)):
+        state = db.get(CalendarSyncState, user_uuid, populate_existing=True)
+        # Another request synced while we waited for the lock.
+        if _is_fresh(state):
+            return state
+
+        service = get_calendar_service(user_id=user_id, db=db)
+        if state is None:
+            state = CalendarSyncState(user_id=user_uuid)
+            db.add(state)
+
+        full_sync = state.sync_token is None
+        if not full_sync:
+            try:
+                items, sync_token = _list_all(service, syncToken=state.sync_token)
+            except HttpError as e:
+                # 410 Gone: the sync token expired, start over.
+                if e.resp.status != 410:
+                    raise
+                full_sync = True
+
+        window_start = _window_start()
+        if full_sync:
+            items, sync_token = _list_all(service, timeMin=window_start.isoformat() + "Z")
+            db.query(CalendarEvent).filter(CalendarEvent.user_id == user_uuid).delete()
+
+        store_events(db, user_uuid, items)
+        # Deltas may carry edits to old events; flush them so the prune sees them too.
+        db.flush()
+        pruned = db.query(CalendarEvent).filter(
+            CalendarEvent.user_id == user_uuid,
+            CalendarEvent.end_at < window_start,
+        ).delete(synchronize_session=False)
+        state.sync_token = sync_token
+        state.last_synced_at = datetime.utcnow()
+        db.commit()
+        if items or pruned or full_sync:
+            invalidate_busy_index(user_uuid)
+        return state
+
+
+def invalidate_busy_index(user_id):
+    """Drop the user's busy index after a change to their cached events."""
+    with _busy_indexes_guard:
+        _busy_indexes.pop(_as_uuid(user_id), None)
+
+
+def _cached_busy_index(user_uuid: uuid.UUID, sync_token: str | None) -> BusyIndex | None:
+    with _busy_indexes_guard:
+        cached = _busy_indexes.get(user_uuid)
+        if cached is None or cached[0] != sync_token:
+            return None
+        _busy_indexes.move_to_end(user_uuid)
+        return cached[1]
+
+
+def _store_busy_index(user_uuid: uuid.UUID, sync_token: str | None, index: BusyIndex):
+    with _busy_indexes_guard:
+        _busy_indexes[user_uuid] = (sync_token, index)
+        _busy_indexes.move_to_end(user_uuid)
+        while len(_busy_indexes) > CALENDAR_BUSY_INDEX_MAX_USERS:
+            _busy_indexes.popitem(last=False)
+            metrics.inc("calendar_busy_index_evictions_total")
+
+
+# ---------- reads ----------
+def _ensure_synced(user_id, db: Session) -> CalendarSyncState | None:
+    """Sync a delta if the cache is stale; a failed sync falls back to the existing cache."""
+    state = db.get(CalendarSyncState, _as_uuid(user_id))
+    if _is_fresh(state):
+        return state
+    try:
+        return sync_calendar(user_id=user_id, db=db)
+    except Exception as e:
+        db.rollback()
+        if state is None or state.sync_token is None:
+            raise
+        print(f"⚠️ Calendar sync failed, serving cached events: {type(e).__name__}: {e}")
+        return state
+
+
+def get_cached_events(
+    *,
+    user_id,
+    db: Session,
+    start: datetime,
+    end: datetime,
+    max_results: int | None = None
+) -> list[dict]:
+    """
+    Events overlapping [start, end), ordered by start time, from the local
+    cache. Syncs a delta first when the cache is older than the freshness bound;
+    if that fails, a previously synced cache is served as-is.
+    """
+    user_uuid = _as_uuid(user_id)
+    _ensure_synced(user_id, db)
+
+    query = (
+        db.query(CalendarEvent)
+        .filter(
+            CalendarEvent.user_id == user_uuid,
+            CalendarEvent.start_at < _naive_utc(end),
+            CalendarEvent.end_at > _naive_utc(start),
+        )
+        .order_by(CalendarEvent.start_at)
+    )
+    if max_results is not None:
+        query = query.limit(max_results)
+
+    return [_event_dict(row) for row in query]
+
+
+def get_busy_index(*, user_id, db: Session) -> BusyIndex:
+    """
+    Interval index over every cached event of the user, for conflict checks and
+    free-slot search across the whole calendar. Built once per sync token and
+    reused until the cache changes.
+    """
+    user_uuid = _as_uuid(user_id)
+    state = _ensure_synced(user_id, db)
+    sync_token = state.sync_token if state is not None else None
+
+    index = _cached_busy_index(user_uuid, sync_token)
+    if index is not None:
+        return index
+
+    rows = db.query(CalendarEvent).filter(CalendarEvent.user_id == user_uuid)
+    index = BusyIndex([(row.start_at, row.end_at, _event_dict(row)) for row in rows])
+    _store_busy_index(user_uuid, sync_token, index)
+    return index
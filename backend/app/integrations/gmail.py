@@ -1,27 +1,7 @@
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from googleapiclient.errors import HttpError
-from googleapiclient.discovery import build
 from sqlalchemy.orm import Session
 
-from app.integrations.google_credentials import get_valid_google_credentials
-
-
-def get_gmail_service(*, user_id, db: Session):
-    creds = get_valid_google_credentials(
-        user_id=user_id,
-        db=db,
-        required_scopes=[
-            "https://www.googleapis.com/auth/gmail.readonly"
-        ]
-    )
-
-    return build("gmail", "v1", credentials=creds)
-
-from googleapiclient.discovery import build
-from sqlalchemy.orm import Session
-
-from app.integrations.google_credentials import get_valid_google_credentials
+from app.integrations.google_services import get_gmail_service
+from app.integrations.gmail_fetch import fetch_messages
 
 
 def fetch_latest_emails(*, user_id, db: Session, max_results: int = 5):
@@ -30,45 +10,18 @@ def fetch_latest_emails(*, user_id, db: Session, max_results: int = 5):
     Automatically refreshes Google access token if expired.
     """
 
-    # 1. Get valid (auto-refreshed) Google credentials
-    creds = get_valid_google_credentials(
-        user_id=user_id,
-        db=db,
-        required_scopes=[
-            "https://www.googleapis.com/auth/gmail.readonly"
-        ]
-    )
-
-    # 2. Build Gmail service
-    service = build("gmail", "v1", credentials=creds)
-
-    # 3. Fetch message IDs
-    results = service.users().messages().list(
-        userId="me",
-        maxResults=max_results
-    ).execute()
-
-    messages = results.get("messages", [])
-    emails = []
+    # 1. Get a (cached) Gmail service with valid, auto-refreshed credentials
+    service = get_gmail_service(user_id=user_id, db=db)
 
-    # 4. Fetch metadata for each message
-    for msg in messages:
-        msg_data = service.users().messages().get(
-            userId="me",
-            id=msg["id"],
-            format="metadata",
-            metadataHeaders=["From", "Subject"]
-        ).execute()
-
-        headers = {
-            h["name"]: h["value"]
-            for h in msg_data.get("payload", {}).get("headers", [])
-        }
-
-        emails.append({
-            "from": headers.get("From"),
-            "subject": headers.get("Subject"),
-        })
+    # 2. List message ids and fetch their metadata in batches
+    messages = fetch_messages(
+        service,
+        max_results=max_results,
+        metadata_headers=["From", "Subject"]
+    )
 
-    # 5. Return emails
-    return emails
+    # 3. Return emails
+    return [
+        {"from": m["from"], "subject": m["subject"]}
+        for m in messages
+    ]
@@ -0,0 +1,137 @@
+from googleapiclient.errors import HttpError
+
+from app.core import metrics, tracing
+
+
+# Gmail accepts up to 100 calls per batch but recommends 50 to avoid rate limiting.
+BATCH_SIZE = 50
+# messages.list returns at most 500 ids per page.
+MAX_PAGE_SIZE = 500
+DEFAULT_METADATA_HEADERS = ["From", "Subject", "Date"]
+
+
+def list_message_ids(
+    service,
+    *,
+    query: str | None = None,
+    max_results: int = 10
+) -> list[str]:
+    """
+    List message ids (newest first), following nextPageToken until
+    max_results ids have been collected or the mailbox runs out.
+    """
+    ids: list[str] = []
+    page_token = None
+
+    while len(ids) < max_results:
+        params = {
+            "userId": "me",
+            "maxResults": min(max_results - len(ids), MAX_PAGE_SIZE),
+        }
+        if query:
+            params["q"] = query
+        if page_token:
+            params["pageToken"] = page_token
+
+        results = service.users().messages().list(**params).execute()
+        ids.extend(m["id"] for m in results.get("messages", []))
+
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+
+    return ids[:max_results]
+
+
+def parse_message_metadata(message: dict) -> dict:
+    """Single parsing path for a messages.get(format="metadata") payload."""
+    headers = {
+        h["name"]: h["value"]
+        for h in message.get("payload", {}).get("headers", [])
+    }
+    return {
+        "id": message.get("id"),
+        "threadId": message.get("threadId"),
+        "labelIds": message.get("labelIds", []),
+        "snippet": message.get("snippet"),
+        "internalDate": message.get("internalDate"),
+        "headers": headers,
+        "from": headers.get("From"),
+        "subject": headers.get("Subject"),
+        "date": headers.get("Date"),
+    }
+
+
+def _metadata_request(service, message_id: str, metadata_headers: list[str]):
+    return service.users().messages().get(
+        userId="me",
+        id=message_id,
+        format="metadata",
+        metadataHeaders=metadata_headers
+    )
+
+
+def fetch_message_metadata(
+    service,
+    message_ids: list[str],
+    *,
+    metadata_headers: list[str] | None = None
+) -> list[dict]:
+    """
+    Fetch metadata for many messages using Gmail batch HTTP requests
+    (one round trip per BATCH_SIZE messages instead of one per message).
+    Results keep the order of message_ids. Messages deleted in the meantime
+    (404) are skipped; other per-message failures are retried once on their own.
+    """
+    metadata_headers = metadata_headers or DEFAULT_METADATA_HEADERS
+    parsed: dict[str, dict] = {}
+    failed: list[str] = []
+
+    def _on_response(request_id, response, exception):
+        if exception is None:
+            parsed[request_id] = parse_message_metadata(response)
+        elif isinstance(exception, HttpError) and exception.resp.status == 404:
+            return
+        else:
+            failed.append(request_id)
+
+    for i in range(0, len(message_ids), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=_on_response)
+        for message_id in message_ids[i:i + BATCH_SIZE]:
+            batch.add(
+                _metadata_request(service, message_id, metadata_headers),
+                request_id=message_id
+            )
+        metrics.inc("google_api_calls_total", api="gmail", operation="batch")
+        with tracing.dependency("gmail", "batch"):
+            batch.execute()
+
+    # Sub-requests can be rate limited individually inside a batch.
+    for message_id in failed:
+        try:
+            response = _metadata_request(service, message_id, metadata_headers).execute(num_retries=2)
+        except HttpError as e:
+            if e.resp.status == 404:
+                continue
+            raise
+        parsed[message_id] = parse_message_metadata(response)
+
+    return [parsed[mid] for mid in message_ids if mid in parsed]
+
+
+def fetch_messages(
+    service,
+    *,
+    query: str | None = None,
+    max_results: int = 10,
+    metadata_headers: list[str] | None = None
+) -> list[dict]:
+    """List matching messages and fetch their metadata in batches."""
+    message_ids = list_message_ids(service, query=query, max_results=max_results)
+    if not message_ids:
+        return []
+    return fetch_message_metadata(
+        service,
+        message_ids,
+        metadata_headers=metadata_headers
+    )
@@ -0,0 +1,231 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from googleapiclient.errors import HttpError
+from sqlalchemy.orm import Session
+
+from app.core.config import MAILBOX_BACKFILL_DAYS, MAILBOX_MIRROR_FRESHNESS_SECONDS
+from app.core.keyed_locks import KeyedLocks
+from app.db.models import MailboxMessage, MailboxSyncState
+from app.integrations.gmail_fetch import fetch_message_metadata, fetch_messages
+from app.integrations.google_services import get_gmail_service
+
+
+BACKFILL_MAX_MESSAGES = 1000
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+# messages.list skips these by default, so the mirror does too.
+EXCLUDED_LABELS = {"SPAM", "TRASH"}
+
+# One sync at a time per user; concurrent requests wait and then read the result.
+_sync_locks = KeyedLocks()
+
+
+def _as_uuid(user_id) -> uuid.UUID:
+    return uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _is_fresh(state: MailboxSyncState | None) -> bool:
+    return (
+        state is not None
+        and state.last_synced_at is not None
+        and datetime.utcnow() - state.last_synced_at < timedelta(seconds=MAILBOX_MIRROR_FRESHNESS_SECONDS)
+    )
+
+
+# ---------- writes ----------
+def _store_messages(db: Session, user_uuid: uuid.UUID, messages: list[dict]):
+    """Insert or update mirrored rows; messages now in spam/trash are dropped."""
+    if not messages:
+        return
+
+    existing = {
+        row.id: row
+        for row in db.query(MailboxMessage).filter(
+            MailboxMessage.user_id == user_uuid,
+            MailboxMessage.id.in_([m["id"] for m in messages])
+        )
+    }
+
+    for m in messages:
+        row = existing.get(m["id"])
+        if EXCLUDED_LABELS & set(m["labelIds"]):
+            if row is not None:
+                db.delete(row)
+            continue
+
+        if row is None:
+            row = MailboxMessage(user_id=user_uuid, id=m["id"])
+            db.add(row)
+        row.thread_id = m["threadId"]
+        row.sender = m["from"]
+        row.subject = m["subject"]
+        row.date = m["date"]
+        row.internal_date = datetime.utcfromtimestamp(int(m["internalDate"] or 0) / 1000)
+        row.label_ids = " ".join(m["labelIds"])
+        row.snippet = m["snippet"]
+
+
+def _covered_from(since: datetime, messages: list[dict]) -> datetime:
+    """Where the backfilled mirror is complete from; later than `since` when the listing hit the cap."""
+    if len(messages) < BACKFILL_MAX_MESSAGES:
+        return since
+    # Listed newest first and cut at the cap: only mail after the oldest listed
+    # message is complete (another one with the same timestamp may be missing).
+    oldest = min(int(m["internalDate"] or 0) for m in messages)
+    return max(since, datetime.utcfromtimestamp(oldest / 1000) + timedelta(milliseconds=1))
+
+
+def _backfill(db: Session, service, user_uuid: uuid.UUID, state: MailboxSyncState | None) -> MailboxSyncState:
+    # Take the historyId before listing so nothing that arrives meanwhile is missed.
+    history_id = service.users().getProfile(userId="me").execute()["historyId"]
+    since = (datetime.utcnow() - timedelta(days=MAILBOX_BACKFILL_DAYS)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    messages = fetch_messages(
+        service,
+        query=f"after:{int(since.replace(tzinfo=timezone.utc).timestamp())}",
+        max_results=BACKFILL_MAX_MESSAGES
+    )
+
+    db.query(MailboxMessage).filter(MailboxMessage.user_id == user_uuid).delete()
+    _store_messages(db, user_uuid, messages)
+
+    if state is None:
+        state = MailboxSyncState(user_id=user_uuid)
+        db.add(state)
+    state.history_id = str(history_id)
+    state.backfilled_from = _covered_from(since, messages)
+    state.last_synced_at = datetime.utcnow()
+    db.commit()
+    return state
+
+
+def _apply_history(db: Session, service, user_uuid: uuid.UUID, state: MailboxSyncState) -> MailboxSyncState:
+    added: set[str] = set()
+    deleted: set[str] = set()
+    relabelled: set[str] = set()
+    latest_history_id = state.history_id
+    page_token = None
+
+    while True:
+        params = {
+            "userId": "me",
+            "startHistoryId": state.history_id,
+            "historyTypes": HISTORY_TYPES,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        results = service.users().history().list(**params).execute()
+
+        for record in results.get("history", []):
+            for item in record.get("messagesAdded", []):
+                added.add(item["message"]["id"])
+                deleted.discard(item["message"]["id"])
+            for item in record.get("messagesDeleted", []):
+                deleted.add(item["message"]["id"])
+                added.discard(item["message"]["id"])
+            for key in ("labelsAdded", "labelsRemoved"):
+                for item in record.get(key, []):
+                    relabelled.add(item["message"]["id"])
+
+        latest_history_id = results.get("historyId", latest_history_id)
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+
+    if relabelled:
+        # Only refresh label changes for messages the mirror already holds.
+        relabelled = {
+            row.id
+            for row in db.query(MailboxMessage.id).filter(
+                MailboxMessage.user_id == user_uuid,
+                MailboxMessage.id.in_(relabelled)
+            )
+        }
+
+    to_fetch = list((added | relabelled) - deleted)
+    if to_fetch:
+        _store_messages(db, user_uuid, fetch_message_metadata(service, to_fetch))
+    if deleted:
+        db.query(MailboxMessage).filter(
+            MailboxMessage.user_id == user_uuid,
+            MailboxMessage.id.in_(deleted)
+        ).delete(synchronize_session=False)
+
+    state.history_id = str(latest_history_id)
+    state.last_synced_at = datetime.utcnow()
+    db.commit()
+    return state
+
+
+def sync_mailbox(*, user_id, db: Session) -> MailboxSyncState:
+    """
+    Bring the user's mirror up to date: a backfill of the last
+    MAILBOX_BACKFILL_DAYS days the first time, then History API deltas.
+    """
+    user_uuid = _as_uuid(user_id)
+
+    with _sync_locks.hold(str(user_uuid)):
+        state = db.get(MailboxSyncState, user_uuid, populate_existing=True)
+        # Another request synced while we waited for the lock.
+        if _is_fresh(state):
+            return state
+
+        service = get_gmail_service(user_id=user_id, db=db)
+        if state is None or state.history_id is None:
+            return _backfill(db, service, user_uuid, state)
+
+        try:
+            return _apply_history(db, service, user_uuid, state)
+        except HttpError as e:
+            # historyId too old (404): start over with a fresh backfill.
+            if e.resp.status != 404:
+                raise
+            db.rollback()
+            return _backfill(db, service, user_uuid, state)
+
+
+# ---------- reads ----------
+def get_mirrored_messages(
+    *,
+    user_id,
+    db: Session,
+    start: datetime,
+    end: datetime,
+    max_results: int = 10
+) -> list[dict] | None:
+    """
+    Messages received in [start, end) from the local mirror, newest first.
+    Syncs a delta first if the mirror is older than the freshness bound.
+    Returns None when the mirror does not cover the window, in which case the
+    caller should query Gmail live.
+    """
+    user_uuid = _as_uuid(user_id)
+    start = _naive_utc(start)
+    end = _naive_utc(end)
+
+    state = db.get(MailboxSyncState, user_uuid)
+    if not _is_fresh(state):
+        state = sync_mailbox(user_id=user_id, db=db)
+
+    if state.backfilled_from is None or start < state.backfilled_from:
+        return None
+
+    rows = (
+        db.query(MailboxMessage)
+        .filter(
+            MailboxMessage.user_id == user_uuid,
+            MailboxMessage.internal_date >= start,
+            MailboxMessage.internal_date < end,
+        )
+        .order_by(MailboxMessage.internal_date.desc())
+        .limit(max_results)
+        .all()
+    )
+    return [{"from": r.sender, "subject": r.subject} for r in rows]
@@ -1,62 +1,187 @@
-from datetime import datetime
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 from sqlalchemy.orm import Session
 from google.auth.exceptions import RefreshError
 from fastapi import HTTPException
 
 
 from app.db.models import GoogleCredential
+from app.core import metrics, tracing
 from app.core.config import (
     GOOGLE_CLIENT_ID,
-    GOOGLE_CLIENT_SECRET
+    GOOGLE_CLIENT_SECRET,
+    GOOGLE_CREDENTIAL_CACHE_MAX_USERS,
 )
+from app.core.keyed_locks import KeyedLocks
+from app.integrations.google_http import google_auth_request
 
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+# Tokens this close to expiry are refreshed before being handed out.
+REFRESH_MARGIN = timedelta(minutes=5)
+
+
+# ---------- process-wide credential cache ----------
+# LRU of user_id -> {"access_token", "refresh_token", "expires_at"}, at most
+# GOOGLE_CREDENTIAL_CACHE_MAX_USERS; a miss reads the stored row again.
+_cache: "OrderedDict[str, dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+# One lock per user makes refreshes single-flight: concurrent requests for
+# the same user wait for the first refresh instead of issuing their own.
+_refresh_locks = KeyedLocks()
 
-def get_valid_google_credentials(
-    user_id,
-    db: Session,
-    required_scopes: list[str]
-) -> Credentials:
-    """
-    Returns a valid Google Credentials object.
-    Automatically refreshes the access token if expired.
-    """
 
-    # 1. Load stored credentials from DB
+def _cached_entry(user_key: str) -> dict | None:
+    with _cache_lock:
+        entry = _cache.get(user_key)
+        if entry is not None:
+            _cache.move_to_end(user_key)
+        return entry
+
+
+def _store_entry(user_key: str, entry: dict, only_if_cached: bool = False):
+    with _cache_lock:
+        if only_if_cached and user_key not in _cache:
+            # Background refreshes must not push active users out of the cache.
+            return
+        _cache[user_key] = entry
+        _cache.move_to_end(user_key)
+        while len(_cache) > GOOGLE_CREDENTIAL_CACHE_MAX_USERS:
+            _cache.popitem(last=False)
+            metrics.inc("google_credential_cache_evictions_total")
+
+
+def _entry_from_row(row: GoogleCredential) -> dict:
+    return {
+        "access_token": row.access_token,
+        "refresh_token": row.refresh_token,
+        "expires_at": row.expires_at,
+    }
+
+
+def _is_near_expiry(entry: dict, margin: timedelta = REFRESH_MARGIN) -> bool:
+    expires_at = entry["expires_at"]
+    return expires_at is None or expires_at - margin <= datetime.utcnow()
+
+
+def _load_row(db: Session, user_id) -> GoogleCredential:
+    user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
     creds_row = (
         db.query(GoogleCredential)
-        .filter(GoogleCredential.user_id == user_id)
+        .filter(GoogleCredential.user_id == user_uuid)
         .first()
     )
 
     if not creds_row:
         raise Exception("Google credentials not found for user")
 
-    # 2. Build Credentials object
-    credentials = Credentials(
-        token=creds_row.access_token,
-        refresh_token=creds_row.refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
+    return creds_row
+
+
+def _build_credentials(entry: dict, scopes: list[str] | None) -> Credentials:
+    return Credentials(
+        token=entry["access_token"],
+        refresh_token=entry["refresh_token"],
+        token_uri=TOKEN_URI,
         client_id=GOOGLE_CLIENT_ID,
         client_secret=GOOGLE_CLIENT_SECRET,
-        scopes=required_scopes
+        scopes=scopes,
+        expiry=entry["expires_at"],
     )
 
-    # 3. Check expiry and refresh if needed
-    if credentials.expired:
+
+def _refresh(
+    user_key: str,
+    user_id,
+    db: Session,
+    stale: dict | None,
+    margin: timedelta = REFRESH_MARGIN,
+    background: bool = False,
+) -> dict:
+    with _refresh_locks.hold(user_key):
+        # Someone else refreshed while we were waiting for the lock.
+        current = _cache.get(user_key)
+        if current is not None and current is not stale and not _is_near_expiry(current, margin):
+            metrics.inc("google_credential_refresh_coalesced_total")
+            return current
+
+        # The OAuth callback or another replica may already have a fresh token.
+        creds_row = _load_row(db, user_id)
+        entry = _entry_from_row(creds_row)
+        if not _is_near_expiry(entry, margin):
+            _store_entry(user_key, entry, only_if_cached=background)
+            return entry
+
+        # No scopes on refresh: the new token carries everything that was granted.
+        credentials = _build_credentials(entry, scopes=None)
         try:
-            credentials.refresh(Request())
+            with tracing.dependency("google_oauth", "token_refresh"):
+                credentials.refresh(google_auth_request())
         except RefreshError:
+            invalidate_google_credentials(user_id)
+            metrics.inc("google_credential_refresh_failures_total")
             raise HTTPException(
                 status_code=401,
                 detail="Google access expired. Please reconnect your Google account."
             )
+        metrics.inc("google_credential_refreshes_total")
+        if background:
+            metrics.inc("google_credential_background_refreshes_total")
 
         creds_row.access_token = credentials.token
         creds_row.expires_at = credentials.expiry
         creds_row.updated_at = datetime.utcnow()
         db.commit()
 
+        entry = _entry_from_row(creds_row)
+        _store_entry(user_key, entry, only_if_cached=background)
+        return entry
+
+
+def get_valid_google_credentials(
+    user_id,
+    db: Session,
+    required_scopes: list[str]
+) -> Credentials:
+    """
+    Returns a valid Google Credentials object.
+    Served from the in-memory cache; the DB is only read on a cache miss or
+    when the token is near expiry, in which case it is refreshed once per user.
+    """
+    user_key = str(user_id)
+
+    # 1. Cached token, or load stored credentials from DB
+    entry = _cached_entry(user_key)
+    if entry is None:
+        metrics.inc("google_credential_cache_misses_total")
+        entry = _entry_from_row(_load_row(db, user_id))
+        _store_entry(user_key, entry)
+    else:
+        metrics.inc("google_credential_cache_hits_total")
+
+    # 2. Refresh (single-flight) if expired or about to expire. The background
+    #    token refresher normally gets there first, so this is the fallback.
+    if _is_near_expiry(entry):
+        entry = _refresh(user_key, user_id, db, entry)
+
+    # 3. Build Credentials object
+    return _build_credentials(entry, required_scopes)
+
+
+def refresh_google_credentials(user_id, db: Session, margin: timedelta) -> None:
+    """
+    Refresh the stored token ahead of time if it expires within `margin`
+    (used by the background token refresher). Shares the per-user lock with
+    the request path, so the two never refresh the same user at once.
+    """
+    user_key = str(user_id)
+    _refresh(user_key, user_id, db, _cache.get(user_key), margin, background=True)
+
 
-    return credentials
+def invalidate_google_credentials(user_id) -> None:
+    """Forget cached tokens for a user, e.g. after the OAuth callback stores new ones."""
+    with _cache_lock:
+        _cache.pop(str(user_id), None)
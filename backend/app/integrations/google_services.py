@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpRequest
+from sqlalchemy.orm import Session
+
+from app.core import metrics, tracing
+from app.integrations.google_credentials import get_valid_google_credentials
+from app.integrations.google_http import PooledHttp
+
+
+GMAIL_READONLY_SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
+# The OAuth consent asks for full calendar access, so reads and writes share
+# one scope set (and therefore one cached service object).
+CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+SERVICE_CACHE_TTL_SECONDS = 15 * 60
+SERVICE_CACHE_MAX_ENTRIES = 512
+
+
+# ---------- discovery documents ----------
+# googleapiclient ships static discovery documents; parse each one once per
+# process so building a service never touches the network or re-parses JSON.
+_discovery_docs: dict[tuple[str, str], dict] = {}
+_discovery_lock = threading.Lock()
+
+
+def get_discovery_document(api: str, version: str) -> dict:
+    key = (api, version)
+    doc = _discovery_docs.get(key)
+    if doc is None:
+        with _discovery_lock:
+            doc = _discovery_docs.get(key)
+            if doc is None:
+                content = discovery_cache.get_static_doc(api, version)
+                if content is None:
+                    raise ValueError(f"No bundled discovery document for {api} {version}")
+                doc = json.loads(content)
+                _discovery_docs[key] = doc
+    return doc
+
+
+# ---------- instrumented requests ----------
+class TracedHttpRequest(HttpRequest):
+    """HttpRequest whose execute() is counted and timed per API method (e.g. gmail users.messages.list)."""
+
+    def execute(self, http=None, num_retries=0):
+        api, _, operation = (self.methodId or "google.unknown").partition(".")
+        metrics.inc("google_api_calls_total", api=api, operation=operation)
+        with tracing.dependency(api, operation):
+            return super().execute(http=http, num_retries=num_retries)
+
+
+# ---------- service cache ----------
+# Built services are cached per (user, API, version, scope set) with TTL + LRU
+# eviction. Their transport is the calling thread's pooled session, which is
+# not thread-safe, so the thread is part of the key: threadpool workers are
+# long-lived, so entries are still reused across nodes of a request and across
+# requests, and all of a thread's services share its keep-alive connections.
+_services: "OrderedDict[tuple, tuple[object, str, float]]" = OrderedDict()
+_services_lock = threading.Lock()
+
+
+def _build_service(api: str, version: str, credentials):
+    http = AuthorizedHttp(credentials, http=PooledHttp())
+    return build_from_document(get_discovery_document(api, version), http=http, requestBuilder=TracedHttpRequest)
+
+
+def get_google_service(
+    api: str,
+    version: str,
+    *,
+    user_id,
+    db: Session,
+    scopes: list[str]
+):
+    """
+    Return a googleapiclient service for the user, reusing a cached one
+    while its access token is unchanged and the entry has not expired.
+    """
+    credentials = get_valid_google_credentials(
+        user_id=user_id,
+        db=db,
+        required_scopes=scopes
+    )
+
+    key = (str(user_id), api, version, frozenset(scopes), threading.get_ident())
+    now = time.monotonic()
+
+    with _services_lock:
+        entry = _services.get(key)
+        if entry is not None:
+            service, token, created_at = entry
+            if token == credentials.token and now - created_at < SERVICE_CACHE_TTL_SECONDS:
+                _services.move_to_end(key)
+                return service
+            del _services[key]
+
+    service = _build_service(api, version, credentials)
+
+    with _services_lock:
+        _services[key] = (service, credentials.token, now)
+        _services.move_to_end(key)
+        while len(_services) > SERVICE_CACHE_MAX_ENTRIES:
+            _services.popitem(last=False)
+
+    return service
+
+
+def invalidate_google_services(user_id) -> None:
+    """Drop every cached service for a user (e.g. after reconnecting Google)."""
+    user_key = str(user_id)
+    with _services_lock:
+        for key in [k for k in _services if k[0] == user_key]:
+            del _services[key]
+
+
+def get_gmail_service(*, user_id, db: Session):
+    return get_google_service(
+        "gmail", "v1",
+        user_id=user_id,
+        db=db,
+        scopes=GMAIL_READONLY_SCOPES
+    )
+
+
+def get_calendar_service(*, user_id, db: Session):
+    return get_google_service(
+        "calendar", "v3",
+        user_id=user_id,
+        db=db,
+        scopes=CALENDAR_SCOPES
+    )
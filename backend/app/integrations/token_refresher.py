@@ -0,0 +1,151 @@
+"""
+Background refresh of Google access tokens.
+
+Tokens are refreshed TOKEN_REFRESH_LEAD_SECONDS before they expire, well
+inside the request path's own refresh margin, so get_valid_google_credentials
+finds a valid token and (almost) never calls oauth2.googleapis.com itself.
+
+Each scan claims the soonest-expiring rows by setting refresh_claimed_until
+under FOR UPDATE SKIP LOCKED. That lease is the cursor shared by all
+replicas: a claimed row is skipped everywhere else until the lease runs out,
+so no user is refreshed twice. A failed refresh keeps its lease for
+TOKEN_REFRESH_FAILURE_BACKOFF_SECONDS, so a revoked grant is not retried on
+every scan.
+"""
+
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import (
+    TOKEN_REFRESH_BATCH_SIZE,
+    TOKEN_REFRESH_CLAIM_SECONDS,
+    TOKEN_REFRESH_CONCURRENCY,
+    TOKEN_REFRESH_ENABLED,
+    TOKEN_REFRESH_FAILURE_BACKOFF_SECONDS,
+    TOKEN_REFRESH_INTERVAL_SECONDS,
+    TOKEN_REFRESH_LEAD_SECONDS,
+    TOKEN_REFRESH_SPACING_SECONDS,
+)
+from app.db.database import SessionLocal
+from app.db.models import GoogleCredential
+from app.integrations.google_credentials import refresh_google_credentials
+
+LEAD = timedelta(seconds=TOKEN_REFRESH_LEAD_SECONDS)
+
+_stop = threading.Event()
+_thread: threading.Thread | None = None
+_pool: ThreadPoolExecutor | None = None
+
+
+def _jittered(seconds: float) -> float:
+    return seconds * random.uniform(0.5, 1.5)
+
+
+# ---------- claim ----------
+def _claim_batch(db: Session) -> list:
+    """Lease the soonest-expiring due rows that no other replica holds; returns their user_ids."""
+    now = datetime.utcnow()
+    rows = (
+        db.query(GoogleCredential)
+        .filter(
+            GoogleCredential.expires_at <= now + LEAD,
+            or_(
+                GoogleCredential.refresh_claimed_until.is_(None),
+                GoogleCredential.refresh_claimed_until < now,
+            ),
+        )
+        .order_by(GoogleCredential.expires_at)
+        .limit(TOKEN_REFRESH_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    lease = now + timedelta(seconds=TOKEN_REFRESH_CLAIM_SECONDS)
+    for row in rows:
+        row.refresh_claimed_until = lease
+    user_ids = [row.user_id for row in rows]
+    db.commit()
+    return user_ids
+
+
+# ---------- refresh ----------
+def _refresh_one(user_id) -> bool:
+    db = SessionLocal()
+    try:
+        # Single-flight with the request path; a no-op if the token is already fresh.
+        refresh_google_credentials(user_id, db, margin=LEAD)
+        metrics.inc("token_refresher_refreshes_total", outcome="ok")
+        return True
+    except Exception as e:
+        db.rollback()
+        metrics.inc("token_refresher_refreshes_total", outcome="failed")
+        print(f"⚠️ Token refresh failed for {user_id}: {type(e).__name__}: {getattr(e, 'detail', e)}")
+        # Keep the lease for the backoff period instead of retrying on the next scan.
+        db.query(GoogleCredential).filter(GoogleCredential.user_id == user_id).update(
+            {"refresh_claimed_until": datetime.utcnow() + timedelta(seconds=TOKEN_REFRESH_FAILURE_BACKOFF_SECONDS)}
+        )
+        db.commit()
+        return False
+    finally:
+        db.close()
+
+
+def run_once(db: Session) -> int:
+    """Claim one batch and refresh it. Returns the number of rows claimed (0 = nothing due)."""
+    user_ids = _claim_batch(db)
+    metrics.set_gauge("token_refresher_last_batch_size", len(user_ids))
+    if not user_ids:
+        return 0
+
+    # At most TOKEN_REFRESH_CONCURRENCY in flight (pool size); starts are spaced
+    # with jitter so a batch never hits the token endpoint as one burst.
+    futures = []
+    for i, user_id in enumerate(user_ids):
+        if i and _stop.wait(_jittered(TOKEN_REFRESH_SPACING_SECONDS)):
+            break
+        futures.append(_pool.submit(_refresh_one, user_id))
+    wait(futures)
+    return len(user_ids)
+
+
+def _refresher_loop():
+    while not _stop.is_set():
+        db = SessionLocal()
+        try:
+            claimed = run_once(db)
+        except Exception as e:
+            print(f"❌ Token refresher error: {type(e).__name__}: {e}")
+            db.rollback()
+            claimed = 0
+        finally:
+            db.close()
+
+        # A full batch means more may be due: go again right away. Otherwise
+        # sleep, with jitter so replicas do not scan in lockstep.
+        if claimed < TOKEN_REFRESH_BATCH_SIZE:
+            _stop.wait(_jittered(TOKEN_REFRESH_INTERVAL_SECONDS))
+
+
+def start_token_refresher():
+    global _thread, _pool
+    if not TOKEN_REFRESH_ENABLED:
+        return
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _pool = ThreadPoolExecutor(max_workers=TOKEN_REFRESH_CONCURRENCY, thread_name_prefix="token-refresh")
+    _thread = threading.Thread(target=_refresher_loop, name="token-refresher", daemon=True)
+    _thread.start()
+
+
+def stop_token_refresher(timeout: float = 10):
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
@@ -1,20 +1,47 @@
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.core import metrics
 from app.core.config import APP_NAME
-from app.db.database import engine
+from app.db.database import async_engine, engine
 from app.db import models
+from app.db.migrations import run_migrations
 from app.auth.routes import router as auth_router
 from app.api.chat import router as chat_router
 from app.auth.google_auth import router as google_auth_router
 from app.api.gmail import router as gmail_router
 from app.api.calendar import router as calendar_router
+from app.agent.graph import warm_graph, awarm_graph
+from app.agent.memory_worker import start_memory_worker, stop_memory_worker
+from app.agent.conversation import wait_for_compactions
+from app.integrations.token_refresher import start_token_refresher, stop_token_refresher
 
 # Create tables on startup
 models.Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the agent graphs once per process before serving traffic
+    warm_graph()
+    await awarm_graph()
+    # Drain queued memory extractions off the request path
+    start_memory_worker()
+    # Refresh Google tokens before they expire, off the request path
+    start_token_refresher()
+    yield
+    stop_token_refresher()
+    stop_memory_worker()
+    await wait_for_compactions()
+    await async_engine.dispose()
 
-app = FastAPI(title=APP_NAME)
+
+app = FastAPI(title=APP_NAME, lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -25,6 +52,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class RequestLatencyMiddleware:
+    """Records http_request_seconds per route (plain ASGI: no extra task per request)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Includes the whole body, so streamed replies count until their last event.
+            route = scope.get("route")
+            metrics.observe(
+                "http_request_seconds",
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route.path if route is not None else "unmatched",
+                status=status,
+            )
+
+
+app.add_middleware(RequestLatencyMiddleware)
+
+
 app.include_router(auth_router)
 
 app.include_router(chat_router)
@@ -39,3 +103,9 @@ app.include_router(calendar_router)
 @app.get("/health")
 def health_check():
     return {"status": "ok", "app": APP_NAME}
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus scrape endpoint (keep it off the public load balancer)."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,9 +1,37 @@
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
 from sqlalchemy.orm import Session
 
-from app.integrations.google_credentials import get_valid_google_credentials
-import socket
+from app.integrations.calendar_cache import get_busy_index, get_cached_events
+
+
+def fetch_events_between(
+    *,
+    user_id,
+    db: Session,
+    start: datetime,
+    end: datetime,
+    max_results: int | None = None
+):
+    """
+    Fetch the user's Google Calendar events overlapping [start, end).
+    Served from the local event cache, which is kept current with syncToken deltas.
+    Google calls time out per request (see app.integrations.google_http).
+    """
+    return get_cached_events(
+        user_id=user_id,
+        db=db,
+        start=start,
+        end=end,
+        max_results=max_results
+    )
+
+
+def fetch_busy_index(*, user_id, db: Session):
+    """
+    Interval index over all of the user's calendar events (see BusyIndex),
+    for conflict checks and free-slot search.
+    """
+    return get_busy_index(user_id=user_id, db=db)
 
 
 def fetch_upcoming_events(
@@ -13,50 +41,14 @@ def fetch_upcoming_events(
     max_results: int = 10
 ):
     """
-    Fetch upcoming Google Calendar events for a user.
+    Fetch upcoming Google Calendar events (next 7 days) for a user.
     """
 
-    creds = get_valid_google_credentials(
+    now = datetime.utcnow()
+    return fetch_events_between(
         user_id=user_id,
         db=db,
-        required_scopes=[
-            "https://www.googleapis.com/auth/calendar.readonly"
-        ]
+        start=now,
+        end=now + timedelta(days=7),
+        max_results=max_results
     )
-
-    # Reduce "hang forever" behavior on slow networks.
-    # This affects underlying httplib2 socket connections used by googleapiclient.
-    # Set a reasonable timeout (15 seconds should be enough for most cases)
-    original_timeout = socket.getdefaulttimeout()
-    socket.setdefaulttimeout(15)
-
-    try:
-        # cache_discovery=False avoids writing discovery cache files in some environments.
-        service = build("calendar", "v3", credentials=creds, cache_discovery=False)
-
-        now = datetime.utcnow().isoformat() + "Z"
-        one_week = (datetime.utcnow() + timedelta(days=7)).isoformat() + "Z"
-
-        events_result = service.events().list(
-            calendarId="primary",
-            timeMin=now,
-            timeMax=one_week,
-            maxResults=max_results,
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
-    finally:
-        # Restore original timeout setting
-        socket.setdefaulttimeout(original_timeout)
-
-    events = events_result.get("items", [])
-
-    parsed_events = []
-    for event in events:
-        parsed_events.append({
-            "summary": event.get("summary"),
-            "start": event.get("start"),
-            "end": event.get("end")
-        })
-
-    return parsed_events
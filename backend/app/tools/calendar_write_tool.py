@@ -1,8 +1,8 @@
-from googleapiclient.discovery import build
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.integrations.google_credentials import get_valid_google_credentials
+from app.integrations.google_services import get_calendar_service
+from app.integrations.calendar_cache import invalidate_busy_index, store_events
 
 
 def create_calendar_event(
@@ -17,15 +17,7 @@ def create_calendar_event(
     Create a Google Calendar event for the user.
     """
 
-    creds = get_valid_google_credentials(
-        user_id=user_id,
-        db=db,
-        required_scopes=[
-            "https://www.googleapis.com/auth/calendar"
-        ]
-    )
-
-    service = build("calendar", "v3", credentials=creds)
+    service = get_calendar_service(user_id=user_id, db=db)
 
     event = {
         "summary": title,
@@ -44,6 +36,15 @@ def create_calendar_event(
         body=event
     ).execute()
 
+    # Write through so the next calendar question sees the new event immediately
+    try:
+        store_events(db, user_id, [created_event])
+        db.commit()
+        invalidate_busy_index(user_id)
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Calendar cache write-through failed: {type(e).__name__}: {e}")
+
     return {
         "id": created_event.get("id"),
         "summary": created_event.get("summary"),
@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta, timezone
-from googleapiclient.discovery import build
 from sqlalchemy.orm import Session
 
-from app.integrations.google_credentials import get_valid_google_credentials
+from app.integrations.google_services import get_gmail_service
+from app.integrations.gmail_fetch import fetch_messages
+from app.integrations.gmail_mirror import get_mirrored_messages
 
 
 def fetch_gmail_messages_for_date(
@@ -18,52 +19,42 @@ def fetch_gmail_messages_for_date(
     days_ago = 1 → yesterday
     """
 
-    creds = get_valid_google_credentials(
-        user_id=user_id,
-        db=db,
-        required_scopes=[
-            "https://www.googleapis.com/auth/gmail.readonly"
-        ]
-    )
-
-    service = build("gmail", "v1", credentials=creds)
-
     now = datetime.now(timezone.utc)
     start = (now - timedelta(days=days_ago)).replace(
         hour=0, minute=0, second=0, microsecond=0
     )
     end = start + timedelta(days=1)
 
+    # Answer from the local mailbox mirror when it covers the day
+    try:
+        emails = get_mirrored_messages(
+            user_id=user_id,
+            db=db,
+            start=start,
+            end=end,
+            max_results=max_results
+        )
+        if emails is not None:
+            return emails
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Mailbox mirror unavailable, querying Gmail live: {type(e).__name__}: {e}")
+
+    service = get_gmail_service(user_id=user_id, db=db)
+
     query = (
         f"after:{int(start.timestamp())} "
         f"before:{int(end.timestamp())}"
     )
 
-    results = service.users().messages().list(
-        userId="me",
-        q=query,
-        maxResults=max_results
-    ).execute()
-
-    messages = results.get("messages", [])
-    emails = []
-
-    for msg in messages:
-        data = service.users().messages().get(
-            userId="me",
-            id=msg["id"],
-            format="metadata",
-            metadataHeaders=["From", "Subject"]
-        ).execute()
-
-        headers = {
-            h["name"]: h["value"]
-            for h in data["payload"]["headers"]
-        }
-
-        emails.append({
-            "from": headers.get("From"),
-            "subject": headers.get("Subject"),
-        })
+    messages = fetch_messages(
+        service,
+        query=query,
+        max_results=max_results,
+        metadata_headers=["From", "Subject"]
+    )
 
-    return emails
+    return [
+        {"from": m["from"], "subject": m["subject"]}
+        for m in messages
+    ]
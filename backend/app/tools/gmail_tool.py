@@ -1,7 +1,7 @@
-from googleapiclient.discovery import build
 from sqlalchemy.orm import Session
 
-from app.integrations.google_credentials import get_valid_google_credentials
+from app.integrations.google_services import get_gmail_service
+from app.integrations.gmail_fetch import fetch_messages
 
 
 def fetch_latest_emails(
@@ -14,34 +14,12 @@ def fetch_latest_emails(
     Fetch latest Gmail messages for a user.
     """
 
-    creds = get_valid_google_credentials(
-        user_id=user_id,
-        db=db,
-        required_scopes=[
-            "https://www.googleapis.com/auth/gmail.readonly"
-        ]
-    )
-
-    service = build("gmail", "v1", credentials=creds)
-
-    results = service.users().messages().list(
-        userId="me",
-        maxResults=max_results
-    ).execute()
+    service = get_gmail_service(user_id=user_id, db=db)
 
-    messages = results.get("messages", [])
-    emails = []
-
-    for msg in messages:
-        msg_data = service.users().messages().get(
-            userId="me",
-            id=msg["id"],
-            format="metadata",
-            metadataHeaders=["From", "Subject"]
-        ).execute()
-
-        headers = msg_data["payload"]["headers"]
-        email = {h["name"]: h["value"] for h in headers}
-        emails.append(email)
+    messages = fetch_messages(
+        service,
+        max_results=max_results,
+        metadata_headers=["From", "Subject"]
+    )
 
-    return emails
+    return [m["headers"] for m in messages]
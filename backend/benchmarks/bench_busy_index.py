@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: conflict checks and free-slot search over large calendars,
+linear overlap scan (old calendar_create_node) vs the BusyIndex.
+
+Synthetic calendars span a year of mixed meetings, long blocks and all-day
+events. Every index answer is checked against the linear scan.
+
+Run from backend/:
+    python -m benchmarks.bench_busy_index
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.integrations.busy_index import BusyIndex
+
+SIZES = (1_000, 5_000, 20_000)
+QUERIES = 2_000
+HORIZON = timedelta(days=365)
+ORIGIN = datetime(2025, 1, 1)
+
+
+def make_calendar(size: int, rng: random.Random) -> list[tuple[datetime, datetime, dict]]:
+    events = []
+    for i in range(size):
+        start = ORIGIN + timedelta(minutes=15 * rng.randrange(int(HORIZON.total_seconds() // 900)))
+        kind = rng.random()
+        if kind < 0.85:
+            length = timedelta(minutes=rng.choice((15, 30, 45, 60, 90)))
+        elif kind < 0.97:
+            length = timedelta(hours=rng.randint(2, 8))
+        else:
+            start = start.replace(hour=0, minute=0)
+            length = timedelta(days=rng.randint(1, 5))
+        events.append((start, start + length, {"summary": f"Event {i}"}))
+    return events
+
+
+def linear_overlapping(events, start, end) -> list[dict]:
+    hits = [e for e in events if start < e[1] and e[0] < end]
+    hits.sort(key=lambda e: e[0])
+    return [e[2] for e in hits]
+
+
+def make_queries(rng: random.Random) -> list[tuple[datetime, datetime]]:
+    queries = []
+    for _ in range(QUERIES):
+        start = ORIGIN + timedelta(minutes=15 * rng.randrange(int(HORIZON.total_seconds() // 900)))
+        queries.append((start, start + timedelta(minutes=rng.choice((30, 60)))))
+    return queries
+
+
+def main():
+    rng = random.Random(7)
+    queries = make_queries(rng)
+    print(f"{QUERIES} queries per size; times are per query")
+    print(f"{'events':>8}{'build ms':>10}{'linear µs':>11}{'index µs':>10}{'speedup':>9}{'free slots µs':>15}")
+
+    for size in SIZES:
+        events = make_calendar(size, rng)
+
+        start = time.perf_counter()
+        index = BusyIndex(events)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        expected = [linear_overlapping(events, s, e) for s, e in queries]
+        linear_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+        start = time.perf_counter()
+        actual = [index.overlapping(s, e) for s, e in queries]
+        index_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+        # Same events, same order (ties on start may differ, so compare as sets per query).
+        for want, got in zip(expected, actual):
+            assert sorted(map(id, want)) == sorted(map(id, got)), "index disagrees with linear scan"
+
+        windows = [(e - s, (s.replace(hour=0, minute=0), s.replace(hour=0, minute=0) + timedelta(days=1)), s)
+                   for s, e in queries]
+        start = time.perf_counter()
+        slots = [index.find_free_slots(length, window, near=near) for length, window, near in windows]
+        free_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+        for found in slots:
+            for slot_start, slot_end in found:
+                assert not linear_overlapping(events, slot_start, slot_end), "free slot overlaps an event"
+
+        print(
+            f"{size:>8}{build_ms:>10.1f}{linear_us:>11.1f}{index_us:>10.1f}"
+            f"{linear_us / index_us:>8.0f}x{free_us:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
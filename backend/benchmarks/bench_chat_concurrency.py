@@ -0,0 +1,119 @@
+"""
+Load test: concurrent /chat throughput on one worker, sync graph.invoke
+endpoint (old behaviour) vs the async graph.ainvoke endpoint.
+
+Gemini and Google Calendar are replaced by fakes with fixed latency, and the
+requests are driven in-process through the ASGI app, so the sync endpoint is
+limited by the same anyio threadpool it would have under uvicorn.
+
+Run from backend/:
+    python -m benchmarks.bench_chat_concurrency
+"""
+
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+# Every request should pay the fake LLM latency, not hit the reply cache.
+os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+# ...and must not queue behind the gateway's Gemini rate limits.
+os.environ["LLM_REQUESTS_PER_MINUTE"] = "1000000"
+os.environ["LLM_USER_REQUESTS_PER_MINUTE"] = "1000000"
+
+import httpx
+from fastapi import Depends, FastAPI
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+import app.agent.conversation as conversation
+import app.agent.graph as graph_module
+import app.agent.llm_gateway as llm_gateway
+from app.agent.graph import get_compiled_graph
+from app.agent.schemas import AgentState
+from app.api.chat import ChatRequest, get_db, router as chat_router
+from app.auth.dependencies import get_current_user
+
+LLM_LATENCY = 0.3
+GOOGLE_LATENCY = 0.2
+CONCURRENCY = (10, 50, 200)
+MESSAGES = ["hello there", "What meetings do I have today?"]
+
+
+class FakeLLM:
+    """Answers every prompt with '[]' after a fixed delay."""
+
+    def invoke(self, messages):
+        time.sleep(LLM_LATENCY)
+        return AIMessage(content="[]")
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(LLM_LATENCY)
+        return AIMessage(content="[]")
+
+    async def astream(self, messages):
+        await asyncio.sleep(LLM_LATENCY)
+        yield AIMessageChunk(content="[]")
+
+
+def fake_fetch_events_between(**kwargs):
+    time.sleep(GOOGLE_LATENCY)
+    return []
+
+
+async def no_record_turn(user_id, message, response):
+    """The fake user has no row, so stored history is out of scope here."""
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(chat_router)
+
+    @app.post("/chat-sync")
+    def chat_sync(payload: ChatRequest, current_user=Depends(get_current_user), db=Depends(get_db)):
+        """The pre-async endpoint: sync def + graph.invoke."""
+        result = get_compiled_graph().invoke(
+            AgentState(user_id=str(current_user.id), message=payload.message),
+            config={"configurable": {"db": db}}
+        )
+        return {"response": result.get("response", "")}
+
+    def fake_user():
+        return SimpleNamespace(id="00000000-0000-0000-0000-000000000001", email="bench@example.com")
+
+    def no_db():
+        yield None
+
+    app.dependency_overrides[get_current_user] = fake_user
+    app.dependency_overrides[get_db] = no_db
+    return app
+
+
+async def run_load(app: FastAPI, path: str, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(i: int):
+            r = await client.post(path, json={"message": MESSAGES[i % len(MESSAGES)]})
+            r.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(concurrency)))
+        return time.perf_counter() - start
+
+
+async def main():
+    llm_gateway.client = FakeLLM()
+    graph_module.fetch_events_between = fake_fetch_events_between
+    conversation.record_turn = no_record_turn
+
+    app = build_app()
+    print(f"fake latency: LLM {LLM_LATENCY * 1000:.0f} ms, Google {GOOGLE_LATENCY * 1000:.0f} ms")
+    print(f"{'endpoint':<12}{'requests':>9}{'seconds':>10}{'req/s':>9}")
+    for concurrency in CONCURRENCY:
+        for name, path in (("sync", "/chat-sync"), ("async", "/chat/")):
+            elapsed = await run_load(app, path, concurrency)
+            print(f"{name:<12}{concurrency:>9}{elapsed:>10.2f}{concurrency / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+Prompt size of the chat node over a long conversation.
+
+Drives N general-chat turns through /chat/ (fake Gemini, fresh SQLite
+database) and records the size of every chat prompt. With the recent-turn
+window plus rolling summary the prompt should level off after the first
+few turns instead of growing with the conversation:
+
+    python -m benchmarks.bench_conversation_history --turns 60
+
+Run from backend/.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_e2e import FakeLLM, _seed_user
+
+
+class PromptRecordingLLM(FakeLLM):
+    """FakeLLM that remembers the size of every chat prompt it is sent."""
+
+    def __init__(self, latency: float):
+        super().__init__(latency)
+        self.chat_prompt_chars: list[int] = []
+        self.compactions = 0
+
+    def _reply(self, messages):
+        from langchain_core.messages import AIMessage
+
+        prompt = messages[-1].content
+        if "running summary of a conversation" in prompt:
+            self.compactions += 1
+            return AIMessage(content=f"The user and assistant have exchanged many messages ({self.compactions}).")
+        if "memory extraction engine" not in prompt:
+            self.chat_prompt_chars.append(sum(len(m.content) for m in messages))
+        return super()._reply(messages)
+
+
+async def _run(args) -> dict:
+    import httpx
+
+    import app.agent.llm_gateway as llm_gateway
+    from app.agent.conversation import wait_for_compactions
+    from app.db.database import SessionLocal
+    from app.main import app
+
+    llm = PromptRecordingLLM(args.llm_latency)
+    llm_gateway.client = llm
+
+    db = SessionLocal()
+    try:
+        token = _seed_user(db)
+    finally:
+        db.close()
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=None,
+        ) as client:
+            started = time.perf_counter()
+            for n in range(args.turns):
+                response = await client.post("/chat/", json={"message": f"Tell me something useful, take {n}"})
+                response.raise_for_status()
+                # Let a scheduled compaction land before the next turn, as it would between real messages.
+                await wait_for_compactions()
+            wall = time.perf_counter() - started
+
+    return {"prompts": llm.chat_prompt_chars, "compactions": llm.compactions, "wall_seconds": wall}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="bench_conversation_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch}/bench.db"
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    os.environ.setdefault("GOOGLE_CLIENT_ID", "benchmark")
+    os.environ.setdefault("GOOGLE_CLIENT_SECRET", "benchmark")
+    os.environ["LLM_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["LLM_USER_REQUESTS_PER_MINUTE"] = "1000000"
+    # Every turn is a distinct message, but keep cached replies out of the picture anyway.
+    os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+    os.environ["LLM_CACHE_PERSIST"] = "false"
+
+    try:
+        result = asyncio.run(_run(args))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    prompts = result["prompts"]
+    print(f"{'turn':>6} {'prompt chars':>13}")
+    for turn in sorted({0, 1, 2, 4, 8, 16, 32, len(prompts) // 2, len(prompts) - 1}):
+        if 0 <= turn < len(prompts):
+            print(f"{turn + 1:>6} {prompts[turn]:>13}")
+    settled = prompts[len(prompts) // 2:]
+    print(
+        f"turns: {len(prompts)}  compactions: {result['compactions']}  "
+        f"prompt chars over last half: min {min(settled)} / max {max(settled)}  "
+        f"wall: {result['wall_seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+End-to-end /chat benchmark against fake Google and Gemini backends.
+
+The real FastAPI app (lifespan, JWT auth, graph, caches, memory worker) runs
+in-process and is driven through its ASGI interface. Gmail and Calendar are
+served by a local fake Google server, Gemini is replaced by a deterministic
+fake model, and every backend has configurable injected latency. The
+database is a fresh SQLite file unless --database-url points at a local
+Postgres.
+
+For each intent it reports p50/p95/p99 latency plus DB queries, pool
+checkouts, Google round trips and LLM calls per request (counted per
+request, so work done by the background memory worker is not attributed to
+requests), and writes the results as JSON so runs can be compared:
+
+    python -m benchmarks.bench_e2e --out before.json
+    ... change something ...
+    python -m benchmarks.bench_e2e --out after.json --compare before.json
+
+Run from backend/.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Intent -> messages sent for it (cycled). {n} makes each request distinct.
+SCENARIOS = {
+    "calendar_today": ["What meetings do I have today?"],
+    "calendar_tomorrow": ["Do I have any meetings tomorrow?"],
+    "calendar_create": ['Schedule a meeting titled "Bench sync {n}" tomorrow from {h}pm to {h1}pm'],
+    "gmail_today": ["What emails did I receive today?"],
+    "gmail_yesterday": ["Did I get mail yesterday?"],
+    "gmail_today_summary": ["Give me a summary of today's important emails"],
+    "daily_briefing": ["Give me my daily briefing"],
+    "chat": ["hello there", "Can you help me plan my week? ({n})"],
+    "need_more_info": ["schedule a meeting"],
+}
+
+# Per-request counters; the ContextVar follows the request into to_thread
+# and Google I/O pool workers, but not into the memory worker thread.
+_request_stats: contextvars.ContextVar[dict | None] = contextvars.ContextVar("request_stats", default=None)
+
+
+def _count(name: str, value: int = 1):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats[name] += value
+
+
+# ---------- fakes ----------
+class FakeLLM:
+    """Deterministic stand-in for ChatGoogleGenerativeAI with a fixed latency."""
+
+    model = "fake-gemini"
+    temperature = 0
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def _reply(self, messages):
+        from langchain_core.messages import AIMessage
+
+        prompt = messages[-1].content
+        if "memory extraction engine" in prompt:
+            return AIMessage(content="[]")
+        return AIMessage(
+            content="Here is a short, deterministic reply from the fake model.",
+            usage_metadata={"input_tokens": len(prompt) // 4, "output_tokens": 12, "total_tokens": len(prompt) // 4 + 12},
+        )
+
+    def invoke(self, messages):
+        _count("llm_calls")
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def astream(self, messages):
+        from langchain_core.messages import AIMessageChunk
+
+        _count("llm_calls")
+        reply = self._reply(messages)
+        words = reply.content.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.latency / len(words))
+            yield AIMessageChunk(content=word if i == 0 else " " + word)
+
+
+def _counting_http_factory():
+    from app.integrations.google_http import PooledHttp
+
+    class CountingHttp(PooledHttp):
+        def request(self, *args, **kwargs):
+            _count("google_calls")
+            return super().request(*args, **kwargs)
+
+    return CountingHttp
+
+
+def _count_db_queries(*engines):
+    from sqlalchemy import event
+
+    for engine in engines:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            _count("db_queries")
+
+        @event.listens_for(engine, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            _count("db_checkouts")
+
+
+# ---------- setup ----------
+def _seed_user(db) -> str:
+    from app.auth.auth_utils import create_access_token
+    from app.db.models import GoogleCredential, User
+
+    user = User(email=f"bench-{int(time.time())}@example.com")
+    db.add(user)
+    db.flush()
+    db.add(GoogleCredential(
+        user_id=user.id,
+        access_token="fake-access-token",
+        refresh_token="fake-refresh-token",
+        expires_at=datetime.utcnow() + timedelta(days=1),
+        scopes="",
+    ))
+    db.commit()
+    return create_access_token({"user_id": str(user.id)})
+
+
+def _message(intent: str, n: int) -> str:
+    templates = SCENARIOS[intent]
+    hour = 1 + n % 10
+    return templates[n % len(templates)].format(n=n, h=hour, h1=hour + 1)
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _summarize(samples: list[dict]) -> dict:
+    latencies = sorted(s["ms"] for s in samples)
+    n = len(samples)
+
+    def mean(key):
+        return round(sum(s[key] for s in samples) / n, 2) if n else 0.0
+
+    return {
+        "requests": n,
+        "errors": sum(1 for s in samples if s["status"] != 200),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / n, 2) if n else 0.0,
+        "max_ms": round(latencies[-1], 2) if n else 0.0,
+        "db_queries_per_request": mean("db_queries"),
+        "db_checkouts_per_request": mean("db_checkouts"),
+        "google_calls_per_request": mean("google_calls"),
+        "llm_calls_per_request": mean("llm_calls"),
+    }
+
+
+# ---------- run ----------
+async def _run(args) -> dict:
+    import httpx
+
+    import app.agent.llm_gateway as llm_gateway
+    from app.db.database import SessionLocal, async_engine, engine
+    from app.main import app
+    from benchmarks.fake_google_server import FakeGoogleServer, patch_google_services
+
+    llm_gateway.client = FakeLLM(args.llm_latency)
+    _count_db_queries(engine, async_engine.sync_engine)
+
+    samples: dict[str, list[dict]] = {intent: [] for intent in args.intents}
+
+    with FakeGoogleServer(
+        gmail_latency=args.google_latency,
+        calendar_latency=args.google_latency,
+        mailbox_size=args.mailbox_size,
+    ) as google:
+        patch_google_services(google, http_factory=_counting_http_factory())
+
+        db = SessionLocal()
+        try:
+            token = _seed_user(db)
+        finally:
+            db.close()
+
+        async with app.router.lifespan_context(app):
+            # httpx's ASGI transport runs the app inside the calling task, so each
+            # request task sees its own counters.
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport,
+                base_url="http://bench",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=None,
+            ) as client:
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def one(intent: str, n: int, record: bool):
+                    async with semaphore:
+                        stats = {"db_queries": 0, "db_checkouts": 0, "google_calls": 0, "llm_calls": 0}
+                        _request_stats.set(stats)
+                        started = time.perf_counter()
+                        response = await client.post("/chat/", json={"message": _message(intent, n)})
+                        ms = (time.perf_counter() - started) * 1000
+                        if record:
+                            samples[intent].append({"ms": ms, "status": response.status_code, **stats})
+
+                # Warm-up: first calls per intent pay one-off costs (mirror backfill, full calendar sync).
+                for intent in args.intents:
+                    for n in range(args.warmup):
+                        await one(intent, n, record=False)
+
+                started = time.perf_counter()
+                await asyncio.gather(*(
+                    one(intent, args.warmup + n, record=True)
+                    for n in range(args.requests)
+                    for intent in args.intents
+                ))
+                wall = time.perf_counter() - started
+
+                if args.metrics_out:
+                    # Per-node and per-dependency histograms for the whole run.
+                    scrape = await client.get("/metrics")
+                    with open(args.metrics_out, "w") as f:
+                        f.write(scrape.text)
+
+    all_samples = [s for intent in args.intents for s in samples[intent]]
+    return {
+        "benchmark": "e2e_chat",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "config": {
+            "database": args.database_url.split("@")[-1],
+            "requests_per_intent": args.requests,
+            "warmup_per_intent": args.warmup,
+            "concurrency": args.concurrency,
+            "google_latency_ms": args.google_latency * 1000,
+            "llm_latency_ms": args.llm_latency * 1000,
+            "mailbox_size": args.mailbox_size,
+            "llm_cache": not args.no_llm_cache,
+            "sync_every_request": args.sync_every_request,
+        },
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(all_samples) / wall, 2) if wall else 0.0,
+        "overall": _summarize(all_samples),
+        "intents": {intent: _summarize(samples[intent]) for intent in args.intents},
+    }
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+# ---------- report ----------
+COLUMNS = (
+    "p50_ms", "p95_ms", "p99_ms",
+    "db_queries_per_request", "db_checkouts_per_request", "google_calls_per_request", "llm_calls_per_request",
+)
+HEADERS = ("p50 ms", "p95 ms", "p99 ms", "db q/req", "db conn/req", "google/req", "llm/req")
+
+
+def _print_table(result: dict, baseline: dict | None):
+    print(f"{'intent':<22}{'n':>5}{'err':>5}" + "".join(f"{h:>12}" for h in HEADERS))
+    rows = list(result["intents"].items()) + [("overall", result["overall"])]
+    for intent, stats in rows:
+        line = f"{intent:<22}{stats['requests']:>5}{stats['errors']:>5}"
+        line += "".join(f"{stats[c]:>12.1f}" for c in COLUMNS)
+        print(line)
+        if baseline is None:
+            continue
+        before = baseline["overall"] if intent == "overall" else baseline["intents"].get(intent)
+        if before:
+            print(f"{'  vs baseline':<32}" + "".join(f"{_delta(before[c], stats[c]):>12}" for c in COLUMNS))
+    print(f"wall {result['wall_seconds']:.2f}s, {result['throughput_rps']:.1f} req/s")
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return "n/a" if after else "="
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=30, help="measured requests per intent")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured requests per intent first")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--google-latency", type=float, default=0.05, help="seconds per Google round trip")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds per LLM call")
+    parser.add_argument("--mailbox-size", type=int, default=200)
+    parser.add_argument("--intents", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--database-url", default=None, help="default: a fresh SQLite file")
+    parser.add_argument("--no-llm-cache", action="store_true", help="make every LLM call reach the fake model")
+    parser.add_argument(
+        "--sync-every-request", action="store_true",
+        help="treat the Gmail mirror and calendar cache as stale, so every read pulls a delta",
+    )
+    parser.add_argument("--out", default="bench_e2e_results.json")
+    parser.add_argument("--compare", default=None, help="earlier results file to diff against")
+    parser.add_argument("--metrics-out", default=None, help="also save the app's /metrics scrape here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Configuration is read at import time, so set it before importing the app.
+    scratch = None
+    if args.database_url is None:
+        scratch = tempfile.mkdtemp(prefix="bench_e2e_")
+        args.database_url = f"sqlite:///{scratch}/bench.db"
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    os.environ.setdefault("GOOGLE_CLIENT_ID", "benchmark")
+    os.environ.setdefault("GOOGLE_CLIENT_SECRET", "benchmark")
+    # The gateway's Gemini budget would otherwise throttle a benchmark run.
+    os.environ["LLM_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["LLM_USER_REQUESTS_PER_MINUTE"] = "1000000"
+    if args.sync_every_request:
+        os.environ["MAILBOX_MIRROR_FRESHNESS_SECONDS"] = "0"
+        os.environ["CALENDAR_CACHE_FRESHNESS_SECONDS"] = "0"
+    if args.no_llm_cache:
+        os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["LLM_CACHE_PERSIST"] = "false"
+
+    try:
+        result = asyncio.run(_run(args))
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    _print_table(result, baseline)
+
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"results written to {args.out}")
+
+    if result["overall"]["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: serial N+1 messages.get loop vs the batched Gmail fetch engine,
+against a local fake Gmail server with injected latency.
+
+Run from backend/:
+    python -m benchmarks.bench_gmail_fetch
+"""
+
+import time
+
+from app.integrations.gmail_fetch import fetch_messages
+from benchmarks.fake_gmail_server import FakeGmailServer
+
+LATENCY_SECONDS = 0.05
+SIZES = (5, 15, 60, 250)
+
+
+def serial_fetch(service, max_results: int) -> list[dict]:
+    """The pre-engine call pattern: one list call, then one get per message."""
+    results = service.users().messages().list(userId="me", maxResults=max_results).execute()
+    emails = []
+    for msg in results.get("messages", []):
+        data = service.users().messages().get(
+            userId="me",
+            id=msg["id"],
+            format="metadata",
+            metadataHeaders=["From", "Subject"]
+        ).execute()
+        headers = {h["name"]: h["value"] for h in data["payload"]["headers"]}
+        emails.append({"from": headers.get("From"), "subject": headers.get("Subject")})
+    return emails
+
+
+def engine_fetch(service, max_results: int) -> list[dict]:
+    return fetch_messages(service, max_results=max_results, metadata_headers=["From", "Subject"])
+
+
+def run(server: FakeGmailServer, fn, max_results: int) -> tuple[float, int, int]:
+    service = server.service()
+    server.counters["round_trips"] = 0
+    start = time.perf_counter()
+    emails = fn(service, max_results)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, server.counters["round_trips"], len(emails)
+
+
+def main():
+    with FakeGmailServer(latency=LATENCY_SECONDS, mailbox_size=max(SIZES)) as server:
+        print(f"injected latency: {LATENCY_SECONDS * 1000:.0f} ms per round trip")
+        print(f"{'messages':>9}{'mode':>9}{'ms':>10}{'round trips':>13}")
+        for size in SIZES:
+            for name, fn in (("serial", serial_fetch), ("engine", engine_fetch)):
+                if name == "serial" and size > 100:
+                    # messages.list only returns one page in the old code path
+                    continue
+                elapsed, trips, count = run(server, fn, size)
+                assert count == size, (name, count, size)
+                print(f"{size:>9}{name:>9}{elapsed:>10.1f}{trips:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: per-request graph overhead before/after the compiled-graph registry.
+
+"before" rebuilds and compiles the StateGraph for every request (old /chat behaviour),
+"after" reuses the shared compiled graph. Both push the same no-I/O dry run through it.
+
+Run from backend/:
+    python -m benchmarks.bench_graph_compile
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.agent.graph import build_graph, get_compiled_graph, WARMUP_USER_ID
+from app.agent.schemas import AgentState
+
+ITERATIONS = 200
+THREADS = 8
+
+
+def _dry_run(graph):
+    graph.invoke(
+        AgentState(user_id=WARMUP_USER_ID, message="schedule a meeting"),
+        config={"configurable": {"db": None}}
+    )
+
+
+def per_request_before():
+    _dry_run(build_graph())
+
+
+def per_request_after():
+    _dry_run(get_compiled_graph())
+
+
+def measure(fn, iterations: int, threads: int = 1) -> float:
+    """Average wall-clock milliseconds per call."""
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(iterations):
+            fn()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda _: fn(), range(iterations)))
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    get_compiled_graph()
+    per_request_before()
+
+    print(f"{'mode':<10}{'threads':>8}{'ms/request':>14}")
+    for threads in (1, THREADS):
+        before = measure(per_request_before, ITERATIONS, threads)
+        after = measure(per_request_after, ITERATIONS, threads)
+        print(f"{'before':<10}{threads:>8}{before:>14.3f}")
+        print(f"{'after':<10}{threads:>8}{after:>14.3f}")
+        print(f"  speedup x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
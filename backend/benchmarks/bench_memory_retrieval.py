@@ -0,0 +1,83 @@
+"""
+Benchmark: memory retrieval at 10k memories per user, loading every memory
+into the prompt (old load_memory_node) vs top-K from the per-user vector index.
+
+Uses a throwaway SQLite database, so the numbers include the real queries.
+
+Run from backend/:
+    python -m benchmarks.bench_memory_retrieval
+"""
+
+import os
+import random
+import tempfile
+import time
+import uuid
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_memory.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from app.agent.memory import load_relevant_memory, load_user_memory, save_user_memory
+from app.agent.memory_index import estimate_tokens, get_memory_index, memory_text
+from app.db import models
+from app.db.database import SessionLocal, engine
+
+MEMORIES = 10_000
+QUERIES = 200
+SUBJECTS = ["meeting", "project", "client", "team", "travel", "lunch", "report", "budget", "hiring", "launch"]
+DETAILS = ["prefers mornings", "based in Berlin", "weekly on Fridays", "owner is Priya", "due next quarter",
+           "uses Zoom", "vegetarian", "reviews on Mondays", "ships in March", "reports to Sam"]
+MESSAGES = ["when does the Berlin client prefer meetings?", "what is the budget report due date?",
+            "schedule lunch with the hiring team", "who owns the launch project?"]
+
+
+def make_facts(rng: random.Random) -> list[dict]:
+    return [
+        {"key": f"{rng.choice(SUBJECTS)}_{i}", "value": f"{rng.choice(SUBJECTS)} {rng.choice(DETAILS)}"}
+        for i in range(MEMORIES)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(11)
+    user_id = str(uuid.uuid4())
+    db = SessionLocal()
+    facts = make_facts(rng)
+    for start in range(0, len(facts), 1000):
+        save_user_memory(db, user_id, facts[start:start + 1000])
+
+    full = load_user_memory(db, user_id)
+    full_tokens = sum(estimate_tokens(memory_text(m["key"], m["value"])) for m in full)
+    load_all_ms = timed(lambda i: load_user_memory(db, user_id), 20)
+
+    start = time.perf_counter()
+    get_memory_index(db, user_id)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    top_k_ms = timed(lambda i: load_relevant_memory(db, user_id, MESSAGES[i % len(MESSAGES)]), QUERIES)
+    picked = load_relevant_memory(db, user_id, MESSAGES[0])
+    picked_tokens = sum(estimate_tokens(memory_text(m["key"], m["value"])) for m in picked)
+
+    # A chat turn extracts a few facts; the next turn only re-embeds those.
+    save_user_memory(db, user_id, [{"key": "launch_owner", "value": "Priya owns the launch"}])
+    incremental_ms = timed(lambda i: load_relevant_memory(db, user_id, "who owns the launch?"), 1)
+    top = load_relevant_memory(db, user_id, "who owns the launch?")[0]
+
+    print(f"{MEMORIES} memories for one user")
+    print(f"load all (old):        {load_all_ms:8.1f} ms/turn, {full_tokens} prompt tokens")
+    print(f"index build (cold):    {build_ms:8.1f} ms once per process")
+    print(f"top-K retrieval:       {top_k_ms:8.2f} ms/turn, {len(picked)} memories, {picked_tokens} prompt tokens")
+    print(f"after a new memory:    {incremental_ms:8.2f} ms, top hit {top['key']!r}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
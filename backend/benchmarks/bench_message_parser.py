@@ -0,0 +1,196 @@
+"""
+Micro-benchmark: per-message parsing work, old per-node re-parsing vs one
+ParsedMessage built before routing.
+
+"before" replays what the nodes used to do for each message: the router
+lowercases and substring-scans the text and calls extract_time_range up to
+twice; chat calls it twice more; calendar_create runs extract_meeting_title
+(uncompiled patterns). "after" parses once and every node reads the result.
+Both paths build the AgentState and must agree on intent, time range and
+title for every message.
+
+Run from backend/:
+    python -m benchmarks.bench_message_parser
+"""
+
+import itertools
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.agent.graph import _handle_scheduling_followup, intent_router_node
+from app.agent.message_parser import parse_message
+from app.agent.schemas import AgentState
+
+ROUNDS = 200
+
+CORPUS = [
+    "What meetings do I have today?",
+    "Do I have any meetings tomorrow?",
+    "Show my calendar for tomorrow please",
+    "What emails did I receive today?",
+    "Any important emails today? Give me a summary",
+    "Summarize today's important emails",
+    "Did I get mail yesterday?",
+    "Check my gmail from yesterday",
+    'Schedule a meeting titled "Team Standup" tomorrow from 9am to 10am',
+    "Create \"Project Review\" meeting today from 2pm to 3pm",
+    "Book a meeting called 'Design Sync' tomorrow from 11 to 12",
+    "Set up a meeting named \"1:1 with Priya\" today from 4pm to 5pm",
+    "Add a calendar event title: Budget planning from 10am to 11am tomorrow",
+    "Team Standup meeting from 9am to 10am",
+    "meeting titled Quarterly Review from 11pm to 12am",
+    "schedule a meeting",
+    "I want to add something to my calendar",
+    "Can you help me plan my week?",
+    "hello there",
+    "What is the address of the office?",
+    "Remind me that I prefer meetings after 10am",
+    "thanks, that's all for today",
+    "titled \"Hiring debrief\" from 3pm to 4pm",
+    "Please email the team about the launch",
+]
+
+
+# ---------- before: the old per-node helpers ----------
+def legacy_extract_time_range(text: str):
+    match = re.search(r"from (\d{1,2})\s*(am|pm)?\s*to\s*(\d{1,2})\s*(am|pm)?", text, re.IGNORECASE)
+    if not match:
+        return None, None
+    start_hour, end_hour = int(match.group(1)), int(match.group(3))
+    start_ampm, end_ampm = (match.group(2) or "").lower(), (match.group(4) or "").lower()
+    if start_hour == 12:
+        start_hour = 0
+    if end_hour == 12:
+        end_hour = 0
+    if start_ampm == "pm" and start_hour < 12:
+        start_hour += 12
+    if end_ampm == "pm" and end_hour < 12:
+        end_hour += 12
+    today = datetime.utcnow()
+    is_tomorrow = "tomorrow" in text.lower()
+    start_time = today.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+    end_time = today.replace(hour=end_hour, minute=0, second=0, microsecond=0)
+    if is_tomorrow:
+        start_time += timedelta(days=1)
+        end_time += timedelta(days=1)
+    if end_hour == 0 and end_ampm == "am" and start_hour >= 12:
+        end_time += timedelta(days=1)
+    if end_time <= start_time:
+        end_time += timedelta(days=1)
+    return start_time, end_time
+
+
+def legacy_extract_meeting_title(text: str):
+    import re
+
+    patterns = [
+        r'(?:titled|called|named)\s+"([^"]+)"',
+        r"(?:titled|called|named)\s+'([^']+)'",
+        r"(?:title|subject)\s*:\s*([^\n]+)",
+        r'"([^"]+)"',
+        r"'([^']+)'",
+    ]
+    for pat in patterns:
+        m = re.search(pat, text, flags=re.IGNORECASE)
+        if m:
+            title = m.group(1).strip().strip(" .,!;:")
+            if title and len(title) > 1:
+                return title
+    time_pattern = r'\s+from\s+\d'
+    if re.search(time_pattern, text, flags=re.IGNORECASE):
+        parts = re.split(time_pattern, text, flags=re.IGNORECASE, maxsplit=1)
+        if len(parts) > 0:
+            potential_title = parts[0].strip()
+            for prefix in ["schedule", "create", "book", "set up", "add", "a meeting", "meeting"]:
+                if potential_title.lower().startswith(prefix):
+                    potential_title = potential_title[len(prefix):].strip()
+            potential_title = re.sub(r'\s+(for|on|at|with|to)\s*$', '', potential_title, flags=re.IGNORECASE)
+            if potential_title and len(potential_title) > 1:
+                return potential_title.strip(" .,!;:")
+    return None
+
+
+def legacy_route(message: str):
+    AgentState(user_id="bench", message=message)
+    text = message.lower()
+    if "meeting" in text or "calendar" in text:
+        has_schedule_keyword = any(kw in text for kw in ["create", "schedule", "book", "set up", "add"])
+        has_time_pattern = bool(legacy_extract_time_range(message)[0])
+        has_title_keyword = any(kw in text for kw in ["titled", "called", "named", "title"])
+        if has_schedule_keyword or (has_time_pattern and has_title_keyword):
+            start, end = legacy_extract_time_range(message)
+            return "calendar_create", start, end, legacy_extract_meeting_title(message)
+        if "today" in text:
+            return "calendar_today", None, None, None
+        if "tomorrow" in text:
+            return "calendar_tomorrow", None, None, None
+        intent = "need_more_info"
+    elif "mail" in text or "email" in text:
+        if "today" in text and ("important" in text or "summary" in text):
+            return "gmail_today_summary", None, None, None
+        if "today" in text:
+            return "gmail_today", None, None, None
+        if "yesterday" in text:
+            return "gmail_yesterday", None, None, None
+        intent = "need_more_info"
+    else:
+        intent = "unsupported"
+
+    # need_more_info / unsupported fall through to chat's follow-up check
+    text_lower = message.lower()
+    has_time = bool(legacy_extract_time_range(message)[0])
+    has_title = any(kw in text_lower for kw in ["titled", "called", "named", "title", "meeting"])
+    if has_time and has_title:
+        start, end = legacy_extract_time_range(message)
+        if start and end:
+            return "calendar_create", start, end, None
+    return intent, None, None, None
+
+
+# ---------- after: parse once ----------
+def route(message: str):
+    state = AgentState(user_id="bench", message=message)
+    state = intent_router_node(state, {})
+    if state.intent == "calendar_create":
+        return state.intent, state.start_time, state.end_time, state.parsed.title
+    if state.intent in ("need_more_info", "unsupported") and _handle_scheduling_followup(state):
+        return state.intent, state.start_time, state.end_time, None
+    return state.intent, None, None, None
+
+
+def parse_only(message: str):
+    parse_message(message)
+
+
+def bench(fn) -> float:
+    messages = list(itertools.chain.from_iterable(itertools.repeat(CORPUS, ROUNDS)))
+    start = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return (time.perf_counter() - start) / len(messages) * 1e6
+
+
+def main():
+    for message in CORPUS:
+        assert legacy_route(message) == route(message), f"results differ for {message!r}"
+
+    # Warm regex caches for a fair comparison.
+    for message in CORPUS:
+        legacy_route(message)
+        route(message)
+
+    before = bench(legacy_route)
+    after = bench(route)
+    parse = bench(parse_only)
+    print(f"{len(CORPUS)} messages x {ROUNDS} rounds; all routes/times/titles match")
+    print(f"before (per-node re-parsing):  {before:7.1f} µs/message")
+    print(f"after  (ParsedMessage + nodes): {after:7.1f} µs/message")
+    print(f"parse_message alone:            {parse:7.1f} µs/message")
+
+
+if __name__ == "__main__":
+    main()
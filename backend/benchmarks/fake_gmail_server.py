@@ -0,0 +1,183 @@
+"""
+Local fake Gmail REST server with injected per-request latency.
+
+Implements just enough of the Gmail v1 surface for the fetch engine and the
+mailbox mirror: messages.list (with nextPageToken paging),
+messages.get(format=metadata), getProfile, history.list (messageAdded only)
+and the /batch/gmail/v1 multipart endpoint.
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+PAGE_SIZE = 100
+
+
+class FakeMailbox:
+    def __init__(self, size: int = 200):
+        self.messages = [
+            {
+                "id": f"m{i:05d}",
+                "threadId": f"t{i:05d}",
+                "labelIds": ["INBOX"],
+                "snippet": f"Snippet for message {i}",
+                "internalDate": str(1_700_000_000_000 + i * 60_000),
+                "payload": {
+                    "headers": [
+                        {"name": "From", "value": f"Sender {i} <sender{i}@example.com>"},
+                        {"name": "Subject", "value": f"Subject {i}"},
+                        {"name": "Date", "value": "Mon, 1 Jan 2024 09:00:00 +0000"},
+                    ]
+                },
+            }
+            for i in range(size)
+        ]
+        self.by_id = {m["id"]: m for m in self.messages}
+        self.history_id = 1000
+        # (history id, message id) for messages delivered after startup
+        self.history: list[tuple[int, str]] = []
+
+    def deliver(self, count: int = 1):
+        """Simulate new mail arriving (newest first, like Gmail)."""
+        for _ in range(count):
+            i = len(self.messages)
+            message = json.loads(json.dumps(self.messages[0]))
+            message.update({"id": f"m{i:05d}", "threadId": f"t{i:05d}",
+                            "internalDate": str(int(time.time() * 1000))})
+            self.messages.insert(0, message)
+            self.by_id[message["id"]] = message
+            self.history_id += 1
+            self.history.append((self.history_id, message["id"]))
+
+    def history_since(self, start_history_id: int) -> dict:
+        added = [mid for hid, mid in self.history if hid > start_history_id]
+        return {
+            "history": [{"messagesAdded": [{"message": {"id": mid}}]} for mid in added],
+            "historyId": str(self.history_id),
+        }
+
+    def list_page(self, max_results: int, page_token: str | None) -> dict:
+        offset = int(page_token or 0)
+        limit = min(max_results, PAGE_SIZE)
+        page = self.messages[offset:offset + limit]
+        body = {"messages": [{"id": m["id"], "threadId": m["threadId"]} for m in page]}
+        if offset + limit < len(self.messages):
+            body["nextPageToken"] = str(offset + limit)
+        return body
+
+
+def _handle_rest(mailbox: FakeMailbox, method: str, raw_path: str) -> tuple[int, dict]:
+    url = urlparse(raw_path)
+    params = parse_qs(url.query)
+    path = url.path.rstrip("/")
+
+    if method == "GET" and path.endswith("/users/me/messages"):
+        return 200, mailbox.list_page(
+            int(params.get("maxResults", ["100"])[0]),
+            params.get("pageToken", [None])[0],
+        )
+
+    if method == "GET" and path.endswith("/users/me/profile"):
+        return 200, {"emailAddress": "me@example.com", "historyId": str(mailbox.history_id)}
+
+    if method == "GET" and path.endswith("/users/me/history"):
+        return 200, mailbox.history_since(int(params["startHistoryId"][0]))
+
+    m = re.search(r"/users/me/messages/([^/]+)$", path)
+    if method == "GET" and m and m.group(1) in mailbox.by_id:
+        return 200, mailbox.by_id[m.group(1)]
+
+    return 404, {"error": {"code": 404, "message": "Not Found"}}
+
+
+def make_handler(mailbox: FakeMailbox, latency: float, counters: dict):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(latency)
+            counters["round_trips"] += 1
+            status, body = _handle_rest(mailbox, "GET", self.path)
+            self._send(status, json.dumps(body).encode(), "application/json")
+
+        def do_POST(self):
+            time.sleep(latency)
+            counters["round_trips"] += 1
+            length = int(self.headers.get("Content-Length", 0))
+            payload = self.rfile.read(length).decode()
+            boundary = self.headers.get_content_type() and self.headers.get_param("boundary")
+
+            out_boundary = uuid.uuid4().hex
+            parts = []
+            for part in payload.split(f"--{boundary}"):
+                if "Content-ID" not in part:
+                    continue
+                content_id = re.search(r"Content-ID:\s*<([^>]+)>", part).group(1)
+                request_line = re.search(r"^(GET|POST) (\S+) HTTP/1.1", part, re.MULTILINE)
+                status, body = _handle_rest(mailbox, request_line.group(1), request_line.group(2))
+                body_text = json.dumps(body)
+                parts.append(
+                    f"--{out_boundary}\r\n"
+                    "Content-Type: application/http\r\n"
+                    f"Content-ID: <response-{content_id}>\r\n\r\n"
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body_text)}\r\n\r\n"
+                    f"{body_text}\r\n"
+                )
+            body = ("".join(parts) + f"--{out_boundary}--\r\n").encode()
+            self._send(200, body, f"multipart/mixed; boundary={out_boundary}")
+
+    return Handler
+
+
+class FakeGmailServer:
+    """Context manager running the fake server on an ephemeral localhost port."""
+
+    def __init__(self, latency: float = 0.05, mailbox_size: int = 200):
+        self.mailbox = FakeMailbox(mailbox_size)
+        self.counters = {"round_trips": 0}
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            make_handler(self.mailbox, latency, self.counters),
+        )
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def service(self):
+        """A real googleapiclient Gmail service pointed at this server."""
+        doc = json.loads(discovery_cache.get_static_doc("gmail", "v1"))
+        doc["rootUrl"] = self.root_url
+        doc.pop("mtlsRootUrl", None)
+        return build_from_document(doc, http=httplib2.Http())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
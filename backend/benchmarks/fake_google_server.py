@@ -0,0 +1,178 @@
+"""
+Local fake Google backend (Gmail + Calendar) with injected per-request latency.
+
+Gmail is served by the fake from fake_gmail_server (with message dates moved
+to the last few days so "today" and "yesterday" have mail). Calendar
+implements events.list (pageToken paging, nextSyncToken and syncToken
+deltas) and events.insert on the primary calendar, which is all the event
+cache and the create tool use.
+
+patch_google_services() points the app's service builder at this server, so
+the real googleapiclient request/response path runs end to end.
+"""
+
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+from benchmarks.fake_gmail_server import FakeMailbox, make_handler
+
+PAGE_SIZE = 250
+
+
+class FakeCalendar:
+    def __init__(self, days: int = 14, per_day: int = 4):
+        self.lock = threading.Lock()
+        self.version = 0
+        # event id -> (version last changed, event)
+        self.events: dict[str, tuple[int, dict]] = {}
+        midnight = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        for day in range(-days // 2, days - days // 2):
+            for slot in range(per_day):
+                start = midnight + timedelta(days=day, hours=9 + 2 * slot)
+                self.insert({
+                    "summary": f"Seed event {day}/{slot}",
+                    "start": {"dateTime": start.isoformat() + "Z"},
+                    "end": {"dateTime": (start + timedelta(hours=1)).isoformat() + "Z"},
+                })
+
+    def insert(self, body: dict) -> dict:
+        with self.lock:
+            self.version += 1
+            event_id = uuid.uuid4().hex
+            event = {
+                **body,
+                "id": event_id,
+                "status": "confirmed",
+                "htmlLink": f"https://calendar.example.com/event?eid={event_id}",
+            }
+            self.events[event_id] = (self.version, event)
+            return event
+
+    def list_page(self, sync_token: str | None, page_token: str | None, max_results: int) -> dict:
+        with self.lock:
+            since = int(sync_token or 0)
+            changed = [event for version, event in self.events.values() if version > since]
+            version = self.version
+        offset = int(page_token or 0)
+        body = {"items": changed[offset:offset + max_results]}
+        if offset + max_results < len(changed):
+            body["nextPageToken"] = str(offset + max_results)
+        else:
+            body["nextSyncToken"] = str(version)
+        return body
+
+
+def _handle_calendar(calendar: FakeCalendar, method: str, raw_path: str, body: bytes) -> tuple[int, dict]:
+    url = urlparse(raw_path)
+    params = parse_qs(url.query)
+
+    if url.path.rstrip("/").endswith("/calendars/primary/events"):
+        if method == "GET":
+            return 200, calendar.list_page(
+                params.get("syncToken", [None])[0],
+                params.get("pageToken", [None])[0],
+                min(int(params.get("maxResults", [str(PAGE_SIZE)])[0]), PAGE_SIZE),
+            )
+        if method == "POST":
+            return 200, calendar.insert(json.loads(body or b"{}"))
+
+    return 404, {"error": {"code": 404, "message": "Not Found"}}
+
+
+def make_google_handler(mailbox: FakeMailbox, calendar: FakeCalendar, latency: dict, counters: dict):
+    gmail_handler = make_handler(mailbox, latency["gmail"], counters)
+
+    class Handler(gmail_handler):
+        def _calendar(self, method: str):
+            time.sleep(latency["calendar"])
+            counters["calendar_round_trips"] += 1
+            length = int(self.headers.get("Content-Length", 0))
+            status, body = _handle_calendar(calendar, method, self.path, self.rfile.read(length))
+            self._send(status, json.dumps(body).encode(), "application/json")
+
+        def do_GET(self):
+            if self.path.startswith("/calendar/"):
+                return self._calendar("GET")
+            super().do_GET()
+
+        def do_POST(self):
+            if self.path.startswith("/calendar/"):
+                return self._calendar("POST")
+            super().do_POST()
+
+    return Handler
+
+
+class FakeGoogleServer:
+    """Context manager running fake Gmail + Calendar on an ephemeral localhost port."""
+
+    def __init__(
+        self,
+        gmail_latency: float = 0.05,
+        calendar_latency: float = 0.05,
+        mailbox_size: int = 200,
+    ):
+        self.mailbox = FakeMailbox(mailbox_size)
+        # Newest first, one message every 15 minutes back from now.
+        now_ms = int(time.time() * 1000)
+        for i, message in enumerate(self.mailbox.messages):
+            message["internalDate"] = str(now_ms - i * 15 * 60_000)
+        self.calendar = FakeCalendar()
+        self.counters = {"round_trips": 0, "calendar_round_trips": 0}
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            make_google_handler(
+                self.mailbox,
+                self.calendar,
+                {"gmail": gmail_latency, "calendar": calendar_latency},
+                self.counters,
+            ),
+        )
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def build_service(self, api: str, version: str, http=None):
+        """A real googleapiclient service for `api` pointed at this server."""
+        doc = json.loads(discovery_cache.get_static_doc(api, version))
+        doc["rootUrl"] = self.root_url
+        doc.pop("mtlsRootUrl", None)
+        # Same request class as production, so Google API latency is traced here too.
+        from app.integrations.google_services import TracedHttpRequest
+
+        return build_from_document(doc, http=http or httplib2.Http(), requestBuilder=TracedHttpRequest)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def patch_google_services(server: FakeGoogleServer, http_factory=None):
+    """Make get_google_service() build services against the fake server (credentials are ignored)."""
+    from app.integrations import google_services
+    from app.integrations.google_http import PooledHttp
+
+    http_factory = http_factory or PooledHttp
+
+    def build(api: str, version: str, credentials):
+        return server.build_service(api, version, http=http_factory())
+
+    google_services._build_service = build
+    google_services._services.clear()
+
@@ -0,0 +1,4 @@
+import os
+
+# app.agent.graph builds its Gemini clients at import time.
+os.environ.setdefault("GOOGLE_API_KEY", "test")
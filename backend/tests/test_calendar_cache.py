@@ -0,0 +1,110 @@
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.models import CalendarSyncState
+from app.integrations import calendar_cache
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def _event(i: int, start: datetime, hours: int = 1) -> dict:
+    return {
+        "id": f"e{i}",
+        "summary": f"event {i}",
+        "start": {"dateTime": start.isoformat() + "Z"},
+        "end": {"dateTime": (start + timedelta(hours=hours)).isoformat() + "Z"},
+    }
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    monkeypatch.setattr(calendar_cache, "_busy_indexes", OrderedDict())
+    yield session
+    session.close()
+
+
+def _synced_user(db) -> uuid.UUID:
+    """A user whose cache just synced (so no Google call) with one event tomorrow."""
+    user_id = uuid.uuid4()
+    db.add(CalendarSyncState(user_id=user_id, sync_token="token-1", last_synced_at=datetime.utcnow()))
+    calendar_cache.store_events(db, user_id, [_event(0, NOW + timedelta(days=1))])
+    db.commit()
+    return user_id
+
+
+def test_busy_indexes_are_lru_bounded(db, monkeypatch):
+    monkeypatch.setattr(calendar_cache, "CALENDAR_BUSY_INDEX_MAX_USERS", 2)
+    first, second, third = _synced_user(db), _synced_user(db), _synced_user(db)
+
+    first_index = calendar_cache.get_busy_index(user_id=first, db=db)
+    calendar_cache.get_busy_index(user_id=second, db=db)
+    assert calendar_cache.get_busy_index(user_id=first, db=db) is first_index  # hit, now most recent
+    calendar_cache.get_busy_index(user_id=third, db=db)
+
+    assert list(calendar_cache._busy_indexes) == [first, third]
+
+    # The evicted user's index is rebuilt from the cached events on the next lookup.
+    rebuilt = calendar_cache.get_busy_index(user_id=second, db=db)
+    assert [e["summary"] for e in rebuilt.overlapping(NOW, NOW + timedelta(days=2))] == ["event 0"]
+    assert list(calendar_cache._busy_indexes) == [third, second]
+
+
+class FakeCalendar:
+    """events().list(...).execute() returning one page per call, recording the parameters."""
+
+    def __init__(self, pages: list[dict]):
+        self.pages = pages
+        self.calls: list[dict] = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        page = self.pages.pop(0)
+        return type("Request", (), {"execute": lambda self: page})()
+
+
+def test_full_sync_is_bounded_and_old_events_are_pruned(db, monkeypatch):
+    monkeypatch.setattr(calendar_cache, "CALENDAR_SYNC_PAST_DAYS", 30)
+    recent = _event(1, NOW - timedelta(days=2))
+    upcoming = _event(2, NOW + timedelta(days=3))
+    ancient = _event(3, NOW - timedelta(days=400))
+    service = FakeCalendar([
+        {"items": [recent, upcoming, ancient], "nextSyncToken": "token-1"},
+        {"items": [dict(_event(4, NOW - timedelta(days=365)), summary="edited old event")], "nextSyncToken": "token-2"},
+    ])
+    monkeypatch.setattr(calendar_cache, "get_calendar_service", lambda **kwargs: service)
+    user_id = uuid.uuid4()
+
+    calendar_cache.sync_calendar(user_id=user_id, db=db)
+
+    window_start = calendar_cache._window_start()
+    assert service.calls[0]["timeMin"] == window_start.isoformat() + "Z"
+    assert "syncToken" not in service.calls[0]
+    assert str(user_id) not in calendar_cache._sync_locks
+    events = calendar_cache.get_cached_events(
+        user_id=user_id, db=db, start=datetime(2000, 1, 1), end=NOW + timedelta(days=30)
+    )
+    assert [e["summary"] for e in events] == ["event 1", "event 2"]
+
+    # A later delta uses the sync token (no timeMin) and old edits are pruned too.
+    db.get(CalendarSyncState, user_id).last_synced_at = datetime(2000, 1, 1)
+    db.commit()
+    calendar_cache.sync_calendar(user_id=user_id, db=db)
+
+    assert service.calls[1]["syncToken"] == "token-1"
+    assert "timeMin" not in service.calls[1]
+    events = calendar_cache.get_cached_events(
+        user_id=user_id, db=db, start=datetime(2000, 1, 1), end=NOW + timedelta(days=30)
+    )
+    assert [e["summary"] for e in events] == ["event 1", "event 2"]
@@ -0,0 +1,82 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.integrations import gmail_mirror
+
+USER_ID = uuid.uuid4()
+NOW = datetime.utcnow()
+
+
+def _message(i: int, received: datetime) -> dict:
+    return {
+        "id": f"m{i}",
+        "threadId": f"t{i}",
+        "from": "sender@example.com",
+        "subject": f"message {i}",
+        "date": "",
+        "internalDate": str(int(received.replace(tzinfo=timezone.utc).timestamp() * 1000)),
+        "labelIds": ["INBOX"],
+        "snippet": "",
+    }
+
+
+class FakeGmail:
+    def users(self):
+        return self
+
+    def getProfile(self, userId):
+        return SimpleNamespace(execute=lambda: {"historyId": "1"})
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    # One message per hour (on the half hour) for the last 48 hours, newest first like messages.list.
+    mailbox = [_message(i, NOW - timedelta(hours=i, minutes=30)) for i in range(48)]
+    monkeypatch.setattr(gmail_mirror, "BACKFILL_MAX_MESSAGES", 10)
+    monkeypatch.setattr(gmail_mirror, "get_gmail_service", lambda **kwargs: FakeGmail())
+    monkeypatch.setattr(
+        gmail_mirror, "fetch_messages", lambda service, query, max_results: mailbox[:max_results]
+    )
+    yield session
+    session.close()
+
+
+def test_capped_backfill_only_covers_the_listed_range(db):
+    state = gmail_mirror.sync_mailbox(user_id=USER_ID, db=db)
+    assert str(USER_ID) not in gmail_mirror._sync_locks
+
+    # The ten newest messages span the last 9.5 hours, not the whole backfill window.
+    assert NOW - timedelta(hours=10) < state.backfilled_from < NOW - timedelta(hours=8)
+
+    # Inside the listed range: served from the mirror.
+    recent = gmail_mirror.get_mirrored_messages(
+        user_id=USER_ID, db=db, start=NOW - timedelta(hours=5), end=NOW + timedelta(minutes=1)
+    )
+    assert [m["subject"] for m in recent] == [f"message {i}" for i in range(5)]
+
+    # Older than the cap reached: the caller must query Gmail live.
+    assert gmail_mirror.get_mirrored_messages(
+        user_id=USER_ID, db=db, start=NOW - timedelta(days=1), end=NOW
+    ) is None
+
+
+def test_uncapped_backfill_covers_the_whole_window(db, monkeypatch):
+    monkeypatch.setattr(gmail_mirror, "BACKFILL_MAX_MESSAGES", 1000)
+
+    state = gmail_mirror.sync_mailbox(user_id=USER_ID, db=db)
+
+    assert state.backfilled_from <= NOW - timedelta(days=gmail_mirror.MAILBOX_BACKFILL_DAYS)
+    messages = gmail_mirror.get_mirrored_messages(
+        user_id=USER_ID, db=db, start=NOW - timedelta(hours=30), end=NOW + timedelta(minutes=1), max_results=100
+    )
+    assert len(messages) == 30
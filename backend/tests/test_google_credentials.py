@@ -0,0 +1,41 @@
+import threading
+import time
+
+from app.integrations import google_credentials
+
+
+def test_refresh_lock_is_single_flight_and_released():
+    inside = []
+    overlap = []
+
+    def refresh():
+        with google_credentials._refresh_locks.hold("user-1"):
+            if inside:
+                overlap.append(True)
+            inside.append(True)
+            time.sleep(0.01)
+            inside.pop()
+
+    threads = [threading.Thread(target=refresh) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not overlap
+    assert "user-1" not in google_credentials._refresh_locks
+
+
+def test_cache_is_bounded_lru_and_background_refresh_does_not_insert(monkeypatch):
+    monkeypatch.setattr(google_credentials, "GOOGLE_CREDENTIAL_CACHE_MAX_USERS", 2)
+    google_credentials._cache.clear()
+    entry = {"access_token": "t", "refresh_token": "r", "expires_at": None}
+
+    google_credentials._store_entry("user-1", entry)
+    google_credentials._store_entry("user-2", entry)
+    google_credentials._cached_entry("user-1")
+    google_credentials._store_entry("user-3", entry)
+    google_credentials._store_entry("user-4", entry, only_if_cached=True)
+
+    assert list(google_credentials._cache) == ["user-1", "user-3"]
+    google_credentials._cache.clear()
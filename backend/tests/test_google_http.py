@@ -0,0 +1,117 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.core import metrics
+from app.integrations import google_http
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def _reply(self):
+        server = self.server
+        server.hits.append(self.command)
+        status, delay = server.script.pop(0) if server.script else (200, 0)
+        time.sleep(delay)
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server answering with server.script's (status, delay) in order, then 200."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    # The client hangs up on purpose in the timeout test.
+    httpd.handle_error = lambda request, client_address: None
+    httpd.script, httpd.hits = [], []
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/gmail/v1/users/me/messages"
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def http(monkeypatch):
+    monkeypatch.setattr(google_http, "GOOGLE_HTTP_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(google_http, "GOOGLE_HTTP_MAX_RETRIES", 2)
+    session = google_http._new_session()
+    yield google_http.PooledHttp(session=session)
+    session.close()
+
+
+def test_retries_5xx_then_returns_httplib2_response(server, http):
+    server.script = [(503, 0), (500, 0)]
+
+    response, content = http.request(server.url)
+
+    assert server.hits == ["GET", "GET", "GET"]
+    assert response.status == 200
+    assert response["content-type"] == "application/json"
+    assert content == b'{"ok": true}'
+
+
+def test_final_5xx_goes_back_to_the_caller(server, http):
+    server.script = [(503, 0)] * 3
+
+    response, _ = http.request(server.url)
+
+    assert response.status == 503
+    assert len(server.hits) == 3
+
+
+def test_post_is_not_retried(server, http):
+    server.script = [(503, 0)]
+
+    response, _ = http.request(server.url, method="POST", body=b"{}")
+
+    assert response.status == 503
+    assert server.hits == ["POST"]
+
+
+def test_read_timeout_is_raised_as_timeout_error_without_retry(server, http):
+    server.script = [(200, 0.5)]
+    http.timeout = (1, 0.1)
+    timeouts = metrics.get_counter("google_http_timeouts_total")
+
+    with pytest.raises(TimeoutError):
+        http.request(server.url)
+
+    assert len(server.hits) == 1
+    assert metrics.get_counter("google_http_timeouts_total") == timeouts + 1
+
+
+def test_refused_connection_is_not_a_timeout(http):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    with pytest.raises(requests.ConnectionError):
+        http.request(f"http://127.0.0.1:{port}/")
+
+
+def test_keep_alive_connection_is_reused(server, http):
+    opened = metrics.get_counter("google_http_connections_opened_total", host="127.0.0.1")
+    sent = metrics.get_counter("google_http_requests_total")
+
+    for _ in range(3):
+        assert http.request(server.url)[0].status == 200
+
+    assert metrics.get_counter("google_http_requests_total") == sent + 3
+    assert metrics.get_counter("google_http_connections_opened_total", host="127.0.0.1") == opened + 1
@@ -0,0 +1,14 @@
+from app.integrations import google_services
+
+
+def test_invalidate_drops_only_that_users_services():
+    google_services._services.clear()
+    for user in ("user-1", "user-2"):
+        for thread in (1, 2):
+            key = (user, "gmail", "v1", frozenset(google_services.GMAIL_READONLY_SCOPES), thread)
+            google_services._services[key] = (object(), "token", 0.0)
+
+    google_services.invalidate_google_services("user-1")
+
+    assert {key[0] for key in google_services._services} == {"user-2"}
+    google_services._services.clear()
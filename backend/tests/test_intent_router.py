@@ -0,0 +1,30 @@
+import pytest
+
+from app.agent.graph import intent_router_node
+from app.agent.schemas import AgentState
+
+
+def _route(message: str) -> str:
+    state = AgentState(user_id="00000000-0000-0000-0000-000000000001", message=message)
+    return intent_router_node(state, {"configurable": {"db": None}}).intent
+
+
+@pytest.mark.parametrize("message", [
+    "Give me my daily briefing",
+    "briefing please",
+    "What does my day look like?",
+    "Overview for today",
+])
+def test_briefing_requests(message):
+    assert _route(message) == "daily_briefing"
+
+
+@pytest.mark.parametrize("message, intent", [
+    ('Schedule a meeting titled "Project briefing" tomorrow from 2pm to 3pm', "calendar_create"),
+    ('Create "Briefing prep" meeting today from 9am to 10am', "calendar_create"),
+    ("Do I have a briefing meeting tomorrow?", "calendar_tomorrow"),
+    ("Give me an overview of my emails today", "gmail_today"),
+    ("What meetings do I have today?", "calendar_today"),
+])
+def test_briefing_words_in_single_source_requests(message, intent):
+    assert _route(message) == intent
@@ -0,0 +1,39 @@
+import threading
+import time
+
+from app.core.keyed_locks import KeyedLocks
+
+
+def test_single_flight_per_key_and_released():
+    locks = KeyedLocks()
+    inside = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    guard = threading.Lock()
+
+    def work(key):
+        with locks.hold(key):
+            with guard:
+                inside[key] += 1
+                peak[key] = max(peak[key], inside[key])
+            time.sleep(0.01)
+            with guard:
+                inside[key] -= 1
+
+    threads = [threading.Thread(target=work, args=(key,)) for key in "ab" * 4]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == {"a": 1, "b": 1}
+    assert len(locks) == 0
+
+
+def test_entry_released_when_the_body_raises():
+    locks = KeyedLocks()
+    try:
+        with locks.hold("a"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert "a" not in locks
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.agent import llm_cache
+from app.db import database
+from app.db.database import Base
+from app.db.models import LLMCacheEntry
+
+PROMPT = [SystemMessage(content="You are a Chief-of-Staff AI."), HumanMessage(content="Summarize my inbox")]
+
+
+class FakeLLM:
+    def __init__(self, model="gemini-2.5-flash", temperature=0.2, reply="summary"):
+        self.model = model
+        self.temperature = temperature
+        self.reply = reply
+        self.calls = 0
+
+    def invoke(self, messages, user_id=None):
+        self.calls += 1
+        return SimpleNamespace(text=self.reply)
+
+    async def astream(self, messages, user_id=None):
+        self.calls += 1
+        for token in self.reply.split(" "):
+            yield SimpleNamespace(text=token + " ")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    llm_cache.llm_cache.clear()
+    yield
+    llm_cache.llm_cache.clear()
+
+
+@pytest.fixture
+def persisted(monkeypatch):
+    """Turn on the database tier, backed by an in-memory SQLite shared across threads."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", Session)
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_PERSIST", True)
+    return Session
+
+
+def test_key_covers_model_sampling_and_exact_messages():
+    key = llm_cache.cache_key(FakeLLM(), PROMPT)
+
+    assert key == llm_cache.cache_key(FakeLLM(), list(PROMPT))
+    assert key != llm_cache.cache_key(FakeLLM(model="gemini-2.5-pro"), PROMPT)
+    assert key != llm_cache.cache_key(FakeLLM(temperature=0.7), PROMPT)
+    assert key != llm_cache.cache_key(FakeLLM(), [PROMPT[0], HumanMessage(content="Summarize my inbox!")])
+    # Same text from the assistant is a different prompt.
+    assert key != llm_cache.cache_key(FakeLLM(), [PROMPT[0], AIMessage(content="Summarize my inbox")])
+
+
+def test_repeated_prompt_is_answered_from_cache():
+    llm = FakeLLM()
+
+    assert llm_cache.cached_invoke(llm, PROMPT, node="test", ttl=60) == "summary"
+    assert llm_cache.cached_invoke(llm, PROMPT, node="test", ttl=60) == "summary"
+    assert llm.calls == 1
+
+
+def test_expired_entry_is_a_miss():
+    llm = FakeLLM()
+    llm_cache.cached_invoke(llm, PROMPT, node="test", ttl=0)
+    llm_cache.cached_invoke(llm, PROMPT, node="test", ttl=0)
+    assert llm.calls == 2
+
+
+def test_persisted_entry_survives_a_restart(persisted):
+    llm = FakeLLM()
+    llm_cache.cached_invoke(llm, PROMPT, node="test", ttl=60)
+
+    with persisted() as db:
+        (row,) = db.query(LLMCacheEntry).all()
+        assert row.key == llm_cache.cache_key(llm, PROMPT)
+        assert row.response == "summary"
+
+    # A new process starts with an empty in-memory tier.
+    llm_cache.llm_cache.clear()
+    assert llm_cache.cached_invoke(llm, PROMPT, node="test", ttl=60) == "summary"
+    assert llm.calls == 1
+    # The hit was copied back into memory for the remaining TTL.
+    assert llm_cache.llm_cache.get(row.key) == "summary"
+
+
+def test_expired_persisted_entry_is_deleted(persisted):
+    key = llm_cache.cache_key(FakeLLM(), PROMPT)
+    with persisted() as db:
+        db.add(LLMCacheEntry(key=key, response="stale", expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+
+    assert llm_cache._lookup(key, "test") is None
+    with persisted() as db:
+        assert db.get(LLMCacheEntry, key) is None
+
+
+def test_streamed_reply_is_cached_and_persisted(persisted):
+    llm = FakeLLM(reply="two words")
+
+    first = asyncio.run(llm_cache.acached_stream(llm, PROMPT, node="test", ttl=60))
+    llm_cache.llm_cache.clear()
+    second = asyncio.run(llm_cache.acached_stream(llm, PROMPT, node="test", ttl=60))
+
+    assert first == second == "two words "
+    assert llm.calls == 1
@@ -0,0 +1,16 @@
+from app.agent import llm_gateway
+
+
+def test_idle_user_buckets_are_swept(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "_user_buckets", {})
+    monkeypatch.setattr(llm_gateway, "_next_sweep", 0.0)
+
+    idle = llm_gateway._user_bucket("idle-user")
+    active = llm_gateway._user_bucket("active-user")
+    idle.updated -= llm_gateway.USER_BUCKET_IDLE_SECONDS
+    active.take()
+
+    llm_gateway._next_sweep = 0.0
+    llm_gateway._user_bucket("active-user")
+
+    assert set(llm_gateway._user_buckets) == {"active-user"}
@@ -0,0 +1,16 @@
+import uuid
+
+from app.agent import memory_index
+
+
+def test_indexes_are_lru_bounded(monkeypatch):
+    monkeypatch.setattr(memory_index, "MEMORY_INDEX_MAX_USERS", 2)
+    monkeypatch.setattr(memory_index, "_indexes", memory_index.OrderedDict())
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    memory_index._cached_index(first)
+    memory_index._cached_index(second)
+    memory_index._cached_index(first)  # most recently used again
+    memory_index._cached_index(third)
+
+    assert list(memory_index._indexes) == [first, third]
@@ -0,0 +1,127 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.agent import memory_extractor, memory_worker
+from app.agent.llm_gateway import LLMThrottled
+from app.db.database import Base
+from app.db.models import Memory, MemoryExtractionJob
+
+ALICE = uuid.uuid4()
+BOB = uuid.uuid4()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def extract(monkeypatch):
+    """Stub LLM extraction; records each call's texts and returns the preset facts or raises."""
+    calls = []
+    outcome = {"facts": [{"key": "meeting_preference", "value": "no 9am meetings"}]}
+
+    def extract_facts(texts, source="chat", user_id=None):
+        calls.append(list(texts))
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["facts"]
+
+    monkeypatch.setattr(memory_extractor, "extract_facts", extract_facts)
+    return calls, outcome
+
+
+def _jobs(db) -> list[MemoryExtractionJob]:
+    return db.query(MemoryExtractionJob).order_by(MemoryExtractionJob.id).all()
+
+
+def test_claims_oldest_users_jobs_as_one_batch(db):
+    memory_worker.enqueue_memory_extraction(db, ALICE, "chat", "first")
+    memory_worker.enqueue_memory_extraction(db, BOB, "chat", "other user")
+    memory_worker.enqueue_memory_extraction(db, ALICE, "email", "other source")
+    memory_worker.enqueue_memory_extraction(db, ALICE, "chat", "second")
+
+    batch = memory_worker._claim_batch(db)
+
+    assert [job.text for job in batch] == ["first", "second"]
+    assert {job.status for job in batch} == {"running"}
+    # Running jobs are not handed out again; the next claim starts at the next oldest job.
+    assert [job.text for job in memory_worker._claim_batch(db)] == ["other user"]
+
+
+def test_claims_skip_rows_locked_by_other_workers(db):
+    memory_worker.enqueue_memory_extraction(db, ALICE, "chat", "hello")
+    statements = []
+
+    @event.listens_for(db, "do_orm_execute")
+    def capture(state):
+        statements.append(str(state.statement.compile(dialect=postgresql.dialect())))
+
+    memory_worker._claim_batch(db)
+
+    selects = [sql for sql in statements if sql.startswith("SELECT")]
+    assert selects and all(sql.endswith("FOR UPDATE SKIP LOCKED") for sql in selects)
+
+
+def test_stale_running_job_is_claimed_again(db):
+    memory_worker.enqueue_memory_extraction(db, ALICE, "chat", "hello")
+    (job,) = memory_worker._claim_batch(db)
+    assert memory_worker._claim_batch(db) == []
+
+    job.claimed_at = datetime.utcnow() - memory_worker.CLAIM_TIMEOUT - timedelta(seconds=1)
+    db.commit()
+
+    assert [j.id for j in memory_worker._claim_batch(db)] == [job.id]
+
+
+def test_batch_is_coalesced_and_saved(db, extract):
+    calls, _ = extract
+    for text in ("I hate 9am meetings", "I hate 9am meetings", "Call me Al"):
+        memory_worker.enqueue_memory_extraction(db, ALICE, "chat", text)
+
+    assert memory_worker.run_once(db) == 3
+
+    assert calls == [["I hate 9am meetings", "Call me Al"]]
+    assert _jobs(db) == []
+    assert [(m.key, m.value) for m in db.query(Memory).all()] == [("meeting_preference", "no 9am meetings")]
+    assert memory_worker.run_once(db) == 0
+
+
+def test_failed_batch_is_retried_after_delay_then_given_up(db, extract, monkeypatch):
+    calls, outcome = extract
+    outcome["error"] = RuntimeError("LLM down")
+    monkeypatch.setattr(memory_worker, "MEMORY_JOB_MAX_ATTEMPTS", 2)
+    memory_worker.enqueue_memory_extraction(db, ALICE, "chat", "hello")
+
+    memory_worker.run_once(db)
+    (job,) = _jobs(db)
+    assert (job.status, job.attempts, job.error) == ("pending", 1, "RuntimeError: LLM down")
+    # Not retried before RETRY_DELAY has passed.
+    assert memory_worker.run_once(db) == 0
+
+    job.claimed_at = datetime.utcnow() - memory_worker.RETRY_DELAY - timedelta(seconds=1)
+    db.commit()
+    memory_worker.run_once(db)
+
+    assert (job.status, job.attempts) == ("failed", 2)
+    assert len(calls) == 2
+
+
+def test_throttled_batch_is_deferred_without_an_attempt(db, extract):
+    _, outcome = extract
+    outcome["error"] = LLMThrottled()
+    memory_worker.enqueue_memory_extraction(db, ALICE, "chat", "hello")
+
+    memory_worker.run_once(db)
+
+    (job,) = _jobs(db)
+    assert (job.status, job.attempts) == ("pending", 0)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from app.agent.graph import MEETING_SCHEDULED, _handle_scheduling_followup
+from app.agent.message_parser import parse_followup, parse_message
+from app.agent.schemas import AgentState
+
+TOMORROW = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+
+def _followup(message: str, history: list[tuple[str, str]]) -> AgentState:
+    state = AgentState(
+        user_id="00000000-0000-0000-0000-000000000001",
+        message=message,
+        history=[{"role": role, "content": content} for role, content in history],
+    )
+    _handle_scheduling_followup(state)
+    return state
+
+
+REQUEST = ('user', 'Schedule a meeting titled "Team Sync" tomorrow from 2pm to 3pm')
+CONFLICT = ("assistant", "That time conflicts with existing events:\n- Standup at ...")
+
+
+def test_new_time_keeps_title_day_and_length():
+    state = _followup("make it 3pm", [REQUEST, CONFLICT])
+
+    assert state.intent == "calendar_create"
+    assert state.parsed.title == "Team Sync"
+    assert state.start_time == TOMORROW + timedelta(hours=15)
+    assert state.end_time == TOMORROW + timedelta(hours=16)
+
+
+def test_followups_chain():
+    history = [REQUEST, CONFLICT, ("user", "make it 3pm"), CONFLICT]
+    state = _followup("call it Design review", history)
+
+    assert state.intent == "calendar_create"
+    assert state.parsed.title == "Design review"
+    assert state.start_time == TOMORROW + timedelta(hours=15)
+
+
+def test_missing_details_are_filled_in():
+    history = [("user", "Schedule a meeting tomorrow"), ("assistant", "I just need the meeting name/title and time")]
+    state = _followup('"Budget review" from 10am to 11:00', history)
+
+    assert state.intent == "calendar_create"
+    assert state.parsed.title == "Budget review"
+    assert state.start_time == TOMORROW + timedelta(hours=10)
+
+
+def test_scheduled_meeting_is_not_reopened():
+    state = _followup("make it 3pm", [REQUEST, ("assistant", f"{MEETING_SCHEDULED}\n\n📅 Team Sync")])
+    assert state.intent is None
+
+
+def test_unrelated_turn_ends_the_request():
+    history = [REQUEST, CONFLICT, ("user", "What is a good agenda for a sync?"), ("assistant", "...")]
+    assert _followup("make it 3pm", history).intent is None
+
+
+def test_no_history():
+    assert _followup("make it 3pm", []).intent is None
+
+
+def test_followup_without_details():
+    base = parse_message(REQUEST[1])
+    assert parse_followup("thanks!", base) is None
+    assert parse_followup("tomorrow instead", parse_message("Schedule a meeting today from 9am to 10am")).start_time == (
+        TOMORROW + timedelta(hours=9)
+    )
@@ -0,0 +1,112 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.db.models import GoogleCredential
+from app.integrations import token_refresher
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def Session(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(token_refresher, "SessionLocal", Session)
+    return Session
+
+
+@pytest.fixture
+def db(Session):
+    session = Session()
+    yield session
+    session.close()
+
+
+def _credential(db, expires_in: timedelta, claimed_until: datetime | None = None) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    db.add(GoogleCredential(
+        user_id=user_id,
+        access_token="access",
+        refresh_token="refresh",
+        expires_at=NOW + expires_in,
+        refresh_claimed_until=claimed_until,
+    ))
+    db.commit()
+    return user_id
+
+
+def _lease(db, user_id) -> datetime | None:
+    db.expire_all()
+    return db.get(GoogleCredential, user_id).refresh_claimed_until
+
+
+def test_claims_due_rows_soonest_first_and_leases_them(db, monkeypatch):
+    monkeypatch.setattr(token_refresher, "TOKEN_REFRESH_BATCH_SIZE", 2)
+    later = _credential(db, timedelta(minutes=10))
+    soonest = _credential(db, timedelta(minutes=1))
+    _credential(db, timedelta(hours=1))  # not due yet
+    leased = _credential(db, timedelta(minutes=2), claimed_until=NOW + timedelta(minutes=5))
+
+    assert token_refresher._claim_batch(db) == [soonest, later]
+    assert _lease(db, soonest) > NOW + timedelta(seconds=token_refresher.TOKEN_REFRESH_CLAIM_SECONDS - 5)
+    # Everything due is leased now, here or by another replica.
+    assert token_refresher._claim_batch(db) == []
+    assert _lease(db, leased) == NOW + timedelta(minutes=5)
+
+
+def test_expired_lease_is_claimed_again(db):
+    user_id = _credential(db, timedelta(minutes=1), claimed_until=NOW - timedelta(seconds=1))
+    assert token_refresher._claim_batch(db) == [user_id]
+
+
+def test_claim_skips_rows_locked_by_other_replicas(db):
+    _credential(db, timedelta(minutes=1))
+    statements = []
+
+    @event.listens_for(db, "do_orm_execute")
+    def capture(state):
+        statements.append(str(state.statement.compile(dialect=postgresql.dialect())))
+
+    token_refresher._claim_batch(db)
+
+    assert statements[0].endswith("FOR UPDATE SKIP LOCKED")
+
+
+def test_failed_refresh_keeps_the_lease_for_the_backoff(db, monkeypatch):
+    user_id = _credential(db, timedelta(minutes=1))
+
+    def revoked(user_id, db, margin):
+        raise HTTPException(status_code=401, detail="Google access expired.")
+
+    monkeypatch.setattr(token_refresher, "refresh_google_credentials", revoked)
+
+    assert token_refresher._refresh_one(user_id) is False
+    backoff = timedelta(seconds=token_refresher.TOKEN_REFRESH_FAILURE_BACKOFF_SECONDS)
+    assert _lease(db, user_id) > datetime.utcnow() + backoff - timedelta(seconds=5)
+    assert token_refresher._claim_batch(db) == []
+
+
+def test_run_once_refreshes_each_claimed_user_once(db, monkeypatch):
+    users = {_credential(db, timedelta(minutes=i + 1)) for i in range(3)}
+    refreshed = []
+    monkeypatch.setattr(token_refresher, "TOKEN_REFRESH_SPACING_SECONDS", 0)
+    monkeypatch.setattr(
+        token_refresher, "refresh_google_credentials", lambda user_id, db, margin: refreshed.append(user_id)
+    )
+    monkeypatch.setattr(token_refresher, "_pool", ThreadPoolExecutor(max_workers=2))
+
+    assert token_refresher.run_once(db) == 3
+    assert sorted(refreshed) == sorted(users)
+    assert token_refresher.run_once(db) == 0
+
+    token_refresher._pool.shutdown()
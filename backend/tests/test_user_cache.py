@@ -0,0 +1,61 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth import user_cache
+from app.auth.auth_utils import create_access_token
+from app.auth.routes import router as auth_router
+from app.db.database import get_db
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.dependency_overrides[get_db] = lambda: None
+    yield TestClient(app)
+    user_cache.clear_auth_caches()
+
+
+@pytest.fixture
+def user():
+    # Cached, so get_current_user never needs the database.
+    user = SimpleNamespace(id=uuid.uuid4(), email="someone@example.com")
+    user_cache.cache_user(user)
+    return user
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_logout_revokes_the_token(client, user):
+    token = create_access_token({"user_id": str(user.id)})
+
+    assert client.post("/auth/logout", headers=_auth(token)).status_code == 200
+    assert user_cache.get_cached_user(user.id) is None
+
+    user_cache.cache_user(user)
+    response = client.post("/auth/logout", headers=_auth(token))
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Logged out. Please log in again."
+
+
+def test_other_tokens_survive_logout(client, user):
+    first = create_access_token({"user_id": str(user.id), "session": 1})
+    second = create_access_token({"user_id": str(user.id), "session": 2})
+
+    client.post("/auth/logout", headers=_auth(first))
+    user_cache.cache_user(user)
+
+    assert client.post("/auth/logout", headers=_auth(second)).status_code == 200
+
+
+def test_invalidate_cached_user(user):
+    assert user_cache.get_cached_user(user.id) is user
+    user_cache.invalidate_cached_user(user.id)
+    assert user_cache.get_cached_user(user.id) is None
+    user_cache.clear_auth_caches()